@@ -9,7 +9,7 @@ Requires:
 - pyttsx3
 - requests
 """
-import os, sys, json, time, re
+import os, sys, json, time, re, threading
 from difflib import SequenceMatcher
 try:
     import sounddevice as sd
@@ -21,6 +21,8 @@ except Exception as e:
     print("Exception:", e)
     sys.exit(1)
 
+from speculation import Speculator, speech_end
+
 ROOT = os.path.dirname(os.path.abspath(__file__))
 MODEL_PATH = os.path.join(ROOT, "models", "vosk-small-en-us-0.15")
 SERVER_URL = "http://127.0.0.1:5005/command"
@@ -34,6 +36,8 @@ FUZZY_MAP_THRESHOLD = 0.6
 WAKEWORD = "bro"
 
 DRY_RUN = os.environ.get("DRY_RUN","0") == "1"
+SPECULATE = os.environ.get("SPECULATE","1") == "1"  # act on stable partials before the final result
+STABLE_PARTIALS = 2
 DEBUG = True
 
 # simple mapping (extend)
@@ -94,9 +98,24 @@ def send_to_server(text: str):
     except Exception as e:
         return {"ok": False, "error": str(e)}
 
+def send_async(text: str):
+    threading.Thread(target=send_to_server, args=(text,), daemon=True).start()
+
+def dispatch(mapped, spec, speculator):
+    """Sends the mapped command unless a committed prep already did it; logs the latency."""
+    action_at = None
+    if not spec["skip_send"]:
+        action_at = time.monotonic()
+        resp = send_to_server(mapped)
+        print("SERVER RESP:", resp)
+    latency = speculator.record_action(spec, action_at)
+    if latency is not None:
+        averages = ", ".join(f"{k} {v * 1000:.0f} ms" for k, v in speculator.summary().items())
+        print(f"[SPEC] {spec['decision']}: end of speech -> first action {latency * 1000:.0f} ms (avg: {averages})")
+
 # audio capture
 def audio_callback(indata, frames, time_info, status):
-    q.put(bytes(indata))
+    q.put((time.monotonic(), bytes(indata)))
 
 def run_listener():
     if not os.path.isdir(MODEL_PATH):
@@ -107,55 +126,60 @@ def run_listener():
     rec = KaldiRecognizer(model, SAMPLE_RATE)
     rec.SetWords(True)
 
+    # SPECULATE=0 still records latencies, as the baseline
+    speculator = Speculator(lambda t: best_whitelist_match(normalize_asr_text(t)), send_async,
+                            min_score=FUZZY_MAP_THRESHOLD, stable_partials=STABLE_PARTIALS,
+                            enabled=SPECULATE)
+
     print("Starting audio. Say wakeword 'bro'.")
     with sd.RawInputStream(samplerate=SAMPLE_RATE, blocksize=8000, dtype='int16',
                            channels=1, callback=audio_callback):
         wake_waiting = False
         wake_expiry = 0
+        audio_secs = 0.0 # audio fed to the recognizer; Vosk word times count from its start
         while True:
             try:
-                data = q.get(timeout=0.5)
+                captured_at, data = q.get(timeout=0.5)
             except Exception:
                 if wake_waiting and time.time() > wake_expiry:
                     wake_waiting = False
                 continue
+            audio_secs += len(data) / (2 * SAMPLE_RATE) # int16 mono
 
             if rec.AcceptWaveform(data):
                 res = json.loads(rec.Result())
                 text = res.get("text", "").strip()
-                if not text:
-                    continue
+                spoken_at = speech_end(res.get("result"), audio_secs, captured_at)
+                command, retry = None, None
                 if WAKEWORD in text.split():
-                    after = text.split(WAKEWORD,1)[1].strip()
-                    if after:
-                        # "bro open spotify" one utterance
-                        cand = normalize_asr_text(after)
-                        mapped, score, syn = best_whitelist_match(cand)
-                        if mapped and score >= FUZZY_MAP_THRESHOLD:
-                            print("Mapping:", mapped, "score", score)
-                            resp = send_to_server(mapped)
-                            print("SERVER RESP:", resp)
-                        else:
-                            speak("Please repeat the command.")
-                        continue
-                    # just wakeword -> start window
-                    wake_waiting = True
-                    wake_expiry = time.time() + LISTEN_SECS
-                    print("Wakeword detected, listening for", LISTEN_SECS, "s")
-                    continue
-
-                # if we are in wake window, treat this as candidate command
-                if wake_waiting:
+                    # "bro open spotify" one utterance
+                    command = text.split(WAKEWORD,1)[1].strip()
+                    retry = "Please repeat the command."
+                    if not command:
+                        # just wakeword -> start window
+                        wake_waiting = True
+                        wake_expiry = time.time() + LISTEN_SECS
+                        print("Wakeword detected, listening for", LISTEN_SECS, "s")
+                elif wake_waiting:
+                    # if we are in wake window, treat this as candidate command
                     wake_waiting = False
-                    cand = normalize_asr_text(text)
-                    mapped, score, syn = best_whitelist_match(cand)
-                    print("Candidate:", cand, "mapped:", mapped, "score", score)
-                    if mapped and score >= FUZZY_MAP_THRESHOLD:
-                        # send or confirm depending on confidence (we don't have word-level conf easily here)
-                        resp = send_to_server(mapped)
-                        print("SERVER RESP:", resp)
-                    else:
-                        speak("I did not understand. Please repeat.")
+                    command = text
+                    retry = "I did not understand. Please repeat."
+
+                if not command:
+                    # Empty or ignored final: still end this utterance's speculation
+                    speculator.on_final(None, spoken_at)
+                    continue
+                cand = normalize_asr_text(command)
+                mapped, score, syn = best_whitelist_match(cand)
+                print("Candidate:", cand, "mapped:", mapped, "score", score)
+                ok = mapped and score >= FUZZY_MAP_THRESHOLD
+                spec = speculator.on_final(mapped if ok else None, spoken_at)
+                if ok:
+                    # send or confirm depending on confidence (we don't have word-level conf easily here)
+                    dispatch(mapped, spec, speculator)
+                else:
+                    speak(retry)
             else:
                 # partial result
                 partial = json.loads(rec.PartialResult()).get("partial","").strip()
@@ -163,6 +187,14 @@ def run_listener():
                     wake_waiting = True
                     wake_expiry = time.time() + LISTEN_SECS
                     print("[PARTIAL] Wakeword seen -> starting wake window")
+                # speculate on the command part of the partial
+                if WAKEWORD in partial.split():
+                    partial = partial.split(WAKEWORD, 1)[1].strip()
+                elif not wake_waiting:
+                    partial = ""
+                prep = speculator.on_partial(partial, captured_at)
+                if prep:
+                    print("[SPEC] stable partial -> preparing:", prep)
 
 if __name__ == "__main__":
     run_listener()
@@ -22,7 +22,20 @@ try:
 except Exception:
     pyautogui = None
 
+try:
+    from .settle import wait_for_settle
+    from .proc_watch import get_watcher
+    from .readout import read_screen_async
+except ImportError:
+    from settle import wait_for_settle
+    from proc_watch import get_watcher
+    from readout import read_screen_async
+
 ROOT = Path(__file__).resolve().parent
+ATOM_DIR = ROOT.parent.parent / "atom"
+if str(ATOM_DIR) not in sys.path:
+    sys.path.append(str(ATOM_DIR))
+from ai_core.modules import plan
 SS = ROOT / "screenshots"
 ANN = SS / "annotated"
 SS.mkdir(exist_ok=True)
@@ -75,24 +88,18 @@ def smart_wait_for_app(app_name_fragment, timeout=10):
     If found early, returns immediately (Fast).
     If not, waits until timeout.
     """
-    try:
-        import psutil
-        start_time = time.time()
-        print(f"[SMART WAIT] Looking for process: {app_name_fragment}")
-        
-        while (time.time() - start_time) < timeout:
-            for proc in psutil.process_iter(['name']):
-                try:
-                    if app_name_fragment.lower() in proc.info['name'].lower():
-                        print(f"[SMART WAIT] Found {proc.info['name']}! Ready in {time.time() - start_time:.2f}s")
-                        return True
-                except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-                    pass
-            time.sleep(0.5) # Poll frequency
+    watcher = get_watcher()
+    if watcher is None:
+        time.sleep(3.0) # Fallback if processes can't be listed
         return False
-    except ImportError:
-         time.sleep(3.0) # Fallback if psutil fails
-         return False
+    start_time = time.time()
+    print(f"[SMART WAIT] Looking for process: {app_name_fragment}")
+    # Blocks on the shared watcher; wakes as soon as the process shows up
+    name = watcher.wait_for(app_name_fragment, timeout)
+    if name:
+        print(f"[SMART WAIT] Found {name}! Ready in {time.time() - start_time:.2f}s")
+        return True
+    return False
 
 def platform_open_app(app_name: str):
     plat = platform.system().lower()
@@ -108,368 +115,329 @@ def platform_open_app(app_name: str):
         if "notepad" in app_name.lower(): smart_wait_for_app("notepad")
         elif "spotify" in app_name.lower(): 
              smart_wait_for_app("spotify")
-             time.sleep(2.0) # Extra wait for UI load
+             # Process is up; wait for its window to finish drawing
+             wait_for_settle(timeout=4.0, fallback=2.0, expect_change=True, change_grace=1.5)
         elif "chrome" in app_name.lower(): smart_wait_for_app("chrome")
         elif "calculator" in app_name.lower(): smart_wait_for_app("calc")
         else:
-             time.sleep(2.0) # Default for unknown apps
+             # Unknown apps: no process name to watch, so wait for the window
+             wait_for_settle(timeout=4.0, fallback=2.0, expect_change=True, change_grace=1.5)
              
         return True
     except Exception:
         return False
 
-def execute_step(step_text):
-    """
-    Executes a single step from the verbose instruction.
-    e.g. "click windows", "type baby", "search for spotify"
-    """
-    step = step_text.strip().lower()
-    print(f"[EXECUTOR] Executing step: {step}")
-    
-    if pyautogui is None:
-        return f"Error: PyAutoGUI not initialized. Cannot execute '{step}'"
+# --- STEP HANDLERS (one per plan op) ---
+def do_start_menu(_):
+    # "click windows buttion" (typo included)
+    pyautogui.press('win')
+    wait_for_settle(timeout=1.5, fallback=0.5, expect_change=True) # Start menu animation
+    return "Pressed Windows key"
+
+def do_search_for(query):
+    pyautogui.write(query, interval=0.05) # Faster typing
+    wait_for_settle(timeout=1.5, fallback=0.2) # Search results refresh
+    return f"Typed '{query}'"
+
+def do_type(text):
+    pyautogui.write(text, interval=0.05) # Faster typing
+    return f"Typed '{text}'"
+
+# --- HOTKEY SUPPORT ---
+KEY_MAP = {
+    "volume_up": "volumeup",
+    "volume_down": "volumedown", 
+    "volume_mute": "volumemute",
+    "playpause": "playpause",
+    "nexttrack": "nexttrack",
+    "prevtrack": "prevtrack",
+    "windows": "win",
+    "enter": "enter",
+    "tab": "tab",
+    "space": "space",
+    "esc": "esc",
+    "backspace": "backspace"
+}
+
+def do_press(key_seq):
+    # Handle combinations like "ctrl+t"
+    if "+" in key_seq:
+        pyautogui.hotkey(*key_seq.split("+"))
+    else:
+        # Map abstract keys to pyautogui
+        pyautogui.press(KEY_MAP.get(key_seq, key_seq))
+    if key_seq not in plan.SYSTEM_KEYS: # Volume/media keys don't redraw the focused window
+        wait_for_settle(timeout=1.5, fallback=0.5, expect_change=True) # Allow UI to react
+    return f"Pressed '{key_seq}'"
+
+# --- VOICE UPGRADE (ASYNC) ---
+def do_speak(text):
+    import threading
+    t = threading.Thread(target=run_speak, args=(text,))
+    t.daemon = True
+    t.start()
+    return f"Speaking (Async): '{text}'"
+
+# --- SYSTEM ADMIN UPGRADE ---
+def do_check(what):
+    import psutil
+    if what == "battery":
+        battery = psutil.sensors_battery()
+        percent = battery.percent if battery else "Unknown"
+        return f"Inform: Battery is at {percent}%"
+    if what == "cpu":
+        usage = psutil.cpu_percent(interval=1)
+        return f"Inform: CPU Usage is {usage}%"
+    mem = psutil.virtual_memory()
+    return f"Inform: RAM Usage is {mem.percent}%"
+
+def do_clean_temp(_):
+    temp_dir = os.environ.get('TEMP')
+    if temp_dir:
+        try:
+            # localized cleanup for safety, just counting files
+            count = len(os.listdir(temp_dir))
+            return f"Inform: Found {count} temp files. (Cleanup simulation for safety)"
+        except:
+            pass
+    return "Cleaned Temp Files (Simulated)"
+
+def do_inform(info):
+    return f"Info: {info}"
+
+def do_open_result(_):
+    pyautogui.press('enter')
+    wait_for_settle(timeout=3.0, fallback=1.0, expect_change=True, change_grace=1.0)
+    return "Pressed Enter (Open App)"
+
+def do_open_app(app_name):
+    # Handle generic "open browser" -> Open Google
+    if "browser" in app_name.lower():
+         print(f"[EXECUTOR] Generic 'browser' requested. Opening default browser.")
+         plat = platform.system().lower()
+         if plat == "windows":
+             subprocess.run(["cmd", "/c", "start", "https://google.com"], shell=False)
+         elif plat == "darwin":
+             subprocess.run(["open", "https://google.com"], check=False)
+         else:
+             subprocess.run(["xdg-open", "https://google.com"], check=False)
+         smart_wait_for_app("chrome") # wait for chrome
+         return "Opened Default Browser to Google"
+
+    print(f"[EXECUTOR] Attempting to open app: {app_name}")
+    if platform_open_app(app_name):
+         # smart wait is inside platform_open_app
+         return f"Opened App '{app_name}' via platform command"
+    else:
+         return f"Failed to open '{app_name}'"
+
+def do_focus_search(_):
+    # Heuristic: Ctrl+L is standard for Browser URL and Spotify Search.
+    pyautogui.hotkey('ctrl', 'l')
+    wait_for_settle(timeout=2.0, fallback=1.0, expect_change=True)
+    return "Pressed Ctrl+L (Focus Search)"
+
+def do_click_search(_):
+    # If Ctrl+K didn't work, we can try clicking top-left/center or Tab cycling
+    # preventing "click on search" from doing nothing
+    pyautogui.press('tab') # Try tabbing once in case we are close
+    wait_for_settle(timeout=1.0, fallback=0.2)
+    return "Pressed Tab (Attempt Focus Search)"
+
+def do_click(target):
+    print(f"[EXECUTOR] requested click on: {target}")
+
+    # --- VISUAL CLICK LOGIC with TESSERACT ---
+    # If the visual click fails we fall back to selecting the result with Enter.
+    best_match = None
+    best_ratio = 0.0
     
-    # Handle "click windows buttion" (typo included)
-    if "click windows" in step:
-        if pyautogui: 
-            pyautogui.press('win')
-            time.sleep(0.5) # Reduced from 1.0
-        return "Pressed Windows key"
-
-    if "search for" in step:
-        query = step.split("search for")[1].strip()
-        if pyautogui: pyautogui.write(query, interval=0.05) # Faster typing
-        time.sleep(0.2)
-        return f"Typed '{query}'"
-
-    if "type" in step and "search" not in step: # avoid conflict with above if vague
-        text = step.split("type")[1].strip()
-        if pyautogui: pyautogui.write(text, interval=0.05) # Faster typing
-        return f"Typed '{text}'"
-
-    # --- HOTKEY SUPPORT ---
-    if "press " in step:
-        key_seq = step.split("press ")[1].strip()
-        if pyautogui:
-             # Handle combinations like "ctrl+t"
-             if "+" in key_seq:
-                 keys = key_seq.split("+")
-                 pyautogui.hotkey(*keys)
-             else:
-                 # Map abstract keys to pyautogui
-                 key_map = {
-                     "volume_up": "volumeup",
-                     "volume_down": "volumedown", 
-                     "volume_mute": "volumemute",
-                     "playpause": "playpause",
-                     "nexttrack": "nexttrack",
-                     "prevtrack": "prevtrack",
-                     "windows": "win",
-                     "enter": "enter",
-                     "tab": "tab",
-                     "space": "space",
-                     "esc": "esc",
-                     "backspace": "backspace"
-                 }
-                 p_key = key_map.get(key_seq, key_seq)
-                 pyautogui.press(p_key)
-             time.sleep(0.5) # Allow UI to react
-        return f"Pressed '{key_seq}'"
-
-    # --- VOICE UPGRADE (ASYNC) ---
-    if "speak" in step or "say" in step:
-        text = step.replace("speak", "").replace("say", "").strip()
-        import threading
-        t = threading.Thread(target=run_speak, args=(text,))
-        t.daemon = True
-        t.start()
-        return f"Speaking (Async): '{text}'"
-
-    # --- SYSTEM ADMIN UPGRADE ---
-    if "check" in step:
-        import psutil
-        if "battery" in step:
-            battery = psutil.sensors_battery()
-            percent = battery.percent if battery else "Unknown"
-            return f"Inform: Battery is at {percent}%"
-        if "cpu" in step:
-            usage = psutil.cpu_percent(interval=1)
-            return f"Inform: CPU Usage is {usage}%"
-        if "memory" in step or "ram" in step:
-            mem = psutil.virtual_memory()
-            return f"Inform: RAM Usage is {mem.percent}%"
-
-    if "clean temp" in step:
-        import shutil
-        temp_dir = os.environ.get('TEMP')
-        if temp_dir:
-            try:
-                # localized cleanup for safety, just counting files
-                count = len(os.listdir(temp_dir))
-                return f"Inform: Found {count} temp files. (Cleanup simulation for safety)"
-            except:
-                pass
-        return "Cleaned Temp Files (Simulated)"
-
-    if "inform " in step:
-        info = step.split("inform ")[1].strip()
-        return f"Info: {info}"
-
-    # Handle "typr" (typo included)
-    if "typr" in step:
-         text = step.split("typr")[1].strip()
-         if pyautogui: pyautogui.write(text, interval=0.05)
-         return f"Typed '{text}'"
-
-    if "open it" in step or "click open" in step:
-        if pyautogui: pyautogui.press('enter')
-        time.sleep(1.0) 
-        return "Pressed Enter (Open App)"
-
-    if "open " in step and "open it" not in step and "click open" not in step:
-        app_name = step.split("open ")[1].strip()
-        
-        # Handle generic "open browser" -> Open Google
-        if "browser" in app_name.lower():
-             print(f"[EXECUTOR] Generic 'browser' requested. Opening default browser.")
-             plat = platform.system().lower()
-             if plat == "windows":
-                 subprocess.run(["cmd", "/c", "start", "https://google.com"], shell=False)
-             elif plat == "darwin":
-                 subprocess.run(["open", "https://google.com"], check=False)
-             else:
-                 subprocess.run(["xdg-open", "https://google.com"], check=False)
-             smart_wait_for_app("chrome") # wait for chrome
-             return "Opened Default Browser to Google"
-
-        print(f"[EXECUTOR] Attempting to open app: {app_name}")
-        if platform_open_app(app_name):
-             # smart wait is inside platform_open_app
-             return f"Opened App '{app_name}' via platform command"
-        else:
-             return f"Failed to open '{app_name}'"
-
-    if "navigate to search bar" in step:
-        # Heuristic: Ctrl+L is standard for Browser URL and Spotify Search.
-        if pyautogui: 
-            pyautogui.hotkey('ctrl', 'l')
-            time.sleep(1.0)
-        return "Pressed Ctrl+L (Focus Search)"
-
-    if "click on search" in step:
-        # If Ctrl+K didn't work, we can try clicking top-left/center or Tab cycling
-        # preventing "click on search" from doing nothing
-        if pyautogui:
-            pyautogui.press('tab') # Try tabbing once in case we are close
-            time.sleep(0.2)
-        return "Pressed Tab (Attempt Focus Search)"
-
-    if "click on " in step:
-        target = step.split("click on ")[-1].strip()
-        print(f"[EXECUTOR] requested click on: {target}")
+    try:
+        # ocr() function in this file returns image_to_data(output_type=DICT)
+        img = capture()
+        ocr_res = ocr(img) # Returns dict of lists
         
-        # --- OVERRIDE: General 'Press Enter' for Search Results ---
-        # User requested: "it is not only siddu it is for search result"
-        # We assume if visual click fails, we just want to select the result.
-        pass # Fallthrough to visual click first
-
+        # ocr_res keys: left, top, width, height, text, conf...
+        n_boxes = len(ocr_res['text'])
         
-        # --- NEW VISUAL CLICK LOGIC with TESSERACT ---
-        best_match = None
-        best_ratio = 0.0
+        from difflib import SequenceMatcher
+        target_lower = target.lower()
         
-        try:
-            # Re-use existing ocr() function or call directly
-            # ocr() function in this file returns image_to_data(output_type=DICT)
-            # Need to capture screen first
-            img = capture()
-            ocr_res = ocr(img) # Returns dict of lists
-            
-            # ocr_res keys: left, top, width, height, text, conf...
-            n_boxes = len(ocr_res['text'])
+        for i in range(n_boxes):
+            text = ocr_res['text'][i].strip()
+            if not text: continue
             
-            from difflib import SequenceMatcher
-            target_lower = target.lower()
+            # Check confidence
+            try:
+                conf = int(ocr_res['conf'][i])
+            except:
+                conf = 0
+            if conf < 30: continue 
+
+            text_lower = text.lower()
+            ratio = SequenceMatcher(None, target_lower, text_lower).ratio()
             
-            for i in range(n_boxes):
-                text = ocr_res['text'][i].strip()
-                if not text: continue
-                
-                # Check confidence
-                try:
-                    conf = int(ocr_res['conf'][i])
-                except:
-                    conf = 0
-                if conf < 30: continue 
-
-                text_lower = text.lower()
-                ratio = SequenceMatcher(None, target_lower, text_lower).ratio()
-                
-                # Boost ratio if exact substring
-                if target_lower in text_lower:
-                    ratio += 0.3 # Boost for substring
-                
-                if ratio > best_ratio:
-                    best_ratio = ratio
-                    best_match = {
-                        "text": text,
-                        "rect": [ocr_res['left'][i], ocr_res['top'][i], ocr_res['width'][i], ocr_res['height'][i]]
-                    }
-                    
-            print(f"[EXECUTOR] Best visual match for '{target}': {best_match} (Score: {best_ratio:.2f})")
+            # Boost ratio if exact substring
+            if target_lower in text_lower:
+                ratio += 0.3 # Boost for substring
             
-            # Click if found
-            if best_match and best_ratio > 0.6:
-                rect = best_match['rect'] # [x, y, w, h]
-                cx = rect[0] + rect[2] / 2
-                cy = rect[1] + rect[3] / 2
+            if ratio > best_ratio:
+                best_ratio = ratio
+                best_match = {
+                    "text": text,
+                    "rect": [ocr_res['left'][i], ocr_res['top'][i], ocr_res['width'][i], ocr_res['height'][i]]
+                }
                 
-                if pyautogui:
-                    print(f"[EXECUTOR] Clicking at ({cx}, {cy})")
-                    pyautogui.moveTo(cx, cy, duration=0.5)
-                    pyautogui.click()
-                    return f"Clicked on visual match: '{best_match['text']}'"
-            else:
-                 print("[EXECUTOR] No confident visual match found. Falling back to heuristic.")
-                 
-        except Exception as e:
-            print(f"[EXECUTOR] Tesseract Visual Click Error: {e}")
-            import traceback
-            traceback.print_exc()
-
-        # --- FALLBACK TO OLD LOGIC ---
+        print(f"[EXECUTOR] Best visual match for '{target}': {best_match} (Score: {best_ratio:.2f})")
         
-        if "message bar" in target:
-             # Heuristic for message bar: Just wait/implicit focus
-             time.sleep(0.5) 
-             return "Focused Message Bar (Implicitly)"
+        # Click if found
+        if best_match and best_ratio > 0.6:
+            rect = best_match['rect'] # [x, y, w, h]
+            cx = rect[0] + rect[2] / 2
+            cy = rect[1] + rect[3] / 2
+            
+            print(f"[EXECUTOR] Clicking at ({cx}, {cy})")
+            pyautogui.moveTo(cx, cy, duration=0.5)
+            pyautogui.click()
+            return f"Clicked on visual match: '{best_match['text']}'"
+        else:
+             print("[EXECUTOR] No confident visual match found. Falling back to heuristic.")
              
-        if "send" in target:
-            # Heuristic for send: Enter usually sends
-            if pyautogui:
-                pyautogui.press('enter')
-                time.sleep(0.5)
-            return "Clicked Send (Enter)"
+    except Exception as e:
+        print(f"[EXECUTOR] Tesseract Visual Click Error: {e}")
+        traceback.print_exc()
 
-        if pyautogui:
-             # Just Press Enter (Simple Selection Fallback)
-             print(f"[EXECUTOR] Fallback for '{target}': Pressing Enter")
-             pyautogui.press('enter') 
-             time.sleep(1.0)
-        return f"Pressed Enter (Fallback for '{target}')"
-
-    if "save it" in step or "save file" in step:
-        filename = "unknown_file"
-        if pyautogui:
-            # Ensure we are focused on the doc
-            pyautogui.click() 
-            time.sleep(0.5)
-            
-            # Force "Save As" using Menu sequence (Alt -> F -> A)
-            # This is more robust than Ctrl+Shift+S which can vary by app/version
-            pyautogui.press('alt')
-            time.sleep(0.2)
-            pyautogui.press('f')
-            time.sleep(0.2)
-            pyautogui.press('a')
-            time.sleep(4.0) 
-            
-            # Use timestamp to avoid overwrite confirmation dialogs
-            timestamp = time.strftime("%Y%m%d_%H%M%S")
-            filename = f"note_{timestamp}"
-            pyautogui.write(filename, interval=0.05)
-            time.sleep(1.0)
-            pyautogui.press('enter') # Confirm save
-            time.sleep(1.0) # Wait for save to complete
-        return f"Pressed Ctrl+Shift+S -> Wait 4s -> Typed '{filename}' -> Enter"
-
-    if "play the song" in step or "play song" in step:
-        # Contextual, mostly Enter works for "play" in spotify search results
-        if pyautogui: 
-            pyautogui.press('enter') 
-            time.sleep(1.0)
-        return "Pressed Enter (Play)"
-
-    return f"Unknown step: {step}"
-
-# --- OCR HELPER (TESSERACT: NON-INTERACTIVE) ---
-def get_screen_readout():
-    """Captures screen via screenshot and reads text using Tesseract. Non-intrusive."""
-    import subprocess
-    import pyautogui
-    import os
+    # --- FALLBACK TO OLD LOGIC ---
+    
+    if "message bar" in target:
+         # Heuristic for message bar: Just wait/implicit focus
+         wait_for_settle(timeout=1.0, fallback=0.5)
+         return "Focused Message Bar (Implicitly)"
+         
+    if "send" in target:
+        # Heuristic for send: Enter usually sends
+        pyautogui.press('enter')
+        wait_for_settle(timeout=1.5, fallback=0.5, expect_change=True)
+        return "Clicked Send (Enter)"
+
+    # Just Press Enter (Simple Selection Fallback)
+    print(f"[EXECUTOR] Fallback for '{target}': Pressing Enter")
+    pyautogui.press('enter') 
+    wait_for_settle(timeout=3.0, fallback=1.0, expect_change=True)
+    return f"Pressed Enter (Fallback for '{target}')"
+
+def do_save(_):
+    # Ensure we are focused on the doc
+    pyautogui.click() 
+    wait_for_settle(timeout=1.0, fallback=0.5)
+    
+    # Force "Save As" using Menu sequence (Alt -> F -> A)
+    # This is more robust than Ctrl+Shift+S which can vary by app/version
+    pyautogui.press('alt')
+    wait_for_settle(timeout=1.0, fallback=0.2, expect_change=True)
+    pyautogui.press('f')
+    wait_for_settle(timeout=1.0, fallback=0.2, expect_change=True)
+    pyautogui.press('a')
+    # The Save As dialog can take seconds to appear the first time
+    wait_for_settle(timeout=6.0, fallback=4.0, expect_change=True, change_grace=1.5)
     
-    # Path to Tesseract (Winget Default)
-    tesseract_path = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
-    # Fallback if user installed elsewhere
-    if not os.path.exists(tesseract_path):
-        tesseract_path = r"C:\Users\sumuk\AppData\Local\Programs\Tesseract-OCR\tesseract.exe"
+    # Use timestamp to avoid overwrite confirmation dialogs
+    timestamp = time.strftime("%Y%m%d_%H%M%S")
+    filename = f"note_{timestamp}"
+    pyautogui.write(filename, interval=0.05)
+    wait_for_settle(timeout=2.0, fallback=1.0)
+    pyautogui.press('enter') # Confirm save
+    wait_for_settle(timeout=3.0, fallback=1.0, expect_change=True) # Wait for save to complete
+    return f"Pressed Ctrl+Shift+S -> Wait for dialog -> Typed '{filename}' -> Enter"
+
+def do_play_result(_):
+    # Contextual, mostly Enter works for "play" in spotify search results
+    pyautogui.press('enter') 
+    wait_for_settle(timeout=3.0, fallback=1.0, expect_change=True)
+    return "Pressed Enter (Play)"
+
+def do_raw(text):
+    return f"Unknown step: {text}"
+
+HANDLERS = {
+    plan.START_MENU: do_start_menu,
+    plan.SEARCH_FOR: do_search_for,
+    plan.OPEN_RESULT: do_open_result,
+    plan.OPEN_APP: do_open_app,
+    plan.TYPE: do_type,
+    plan.PRESS: do_press,
+    plan.SPEAK: do_speak,
+    plan.CHECK: do_check,
+    plan.CLEAN_TEMP: do_clean_temp,
+    plan.INFORM: do_inform,
+    plan.FOCUS_SEARCH: do_focus_search,
+    plan.CLICK_SEARCH: do_click_search,
+    plan.CLICK: do_click,
+    plan.SAVE: do_save,
+    plan.PLAY_RESULT: do_play_result,
+    plan.RAW: do_raw,
+}
+
+def run_step(step):
+    """Executes one typed plan Step through its handler."""
+    text = plan.render_step(step)
+    print(f"[EXECUTOR] Executing step: {text}")
+    
+    if pyautogui is None and step.op not in plan.INFO_OPS:
+        return f"Error: PyAutoGUI not initialized. Cannot execute '{text}'"
+    return HANDLERS[step.op](step.arg)
 
-    if not os.path.exists(tesseract_path):
-         return "Vision Unavailable: Tesseract not found. (Please release Clipboard fallback)"
+def execute_step(step_text):
+    """
+    Executes a single step from the verbose instruction.
+    e.g. "click windows", "type baby", "search for spotify"
+    """
+    return run_step(plan.parse_step(step_text))
 
-    try:
-        # 1. Capture Screenshot (Background)
-        screenshot_path = os.path.abspath(".gemini_vision_temp.png")
-        pyautogui.screenshot(screenshot_path)
-        
-        # 2. Run Tesseract CLI
-        # tesseract image.png stdout
-        result = subprocess.run(
-            [tesseract_path, screenshot_path, "stdout"], 
-            capture_output=True, 
-            text=True, 
-            encoding='utf-8',
-            creationflags=subprocess.CREATE_NO_WINDOW # Hide console window
-        )
-        
-        if result.returncode != 0:
-            return f"Vision Error: {result.stderr[:100]}"
-            
-        text = result.stdout.strip()
-        clean_text = " ".join(text.split())[:600] # Increased limit
-        
-        # Cleanup
-        try: os.remove(screenshot_path)
-        except: pass
-        
-        if not clean_text: return "Screen text empty (Image clear?)"
-        
-        return f"Screen Readout: {clean_text}..."
-        
-    except Exception as e:
-        return f"Vision Unavailable: {str(e)}"
+# --- OCR HELPER (IN-MEMORY, BACKGROUND) ---
+def get_screen_readout():
+    """Reads the screen text with Tesseract, blocking. Prefer read_screen_async()."""
+    return read_screen_async().result()
+
+class TaskLogs(list):
+    """
+    Step results. `readout` is a Future for the post-task screen readout (None
+    on the fast lane); it is never added to the logs, so the caller decides
+    whether to wait for it (logs.append(logs.readout.result())) or report it
+    later through add_done_callback.
+    """
+    readout = None
 
-def execute_verbose_command(command_string):
+def execute_verbose_command(command_string, fast=None):
     """
     Parses "do X then do Y then do Z" and executes sequentially.
+    Prefer the typed plan (action_data["plan"], a sequence of (op, arg) steps).
+    fast: force (True) or refuse (False) the fast lane; None picks by plan.
     """
     if not command_string:
-        return ["No steps to execute."]
+        return TaskLogs(["No steps to execute."])
     
-    # ... (OS handling omitted for brevity, same as before) ...
-    task_str = command_string
-    if "if it is windows" in task_str.lower():
-        task_str = task_str.lower().replace("if it is windows", "").strip()
-        if "/" in task_str: task_str = task_str.split("/")[0]
-
-    steps = task_str.split(" then ")
-    logs = []
+    # action_data["plan"] lists run as typed; legacy instruction text is parsed once
+    steps = plan.compile_plan(command_string)
+    # Fast lane: plans that don't need the screen skip the padding and the readout
+    if fast is None:
+        fast = not plan.needs_screen(steps)
+    logs = TaskLogs()
     
     for step in steps:
-        if not step.strip(): continue
         try:
-            result = execute_step(step)
+            result = run_step(step)
             logs.append(result)
         except Exception as e:
-            err_msg = f"Failed step '{step}': {str(e)}"
+            err_msg = f"Failed step '{plan.render_step(step)}': {str(e)}"
             print(f"[EXECUTOR ERROR] {err_msg}")
             logs.append(err_msg)
             break
-        time.sleep(0.5)
+        if not fast:
+            wait_for_settle(timeout=1.0, fallback=0.5) # Let the step's effect land before the next one
         
-    # --- AUTO LOOK: Read screen after completion ---
-    vision_log = get_screen_readout()
-    logs.append(vision_log)
+    # --- AUTO LOOK: Read screen after completion, without holding up the result ---
+    if not fast:
+        logs.readout = read_screen_async()
         
     return logs
@@ -0,0 +1,166 @@
+"""
+Incremental process watcher behind smart_wait_for_app.
+
+Instead of walking psutil.process_iter every 0.5s per waiter, one background
+thread keeps a {(pid, start time): name} view of running processes and
+updates it by delta: each tick lists the processes (pid and start time from
+/proc/<pid>/stat on Linux, psutil elsewhere) and only looks up the names of
+ones it hasn't seen before. The start time tells a reused pid from the
+process that had it. Waiters block on a condition and are woken the tick a
+matching process shows up.
+
+The thread only scans while someone is waiting; an idle watcher costs nothing,
+and its view is dropped when the last waiter leaves rather than kept to go stale.
+(Netlink proc events would avoid polling altogether but need CAP_NET_ADMIN.)
+"""
+import os
+import sys
+import time
+import threading
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+PROC = "/proc"
+TICK = 0.02 # Seconds between scans while waiters are blocked
+
+
+def _linux_start(pid):
+    try:
+        with open(f"{PROC}/{pid}/stat", "rb") as f:
+            stat = f.read()
+        # comm may contain spaces and parens; starttime is the 20th field after it
+        return int(stat[stat.rindex(b")") + 2:].split()[19])
+    except (OSError, ValueError, IndexError):
+        return None # Exited between listing and reading
+
+
+def _linux_procs():
+    procs = set()
+    for entry in os.listdir(PROC):
+        if entry.isdigit():
+            start = _linux_start(entry)
+            if start is not None:
+                procs.add((int(entry), start))
+    return procs
+
+
+def _linux_name(key):
+    pid = key[0]
+    try:
+        with open(f"{PROC}/{pid}/comm", "r", encoding="utf-8", errors="replace") as f:
+            return f.read().strip()
+    except OSError:
+        return None # Exited between listing and reading
+
+
+def _psutil_procs():
+    return {(p.pid, p.info["create_time"]) for p in psutil.process_iter(["create_time"])}
+
+
+def _psutil_name(key):
+    try:
+        return psutil.Process(key[0]).name()
+    except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+        return None
+
+
+def default_source():
+    """
+    (list_procs, proc_name) for this platform, or None if processes can't be
+    listed. list_procs() returns a set of (pid, start time) keys; proc_name(key)
+    returns the name, or None if the process is gone.
+    """
+    if sys.platform.startswith("linux") and os.path.isdir(PROC):
+        return _linux_procs, _linux_name
+    if psutil is not None:
+        return _psutil_procs, _psutil_name
+    return None
+
+
+class ProcessWatcher:
+    def __init__(self, source=None, tick=TICK):
+        self.list_procs, self.proc_name = source or default_source()
+        self.tick = tick
+        self.procs = {} # (pid, start time) -> lowercase name
+        self.scans = 0
+        self._cond = threading.Condition()
+        self._waiters = 0
+        self._thread = None
+
+    def scan(self):
+        """One delta update; returns the names of processes that appeared."""
+        keys = self.list_procs()
+        appeared = []
+        for key in list(self.procs):
+            if key not in keys:
+                del self.procs[key]
+        for key in keys:
+            if key not in self.procs:
+                name = self.proc_name(key)
+                if name is not None:
+                    self.procs[key] = name.lower()
+                    appeared.append(self.procs[key])
+        self.scans += 1
+        return appeared
+
+    def _find(self, fragment):
+        for name in self.procs.values():
+            if fragment in name:
+                return name
+        return None
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._waiters:
+                    self._cond.wait()
+                if self.scan():
+                    self._cond.notify_all()
+            time.sleep(self.tick)
+
+    def _ensure_thread(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="process-watcher", daemon=True)
+            self._thread.start()
+
+    def wait_for(self, fragment, timeout=10.0):
+        """Name of a running process containing fragment (case-insensitive), waiting up to timeout; else None."""
+        fragment = fragment.lower()
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            self._waiters += 1
+            try:
+                self.scan() # Bring the view up to date; the app may already be running
+                found = self._find(fragment)
+                if found:
+                    return found
+                self._ensure_thread()
+                self._cond.notify_all()
+                while True:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return None
+                    self._cond.wait(remaining)
+                    found = self._find(fragment)
+                    if found:
+                        return found
+            finally:
+                self._waiters -= 1
+                if not self._waiters:
+                    self.procs = {} # Nobody is scanning; don't keep a view that goes stale
+
+
+_watcher = None
+_watcher_lock = threading.Lock()
+
+
+def get_watcher():
+    """Process-wide ProcessWatcher, or None if this platform can't list processes."""
+    global _watcher
+    with _watcher_lock:
+        if _watcher is None and default_source() is not None:
+            _watcher = ProcessWatcher()
+        return _watcher
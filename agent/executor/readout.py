@@ -0,0 +1,119 @@
+"""
+Post-task screen readout, in memory and off the caller's thread.
+
+    future = read_screen_async()   # returns immediately
+    ...
+    future.result()                # "Screen Readout: ..." once OCR is done
+
+The screen is grabbed into a PIL image and handed to Tesseract without
+touching the filesystem: in-process through tesserocr when it is installed,
+otherwise by piping the raw image into the tesseract CLI
+(`tesseract stdin stdout`). One worker thread does the work, so a readout
+never delays the task that requested it.
+"""
+import io
+import os
+import sys
+import shutil
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import tesserocr
+except ImportError:
+    tesserocr = None
+
+try:
+    from .settle import FrameGrabber
+except ImportError:
+    from settle import FrameGrabber
+
+MAX_CHARS = 600
+OCR_TIMEOUT = 30.0
+
+# Winget default, then the per-user install
+WINDOWS_PATHS = [
+    r"C:\Program Files\Tesseract-OCR\tesseract.exe",
+    os.path.expandvars(r"%LOCALAPPDATA%\Programs\Tesseract-OCR\tesseract.exe"),
+]
+
+
+def find_tesseract():
+    """Path of the tesseract binary (TESSERACT_CMD, PATH, Windows installs), or None."""
+    for candidate in [os.environ.get("TESSERACT_CMD"), shutil.which("tesseract")] + WINDOWS_PATHS:
+        if candidate and os.path.exists(candidate):
+            return candidate
+    return None
+
+
+def cli_ocr(img, cmd):
+    """OCR through the tesseract CLI, image in on stdin, text out on stdout."""
+    buf = io.BytesIO()
+    img.convert("L").save(buf, format="PPM") # Uncompressed; encoding PNG costs more than OCR saves
+    flags = subprocess.CREATE_NO_WINDOW if sys.platform == "win32" else 0 # Hide console window
+    result = subprocess.run([cmd, "stdin", "stdout"], input=buf.getvalue(), capture_output=True,
+                            timeout=OCR_TIMEOUT, creationflags=flags)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.decode("utf-8", "replace")[:100])
+    return result.stdout.decode("utf-8", "replace")
+
+
+def default_ocr():
+    """image -> text callable for this machine, or None if Tesseract is unavailable."""
+    if tesserocr is not None:
+        return tesserocr.image_to_text
+    cmd = find_tesseract()
+    if cmd:
+        return lambda img: cli_ocr(img, cmd)
+    return None
+
+
+def format_readout(text):
+    clean_text = " ".join(text.split())[:MAX_CHARS]
+    if not clean_text:
+        return "Screen text empty (Image clear?)"
+    return f"Screen Readout: {clean_text}..."
+
+
+class ScreenReader:
+    """Runs grab + OCR on one background worker; read() hands back a Future."""
+    def __init__(self, grab=None, ocr=None):
+        self.grab = grab
+        self.ocr = ocr
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="screen-readout")
+        self._lock = threading.Lock()
+        self._pending = None
+
+    def _read(self):
+        try:
+            if self.ocr is None:
+                self.ocr = default_ocr()
+            if self.ocr is None:
+                return "Vision Unavailable: Tesseract not found."
+            if self.grab is None:
+                self.grab = FrameGrabber(scale=1)
+            return format_readout(self.ocr(self.grab()))
+        except Exception as e:
+            return f"Vision Unavailable: {str(e)}"
+
+    def read(self):
+        with self._lock:
+            # A readout still queued behind the running one would describe a stale screen
+            if self._pending is not None:
+                self._pending.cancel()
+            self._pending = self._pool.submit(self._read)
+            return self._pending
+
+
+_reader = None
+_reader_lock = threading.Lock()
+
+
+def read_screen_async():
+    """Future resolving to the readout of the screen as it is now."""
+    global _reader
+    with _reader_lock:
+        if _reader is None:
+            _reader = ScreenReader()
+    return _reader.read()
@@ -0,0 +1,94 @@
+"""
+Screen-settle waits for the executor.
+
+Instead of sleeping a fixed time after a key press or app launch, sample small
+grayscale frames of the screen and return as soon as it stops changing:
+
+    pyautogui.press('win')
+    wait_for_settle(timeout=1.5, fallback=0.5)
+
+Without a screen grabber (no mss/PIL, headless) or with ATOM_SETTLE=0 the
+call sleeps `fallback` seconds instead, i.e. the old constant.
+"""
+import os
+import time
+
+SETTLE_ENABLED = os.environ.get("ATOM_SETTLE", "1") != "0"
+SCALE = 8          # Frames are reduced 8x per side before comparing
+PIXEL_DELTA = 12   # Gray levels a pixel must move to count as changed
+CHANGED = 0.002    # Fraction of changed pixels that still counts as "still"
+
+_grabber = None
+
+
+class FrameGrabber:
+    """Grabs the primary monitor as a downscaled grayscale PIL image."""
+    def __init__(self, scale=SCALE):
+        import mss
+        from PIL import Image
+        self._mss = mss
+        self._image = Image
+        self.scale = scale
+
+    def __call__(self):
+        # mss handles are not thread-safe, so each grab opens its own
+        with self._mss.mss() as s:
+            g = s.grab(s.monitors[1])
+        img = self._image.frombytes("RGB", g.size, g.rgb).convert("L")
+        return img.reduce(self.scale)
+
+
+def get_grabber():
+    """Shared FrameGrabber, or None when the screen can't be captured."""
+    global _grabber
+    if _grabber is None:
+        try:
+            _grabber = FrameGrabber()
+            _grabber() # Fails fast on headless machines
+        except Exception as e:
+            print(f"[SETTLE] Screen sampling unavailable ({e}). Using fixed waits.")
+            _grabber = False
+    return _grabber or None
+
+
+def frame_change(a, b, pixel_delta=PIXEL_DELTA):
+    """Fraction of pixels that differ by more than pixel_delta between two frames."""
+    from PIL import ImageChops
+    if a.size != b.size:
+        return 1.0
+    hist = ImageChops.difference(a, b).histogram()
+    return sum(hist[pixel_delta + 1:]) / float(a.size[0] * a.size[1])
+
+
+def wait_for_settle(timeout=2.0, fallback=0.5, stable_for=0.2, interval=0.05, expect_change=False,
+                    change_grace=0.3, grab=None, diff=frame_change, threshold=CHANGED, clock=time.monotonic,
+                    sleep=time.sleep):
+    """
+    Blocks until the screen has been still for stable_for seconds, or timeout.
+    With expect_change (the action will visibly redraw, e.g. opening a menu),
+    stillness only counts once a change was seen or change_grace has passed,
+    so a slow-starting animation isn't mistaken for a settled screen.
+    Returns the seconds waited.
+    """
+    start = clock()
+    if grab is None:
+        grab = get_grabber() if SETTLE_ENABLED else None
+    if grab is None:
+        sleep(fallback)
+        return clock() - start
+
+    deadline = start + timeout
+    previous = grab()
+    changed = False
+    still_since = clock()
+    while clock() < deadline:
+        sleep(interval)
+        frame = grab()
+        now = clock()
+        if diff(previous, frame) > threshold:
+            changed = True
+            still_since = now
+        elif (not expect_change or changed or now - start >= change_grace) and now - still_since >= stable_for:
+            break
+        previous = frame
+    return clock() - start
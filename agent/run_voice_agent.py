@@ -80,9 +80,12 @@ def main():
                 
                 if instructions_str:
                     print(f"Plan: {instructions_str}")
-                    # Execute
-                    execute_verbose_command(instructions_str)
+                    # Execute the typed steps; the text is only for display (and legacy plans)
+                    task_logs = execute_verbose_command(action_data.get("plan") or instructions_str)
                     tts.speak("Task completed.")
+                    if task_logs.readout is not None:
+                        # Follow-up once OCR is done; the loop doesn't wait for it
+                        task_logs.readout.add_done_callback(lambda f: f.cancelled() or print(f.result()))
                 else:
                     tts.speak("I'm sorry, I couldn't understand what to do.")
             
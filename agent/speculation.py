@@ -0,0 +1,156 @@
+"""
+Speculative intent resolution on streaming ASR partials.
+
+Vosk partial hypotheses are matched against the command whitelist as they
+stabilize. When a stable partial maps to a command with a safe, idempotent
+preparatory step (launching / focusing the target app), that step starts
+before the utterance ends. The final result then commits or cancels it.
+"""
+import time
+import threading
+
+# mapped command -> (prep command sent to the server, prep completes the command)
+PREP_ACTIONS = {
+    "open spotify": ("open Spotify", True),
+    "play hanuman song in spotify": ("open Spotify", False),
+    "open whatsapp": ("open WhatsApp", True),
+    "call vinnu video call": ("open WhatsApp", False),
+}
+
+
+def speech_end(words, audio_secs, captured_at):
+    """
+    Clock time the last recognized word ended. words is a Vosk result list
+    (SetWords(True)) with "end" in seconds of audio; captured_at is when the
+    audio up to audio_secs finished capturing. None without word timings.
+    """
+    if not words:
+        return None
+    return captured_at - max(0.0, audio_secs - words[-1]["end"])
+
+
+class Speculator:
+    """
+    match(text) -> (mapped, score, synonym)   e.g. best_whitelist_match
+    prepare(prep_command)                      runs in a timer thread
+
+    A partial must be seen unchanged stable_partials times before it is
+    trusted; prep fires after delay seconds unless the final result arrives
+    first and disagrees. A prep that already ran is left alone on cancel,
+    which is why only idempotent steps belong in PREP_ACTIONS.
+    With enabled=False nothing is speculated but latencies are still
+    recorded, giving the baseline. Every utterance's timing is in self.history.
+
+    End of speech is the last word's end time passed to on_final, or else the
+    last time the partial changed. Call on_final for every final result, even
+    one that is empty or ignored, so a speculation never outlives its utterance.
+    """
+    def __init__(self, match, prepare, min_score=0.6, stable_partials=2, delay=0.0,
+                 prep_actions=PREP_ACTIONS, clock=time.monotonic, enabled=True):
+        self.enabled = enabled
+        self.match = match
+        self.prepare = prepare
+        self.min_score = min_score
+        self.stable_partials = stable_partials
+        self.delay = delay
+        self.prep_actions = prep_actions
+        self.clock = clock
+        self.history = []
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self._last_partial = None
+        self._seen = 0
+        self._timer = None
+        self._pending = None   # prep command scheduled or fired for this utterance
+        self._prep_at = None   # when prepare() actually ran
+        self._changed_at = None  # when the partial last changed
+
+    def on_partial(self, text, at=None):
+        """at: when the audio that produced this partial was captured (default now)."""
+        text = text.strip()
+        if not text:
+            return None
+        if text == self._last_partial:
+            self._seen += 1
+        else:
+            self._last_partial, self._seen = text, 1
+            self._changed_at = self.clock() if at is None else at
+        if not self.enabled:
+            return None
+        if self._seen < self.stable_partials or self._pending is not None:
+            return None
+
+        mapped, score, _ = self.match(text)
+        if not mapped or score < self.min_score or mapped not in self.prep_actions:
+            return None
+        prep, _ = self.prep_actions[mapped]
+        with self._lock:
+            self._pending = prep
+            self._timer = threading.Timer(self.delay, self._fire, args=(prep,))
+            self._timer.daemon = True
+            self._timer.start()
+        return prep
+
+    def _fire(self, prep):
+        with self._lock:
+            if self._pending != prep: # Cancelled while waiting
+                return
+            self._prep_at = self.clock()
+        self.prepare(prep)
+
+    def on_final(self, mapped, spoken_at=None):
+        """
+        Resolves the speculation against the final mapped command (None if
+        the final text didn't map or was ignored). spoken_at is the end of
+        speech on self.clock, e.g. from speech_end(). Returns a dict with:
+          decision  "commit" | "cancel" | "none"
+          skip_send True if the committed prep already performed the command
+          prep_at / final_at / speech_end timestamps on self.clock
+        """
+        final_at = self.clock()
+        with self._lock:
+            pending, prep_at = self._pending, self._prep_at
+            if spoken_at is None:
+                spoken_at = self._changed_at if self._changed_at is not None else final_at
+            expected = self.prep_actions.get(mapped)
+            if pending is None:
+                decision = "none"
+            elif expected and expected[0] == pending:
+                decision = "commit"
+                if prep_at is None and self._timer is not None:
+                    self._timer.cancel() # Not fired yet; the direct send covers it
+            else:
+                decision = "cancel"
+                if self._timer is not None:
+                    self._timer.cancel()
+            self.reset()
+        return {
+            "decision": decision,
+            "prep": pending,
+            "skip_send": decision == "commit" and prep_at is not None and expected[1],
+            "prep_at": prep_at if decision == "commit" else None,
+            "final_at": final_at,
+            "speech_end": spoken_at,
+        }
+
+    def record_action(self, result, action_at=None):
+        """
+        Logs end-of-speech -> first action for one utterance. The first action
+        is the committed prep if it ran, otherwise the direct send at action_at.
+        Negative when the prep ran before the user finished speaking.
+        """
+        first = result["prep_at"] if result["prep_at"] is not None else action_at
+        if first is None:
+            return None
+        latency = first - result["speech_end"]
+        self.history.append({"decision": result["decision"], "latency": latency})
+        return latency
+
+    def summary(self):
+        by_kind = {}
+        for entry in self.history:
+            kind = "speculative" if entry["decision"] == "commit" else "direct"
+            by_kind.setdefault(kind, []).append(entry["latency"])
+        return {kind: sum(v) / len(v) for kind, v in by_kind.items()}
@@ -2,6 +2,13 @@ import pyautogui
 import time
 import json
 
+try:
+    from executor.settle import wait_for_settle # agent/ is on sys.path in every entry point
+except ImportError:
+    def wait_for_settle(timeout=2.0, fallback=0.5, **kwargs):
+        time.sleep(fallback)
+        return fallback
+
 class ControlBrain:
     def __init__(self):
         print("[Control Brain] Initializing Muscles...")
@@ -40,12 +47,12 @@ class ControlBrain:
             app = action.get("app")
             # Windows Key -> Type -> Enter
             pyautogui.press("win")
-            time.sleep(0.5)
+            wait_for_settle(timeout=1.5, fallback=0.5, expect_change=True)
             pyautogui.write(app)
-            time.sleep(0.5)
+            wait_for_settle(timeout=1.5, fallback=0.5)
             pyautogui.press("enter")
             # Wait for app to open
-            time.sleep(2.0)
+            wait_for_settle(timeout=4.0, fallback=2.0, expect_change=True, change_grace=1.5)
             
         elif kind == "type":
             text = action.get("text")
@@ -1,9 +1,10 @@
-from ai_core.modules.nlu import NLUModule
+from ai_core.modules.nlu_daemon import get_nlu
 
 class KnowledgeBrain:
     def __init__(self):
         print("[Knowledge Brain] Initializing...")
-        self.nlu = NLUModule()
+        # Shared NLU daemon if one is running, else an in-process NLUModule
+        self.nlu = get_nlu()
 
     def think(self, text):
         """
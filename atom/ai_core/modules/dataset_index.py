@@ -0,0 +1,131 @@
+import re
+from collections import Counter
+
+# Words that never change what a command means.
+STOPWORDS = {"the", "a", "an", "please", "kindly", "now", "pls", "plz"}
+NGRAM = 3
+
+
+def normalize_key(text):
+    """Lower-cases, strips punctuation and drops filler words."""
+    text = re.sub(r"[^a-z0-9+\-*/' ]", " ", text.lower())
+    return " ".join(w for w in text.split() if w not in STOPWORDS)
+
+
+def keeps_entities(text, key, entities):
+    """
+    True if a near match of text to key leaves the record's entities intact:
+    every entity word spelled out in key must also be in text. "send hello to
+    tom" is close to "send hello to mom", but the recipient differs.
+    """
+    text_words = set(normalize_key(text).split())
+    key_words = set(normalize_key(key).split())
+    for value in entities.values():
+        if isinstance(value, str) and not (set(normalize_key(value).split()) & key_words) <= text_words:
+            return False
+    return True
+
+
+def keeps_verb(text, key):
+    """
+    True if text and key start with the same command word. The verb carries
+    the action, so it must never be edited into another: "edit notepad" is
+    one letter from "exit notepad", and "lunch chrome" from "launch chrome".
+    """
+    text_words, key_words = normalize_key(text).split(), normalize_key(key).split()
+    return bool(text_words) and bool(key_words) and text_words[0] == key_words[0]
+
+
+def char_ngrams(text, n=NGRAM):
+    padded = f" {text} "
+    return {padded[i:i + n] for i in range(len(padded) - n + 1)}
+
+
+def bounded_levenshtein(a, b, limit):
+    """Edit distance between a and b, or limit + 1 as soon as it must exceed limit."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ca != cb),
+            ))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+class NearMatchIndex:
+    """
+    Approximate lookup over dataset keys.
+    Keys are normalized first (so "open the calculator" hits "open calculator"),
+    then a character trigram inverted index shortlists at most max_candidates
+    keys, which are verified with a bounded edit distance.
+    """
+    def __init__(self, keys=(), max_distance=2, max_candidates=16):
+        self.max_distance = max_distance
+        self.max_candidates = max_candidates
+        self.normalized = {}   # normalized key -> original key
+        self.postings = {}     # trigram -> list of normalized keys
+        for key in keys:
+            self.add(key)
+
+    def add(self, key):
+        norm = normalize_key(key)
+        if not norm or norm in self.normalized:
+            return
+        self.normalized[norm] = key
+        for gram in char_ngrams(norm):
+            self.postings.setdefault(gram, []).append(norm)
+
+    def __len__(self):
+        return len(self.normalized)
+
+    def original(self, norm):
+        """Original key for a normalized key, or None."""
+        return self.normalized.get(norm)
+
+    def shortlist(self, grams, needed, length, limit):
+        """
+        Normalized keys sharing at least `needed` of `grams`, most shared first,
+        at most max_candidates. (length/limit let stored indexes prune by size.)
+        """
+        overlap = Counter()
+        for gram in grams:
+            overlap.update(self.postings.get(gram, ()))
+        for candidate, shared in overlap.most_common(self.max_candidates):
+            if shared < needed:
+                break
+            yield candidate
+
+    def closest(self, text, max_distance=None):
+        """Returns the original key closest to text within max_distance, or None."""
+        norm = normalize_key(text)
+        if not norm:
+            return None
+        exact = self.original(norm)
+        if exact is not None:
+            return exact
+
+        # Short commands tolerate fewer edits ("open x" must not become "close x").
+        limit = self.max_distance if max_distance is None else max_distance
+        limit = min(limit, len(norm) // 4)
+        if limit <= 0:
+            return None
+
+        grams = char_ngrams(norm)
+        # Each edit touches at most NGRAM trigrams.
+        needed = len(grams) - NGRAM * limit
+        best_key, best_dist = None, limit + 1
+        for candidate in self.shortlist(grams, needed, len(norm), limit):
+            dist = bounded_levenshtein(norm, candidate, best_dist - 1)
+            if dist < best_dist:
+                best_key, best_dist = candidate, dist
+                if dist == 1:
+                    break
+        return self.original(best_key) if best_key is not None else None
@@ -0,0 +1,250 @@
+"""
+Compact, lazily loaded store for the NLU dataset.
+
+The JSONL dataset is compiled once into SQLite: one row per distinct command
+key, with intent names and entity dicts interned in their own tables (the
+templated corpus repeats them heavily). Opening the store only opens the file;
+records are decoded the first time they are asked for.
+
+Near-match postings (normalized key -> character trigrams) are built here at
+compile time too, so fuzzy lookups query the file instead of indexing the
+whole corpus in memory.
+
+    python ai_core/modules/dataset_store.py [path/to/dataset.jsonl]
+"""
+import os
+import sys
+import json
+import sqlite3
+import threading
+
+try:
+    from .dataset_index import NearMatchIndex, normalize_key, char_ngrams
+except ImportError:
+    from dataset_index import NearMatchIndex, normalize_key, char_ngrams
+
+# Bump when SCHEMA changes; older stores are recompiled on load.
+STORE_VERSION = 2
+
+SCHEMA = """
+CREATE TABLE intents (id INTEGER PRIMARY KEY, name TEXT UNIQUE NOT NULL);
+CREATE TABLE entity_sets (id INTEGER PRIMARY KEY, json TEXT UNIQUE NOT NULL);
+CREATE TABLE commands (
+    key TEXT PRIMARY KEY,
+    intent_id INTEGER NOT NULL,
+    entity_set_id INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE near_keys (id INTEGER PRIMARY KEY, norm TEXT UNIQUE NOT NULL, key TEXT NOT NULL);
+CREATE TABLE trigrams (
+    gram TEXT NOT NULL,
+    len INTEGER NOT NULL,
+    key_id INTEGER NOT NULL,
+    PRIMARY KEY (gram, len, key_id)
+) WITHOUT ROWID;
+"""
+
+
+def store_path_for(jsonl_path):
+    return os.path.splitext(jsonl_path)[0] + ".sqlite"
+
+
+def store_is_current(store_path):
+    """True if store_path exists and was compiled with this STORE_VERSION."""
+    if not os.path.exists(store_path):
+        return False
+    try:
+        conn = sqlite3.connect(store_path)
+        try:
+            return conn.execute("PRAGMA user_version").fetchone()[0] == STORE_VERSION
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return False
+
+
+def near_rows(keys):
+    """(near_keys rows, trigrams rows) for sorted keys; the first key per normalized form wins."""
+    norms = {}
+    for key in keys:
+        norm = normalize_key(key)
+        if norm and norm not in norms:
+            norms[norm] = (len(norms), key)
+    key_rows = [(i, norm, key) for norm, (i, key) in norms.items()]
+    gram_rows = [(gram, len(norm), i) for i, norm, _ in key_rows for gram in char_ngrams(norm)]
+    return key_rows, gram_rows
+
+
+def compile_dataset(jsonl_path, store_path=None):
+    """Compiles a JSONL dataset into the SQLite store. Returns the store path."""
+    store_path = store_path or store_path_for(jsonl_path)
+    tmp_path = store_path + ".tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    intents, entity_sets, commands = {}, {}, {}
+    with open(jsonl_path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip(): continue
+            try:
+                record = json.loads(line)
+                key = record["text"].lower().strip()
+            except (ValueError, KeyError):
+                continue
+            intent_id = intents.setdefault(record.get("intent"), len(intents))
+            entities = json.dumps(record.get("entities", {}), sort_keys=True)
+            entity_set_id = entity_sets.setdefault(entities, len(entity_sets))
+            # Later records win, as they did in the in-memory dict.
+            commands[key] = (intent_id, entity_set_id)
+
+    conn = sqlite3.connect(tmp_path)
+    try:
+        conn.executescript(SCHEMA)
+        conn.executemany("INSERT INTO intents VALUES (?, ?)", ((i, n) for n, i in intents.items()))
+        conn.executemany("INSERT INTO entity_sets VALUES (?, ?)", ((i, j) for j, i in entity_sets.items()))
+        conn.executemany("INSERT INTO commands VALUES (?, ?, ?)",
+                         ((k, i, e) for k, (i, e) in sorted(commands.items())))
+        key_rows, gram_rows = near_rows(sorted(commands))
+        conn.executemany("INSERT INTO near_keys VALUES (?, ?, ?)", key_rows)
+        conn.executemany("INSERT INTO trigrams VALUES (?, ?, ?)", gram_rows)
+        conn.execute(f"PRAGMA user_version = {STORE_VERSION}")
+        conn.commit()
+        conn.execute("VACUUM")
+    finally:
+        conn.close()
+    os.replace(tmp_path, store_path)
+    print(f"[NLU] Compiled {len(commands)} commands into {store_path}")
+    return store_path
+
+
+class DatasetStore:
+    """
+    Read-only, dict-like view of a compiled dataset.
+    Only the small intent table is read up front; command records are fetched
+    and decoded on demand and kept once queried.
+    """
+    def __init__(self, store_path):
+        self.store_path = store_path
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+        self._records = {}
+        self._misses = set()
+        self._entity_sets = {}
+        self._len = None
+        conn = self._connection()
+        self._intents = dict(conn.execute("SELECT id, name FROM intents"))
+
+    def _connection(self):
+        # SQLite handles must not cross fork(); reopen in child processes.
+        if self._conn is None or self._pid != os.getpid():
+            uri = "file:" + os.path.abspath(self.store_path).replace("\\", "/") + "?mode=ro"
+            self._conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+            self._pid = os.getpid()
+        return self._conn
+
+    def _entities(self, conn, entity_set_id):
+        entities = self._entity_sets.get(entity_set_id)
+        if entities is None:
+            row = conn.execute("SELECT json FROM entity_sets WHERE id = ?", (entity_set_id,)).fetchone()
+            entities = self._entity_sets[entity_set_id] = json.loads(row[0])
+        return entities
+
+    def get(self, key, default=None):
+        record = self._records.get(key)
+        if record is not None:
+            return record
+        if key in self._misses:
+            return default
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute("SELECT intent_id, entity_set_id FROM commands WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                # Bounded so junk input can't grow memory without limit.
+                if len(self._misses) < 10000:
+                    self._misses.add(key)
+                return default
+            record = {
+                "text": key,
+                "intent": self._intents[row[0]],
+                # Copy so callers can't mutate the interned dict.
+                "entities": dict(self._entities(conn, row[1])),
+            }
+            self._records[key] = record
+            return record
+
+    def __getitem__(self, key):
+        record = self.get(key)
+        if record is None:
+            raise KeyError(key)
+        return record
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def __len__(self):
+        if self._len is None:
+            with self._lock:
+                self._len = self._connection().execute("SELECT COUNT(*) FROM commands").fetchone()[0]
+        return self._len
+
+    def __iter__(self):
+        with self._lock:
+            keys = [row[0] for row in self._connection().execute("SELECT key FROM commands")]
+        return iter(keys)
+
+    def keys(self):
+        return iter(self)
+
+    def near_key(self, norm):
+        """Original key for a normalized key, or None."""
+        with self._lock:
+            row = self._connection().execute("SELECT key FROM near_keys WHERE norm = ?", (norm,)).fetchone()
+        return row[0] if row else None
+
+    def near_count(self):
+        with self._lock:
+            return self._connection().execute("SELECT COUNT(*) FROM near_keys").fetchone()[0]
+
+    def near_candidates(self, grams, needed, min_len, max_len, limit):
+        """Normalized keys of length min_len..max_len sharing at least `needed` of grams, most shared first."""
+        grams = list(grams)
+        query = (
+            "SELECT near_keys.norm FROM ("
+            "  SELECT key_id, COUNT(*) AS shared FROM trigrams"
+            f"  WHERE gram IN ({','.join('?' * len(grams))}) AND len BETWEEN ? AND ?"
+            "  GROUP BY key_id HAVING shared >= ? ORDER BY shared DESC, key_id LIMIT ?"
+            ") AS hits JOIN near_keys ON near_keys.id = hits.key_id ORDER BY hits.shared DESC, hits.key_id"
+        )
+        with self._lock:
+            rows = self._connection().execute(query, grams + [min_len, max_len, needed, limit]).fetchall()
+        return [row[0] for row in rows]
+
+
+class StoredNearMatchIndex(NearMatchIndex):
+    """
+    NearMatchIndex answered from a compiled store's trigram table.
+    Nothing is indexed in memory; each lookup is one exact query and, on a
+    miss, one GROUP BY over the query's trigrams restricted to keys whose
+    length is within the edit budget.
+    """
+    def __init__(self, store, max_distance=2, max_candidates=16):
+        super().__init__(max_distance=max_distance, max_candidates=max_candidates)
+        self.store = store
+
+    def __len__(self):
+        return self.store.near_count()
+
+    def add(self, key):
+        raise TypeError("StoredNearMatchIndex is read-only; recompile the store instead")
+
+    def original(self, norm):
+        return self.store.near_key(norm)
+
+    def shortlist(self, grams, needed, length, limit):
+        return self.store.near_candidates(grams, max(needed, 1), length - limit, length + limit,
+                                          self.max_candidates)
+
+
+if __name__ == "__main__":
+    default_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "data", "nlu", "nlu_dataset_50k.jsonl")
+    compile_dataset(sys.argv[1] if len(sys.argv) > 1 else default_path)
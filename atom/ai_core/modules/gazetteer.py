@@ -0,0 +1,271 @@
+import os
+import json
+import time
+import threading
+from collections import namedtuple
+
+# Optional override / extension file: {"app": ["spotify", {"name": "vs code", "canonical": "code"}], ...}
+GAZETTEER_PATH = os.environ.get(
+    "ATOM_GAZETTEER",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "data", "gazetteer", "gazetteer.json"),
+)
+
+DEFAULT_ENTRIES = {
+    "app": [
+        "notepad", "calculator", "spotify", "chrome", "edge", "discord",
+        "slack", "files", "settings", "camera", "word", "excel", "powerpoint",
+        "explorer", "terminal", "cmd", "paint", "vlc", "code",
+        "whatsapp", "youtube", "telegram", "calendar", "instagram", "gpay",
+        {"name": "google chrome", "canonical": "chrome"},
+        {"name": "vs code", "canonical": "code"},
+        {"name": "visual studio code", "canonical": "code"},
+        {"name": "file explorer", "canonical": "explorer"},
+    ],
+    "contact": ["siddu", "rahul", "mom", "dad", "alex", "sarah", "vinnu"],
+    "song": [
+        "baby", "believer", "shape of you", "faded", "despacito",
+        "blinding lights", "levitating", "don't start now",
+    ],
+}
+
+END = "" # Trie key holding the entries that end at a node; never a token
+
+Span = namedtuple("Span", "start end kind value surface edits")
+
+
+def tolerance(token):
+    """Edits allowed for a token: short words must match exactly."""
+    if len(token) < 4:
+        return 0
+    return 1 if len(token) < 8 else 2
+
+
+def short_tolerance(token):
+    """Edits allowed when a whole phrase must name one entry: 3-char names take 1 ("cmdd" -> cmd)."""
+    return max(tolerance(token), 1 if len(token) >= 3 else 0)
+
+
+def name_at(words, spans, start, end):
+    """Canonical value if a span covers words[start:end] exactly, else those words as typed."""
+    span = spans.get(start)
+    if span and span.end == end:
+        return span.value
+    return " ".join(words[start:end])
+
+
+def name_from(words, spans, start, stop="on"):
+    """Known entity starting at words[start], else the words up to stop ("mom on whatsapp" -> mom)."""
+    span = spans.get(start)
+    if span:
+        return span.value
+    end = find_word(words, stop, start)
+    return " ".join(words[start:end])
+
+
+def find_word(words, word, start=0, last=False):
+    """Index of word in words[start:] (the last one if last), else None."""
+    hits = [i for i in range(start, len(words)) if words[i].lower() == word]
+    if not hits:
+        return None
+    return hits[-1] if last else hits[0]
+
+
+def deletes(word, depth):
+    """word plus every string reachable by deleting up to depth characters."""
+    found = {word}
+    frontier = {word}
+    for _ in range(depth):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+        found |= frontier
+    return found
+
+
+def osa_distance(a, b, limit):
+    """Optimal string alignment distance (adjacent swaps count 1), or limit + 1 beyond limit."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    prev2, prev = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        cur = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (a[i - 1] != b[j - 1]))
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                cur[j] = min(cur[j], prev2[j - 2] + 1)
+        if min(cur) > limit:
+            return limit + 1
+        prev2, prev = prev, cur
+    return prev[-1]
+
+
+class _Index:
+    """Immutable build of one gazetteer snapshot: the token trie plus the typo index."""
+    def __init__(self, entries):
+        self.trie = {}
+        self.vocab = set()
+        self.typo_index = {} # deletion variant -> vocab tokens
+        self.size = 0
+        for kind, names in entries.items():
+            for entry in names:
+                name, canonical = (entry, entry) if isinstance(entry, str) else (entry["name"], entry.get("canonical", entry["name"]))
+                tokens = name.lower().split()
+                if not tokens:
+                    continue
+                node = self.trie
+                for tok in tokens:
+                    node = node.setdefault(tok, {})
+                node.setdefault(END, []).append((kind, canonical))
+                self.vocab.update(tokens)
+                self.size += 1
+        for tok in self.vocab:
+            for variant in deletes(tok, short_tolerance(tok)):
+                self.typo_index.setdefault(variant, set()).add(tok)
+
+    def token_matches(self, token, tol=tolerance):
+        """Vocab tokens token may stand for, with their edit counts."""
+        if token in self.vocab:
+            return {token: 0}
+        limit = tol(token)
+        if not limit:
+            return {}
+        matches = {}
+        for variant in deletes(token, limit):
+            for candidate in self.typo_index.get(variant, ()):
+                if candidate in matches:
+                    continue
+                allowed = min(limit, tol(candidate))
+                dist = osa_distance(token, candidate, allowed)
+                if dist <= allowed:
+                    matches[candidate] = dist
+        return matches
+
+
+class Gazetteer:
+    """
+    Token trie over known apps, contacts and songs.
+    spot() walks the utterance once, left to right, taking the longest entry
+    starting at each token (fewest typos on ties). Tokens are matched exactly
+    or, via a deletion-variant index, within 1 edit (4-7 chars) or 2 edits
+    (8+ chars), so lookups cost the same whatever the gazetteer size.
+    reload() rebuilds off to the side and swaps the snapshot in atomically.
+    """
+    def __init__(self, entries=None, path=None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._base = entries if entries is not None else DEFAULT_ENTRIES
+        self._mtime = None
+        self._checked = 0.0
+        self._index = self._build()
+
+    def _build(self):
+        entries = {kind: list(names) for kind, names in self._base.items()}
+        if self.path and os.path.exists(self.path):
+            with open(self.path, "r", encoding="utf-8") as f:
+                for kind, names in json.load(f).items():
+                    entries.setdefault(kind, []).extend(names)
+            self._mtime = os.path.getmtime(self.path)
+        return _Index(entries)
+
+    def __len__(self):
+        return self._index.size
+
+    def vocabulary(self):
+        """Every token of every entry name (base entries plus the gazetteer file)."""
+        return set(self._index.vocab)
+
+    def reload(self, entries=None):
+        """Rebuilds from the base entries (replaced if given) plus the gazetteer file."""
+        with self._lock:
+            if entries is not None:
+                self._base = entries
+            self._index = self._build()
+        print(f"[Gazetteer] Loaded {len(self)} entries")
+
+    def reload_if_changed(self, min_interval=2.0):
+        """Picks up edits to the gazetteer file; stats it at most every min_interval seconds."""
+        now = time.monotonic()
+        if not self.path or now - self._checked < min_interval:
+            return False
+        self._checked = now
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return False
+        if mtime == self._mtime:
+            return False
+        self.reload()
+        return True
+
+    def spot(self, text, kinds=None):
+        """Returns non-overlapping Spans for every known entity in text."""
+        index = self._index # One snapshot per call, even if a reload lands meanwhile
+        tokens = text.lower().split()
+        options = [index.token_matches(tok) for tok in tokens]
+        spans, i = [], 0
+        while i < len(tokens):
+            best = None
+            frontier, j = [(index.trie, 0)], i
+            while frontier and j < len(tokens):
+                frontier = [
+                    (node[tok], edits + cost)
+                    for node, edits in frontier
+                    for tok, cost in options[j].items() if tok in node
+                ]
+                j += 1
+                for node, edits in frontier:
+                    for kind, value in node.get(END, ()):
+                        if kinds and kind not in kinds:
+                            continue
+                        if best is None or (j - i, -edits) > (best.end - best.start, -best.edits):
+                            best = Span(i, j, kind, value, " ".join(tokens[i:j]), edits)
+            if best:
+                spans.append(best)
+                i = best.end
+            else:
+                i += 1
+        return spans
+
+    def spans_by_start(self, text, kinds=None):
+        """One spot() pass as {start token: Span}, for extractors slicing the utterance."""
+        return {span.start: span for span in self.spot(text, kinds)}
+
+    def lookup(self, phrase, kind):
+        """Canonical entry of the given kind that phrase names as a whole, else None."""
+        spans = self.spot(phrase, kinds={kind})
+        n = len(phrase.split())
+        if len(spans) == 1 and spans[0].start == 0 and spans[0].end == n:
+            return spans[0].value
+        return None
+
+    def resolve(self, phrase, kind):
+        """
+        Canonical entry of the given kind named somewhere in phrase: the longest
+        span ("open the paint" -> paint, "notepad app" -> notepad), or for a
+        one-word phrase, a single-word entry within the looser short-name
+        tolerance ("cmdd" -> cmd). None if nothing matches.
+        """
+        spans = self.spot(phrase, kinds={kind})
+        if spans:
+            return max(spans, key=lambda s: (s.end - s.start, -s.edits)).value
+        tokens = phrase.lower().split()
+        if len(tokens) != 1:
+            return None
+        index = self._index
+        matches = index.token_matches(tokens[0], tol=short_tolerance)
+        for tok in sorted(matches, key=lambda t: (matches[t], t)):
+            for entry_kind, value in index.trie.get(tok, {}).get(END, ()):
+                if entry_kind == kind:
+                    return value
+        return None
+
+
+_instance = None
+_instance_lock = threading.Lock()
+
+
+def get_gazetteer(path=GAZETTEER_PATH):
+    """Returns the process-wide Gazetteer (built once, shared by every intent)."""
+    global _instance
+    with _instance_lock:
+        if _instance is None:
+            _instance = Gazetteer(path=path)
+        return _instance
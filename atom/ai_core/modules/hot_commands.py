@@ -0,0 +1,177 @@
+import os
+import json
+import time
+import atexit
+import threading
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "data")
+REQUEST_LOG_PATH = os.environ.get("ATOM_REQUEST_LOG", os.path.join(DATA_DIR, "logs", "requests.jsonl"))
+HOT_COMMANDS_PATH = os.environ.get("ATOM_HOT_COMMANDS", os.path.join(DATA_DIR, "nlu", "hot_commands.json"))
+
+
+def normalize_command(text):
+    """Table key: lowercase, single spaces, no surrounding punctuation."""
+    return " ".join(text.lower().split()).strip(" .,!?")
+
+
+class RequestLog:
+    """
+    Append-only JSONL log of incoming commands.
+    Records are buffered and written in batches (every batch_size records or
+    flush_interval seconds, whichever comes first) by one background thread,
+    so logging never puts file I/O on the request path.
+    """
+    def __init__(self, path=REQUEST_LOG_PATH, batch_size=32, flush_interval=2.0):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def log(self, text, **fields):
+        record = {"ts": round(time.time(), 3), "text": text}
+        record.update(fields)
+        with self._lock:
+            self._buffer.append(record)
+            full = len(self._buffer) >= self.batch_size
+        if full:
+            self._wake.set()
+
+    def flush(self):
+        with self._lock:
+            batch, self._buffer = self._buffer, []
+        if not batch:
+            return 0
+        lines = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in batch)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(lines)
+        return len(batch)
+
+    def _run(self):
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except OSError as e:
+                print(f"[RequestLog] Write failed: {e}")
+
+    def close(self):
+        if not self._closed:
+            self._closed = True
+            self._wake.set()
+            self._thread.join(timeout=5)
+            self.flush()
+
+
+class HotCommandTable:
+    """
+    Precomputed (instruction, action_data) for the most frequent commands,
+    mined offline from the request log (scripts/mine_hot_commands.py).
+    reload_if_changed() swaps in a re-mined table without a restart.
+    """
+    def __init__(self, path=HOT_COMMANDS_PATH):
+        self.path = path
+        self._table = {}
+        self._mtime = None
+        self._checked = 0.0
+        self.reload()
+
+    def __len__(self):
+        return len(self._table)
+
+    def reload(self):
+        table = {}
+        mtime = None
+        if self.path and os.path.exists(self.path):
+            try:
+                mtime = os.path.getmtime(self.path)
+                with open(self.path, "r", encoding="utf-8") as f:
+                    for key, entry in json.load(f).get("commands", {}).items():
+                        table[key] = (entry["instruction"], entry["action"])
+            except (OSError, ValueError, KeyError) as e:
+                print(f"[HotCommands] Could not read {self.path}: {e}")
+                return
+        self._table = table # Atomic swap; readers keep whichever dict they already hold
+        self._mtime = mtime
+
+    def reload_if_changed(self, min_interval=2.0):
+        """Stats the table file at most every min_interval seconds; True if it was reloaded."""
+        now = time.monotonic()
+        if not self.path or now - self._checked < min_interval:
+            return False
+        self._checked = now
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            mtime = None
+        if mtime == self._mtime:
+            return False
+        self.reload()
+        print(f"[HotCommands] Loaded {len(self)} commands")
+        return True
+
+    def get(self, text):
+        """(instruction, action_data copy) for a hot command, else None."""
+        entry = self._table.get(normalize_command(text))
+        if entry is None:
+            return None
+        return entry[0], dict(entry[1])
+
+
+def mine(log_paths, nlu, top_n=200, min_count=3):
+    """
+    Counts normalized commands across the request logs and resolves the top_n
+    (seen at least min_count times) through nlu, which should not itself use
+    the hot table. Volatile intents (time, date) and unknowns are left out.
+    """
+    counts = {}
+    for path in log_paths:
+        if not os.path.exists(path):
+            continue
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    text = json.loads(line)["text"]
+                except (ValueError, KeyError, TypeError):
+                    continue # Torn or foreign line
+                key = normalize_command(text or "")
+                if key:
+                    counts[key] = counts.get(key, 0) + 1
+
+    commands = {}
+    ranked = sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+    for key, count in ranked:
+        if len(commands) >= top_n or count < min_count:
+            break
+        intent, (instruction, action) = nlu.predict_uncached(key)
+        if (intent is not None and intent.volatile) or action.get("action") == "unknown":
+            continue
+        commands[key] = {"count": count, "instruction": instruction, "action": action}
+    return {"generated_at": time.time(), "requests": sum(counts.values()), "commands": commands}
+
+
+def write_table(table, path=HOT_COMMANDS_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(table, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path) # Readers never see a half-written table
+
+
+_tables = {}
+_tables_lock = threading.Lock()
+
+
+def get_hot_commands(path=HOT_COMMANDS_PATH):
+    """Process-wide HotCommandTable for path."""
+    with _tables_lock:
+        if path not in _tables:
+            _tables[path] = HotCommandTable(path)
+        return _tables[path]
@@ -0,0 +1,114 @@
+import json
+import time
+import threading
+from contextlib import contextmanager, nullcontext
+
+# Bucket upper bounds in microseconds: 1us, 2us, 4us ... ~8.4s
+BUCKET_BOUNDS_US = [2 ** i for i in range(24)]
+_NO_STAGE = nullcontext()
+
+
+class LatencyHistogram:
+    """Log2-bucketed latency histogram. Percentiles are bucket upper bounds."""
+    def __init__(self):
+        self.buckets = [0] * (len(BUCKET_BOUNDS_US) + 1)
+        self.count = 0
+        self.total_us = 0.0
+        self.min_us = None
+        self.max_us = 0.0
+
+    def add(self, seconds):
+        us = seconds * 1e6
+        self.count += 1
+        self.total_us += us
+        self.min_us = us if self.min_us is None else min(self.min_us, us)
+        self.max_us = max(self.max_us, us)
+        for i, bound in enumerate(BUCKET_BOUNDS_US):
+            if us <= bound:
+                self.buckets[i] += 1
+                return
+        self.buckets[-1] += 1
+
+    def percentile(self, p):
+        if not self.count:
+            return 0.0
+        target = p / 100.0 * self.count
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if seen >= target:
+                return float(BUCKET_BOUNDS_US[i]) if i < len(BUCKET_BOUNDS_US) else self.max_us
+        return self.max_us
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "mean_us": self.total_us / self.count if self.count else 0.0,
+            "min_us": self.min_us or 0.0,
+            "max_us": self.max_us,
+            "p50_us": self.percentile(50),
+            "p95_us": self.percentile(95),
+            "p99_us": self.percentile(99),
+            "buckets": {f"le_{bound}us": n for bound, n in zip(BUCKET_BOUNDS_US, self.buckets) if n},
+            "overflow": self.buckets[-1],
+        }
+
+
+class Profiler:
+    """
+    Opt-in timing surface for the NLU pipeline.
+    Collects a latency histogram per stage plus match/miss counters, and can
+    be read with snapshot() or written out with dump_json().
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stages = {}
+        self.counters = {}
+
+    def record(self, name, seconds):
+        with self._lock:
+            hist = self.stages.get(name)
+            if hist is None:
+                hist = self.stages[name] = LatencyHistogram()
+            hist.add(seconds)
+
+    def count(self, name, matched):
+        with self._lock:
+            counter = self.counters.setdefault(name, {"match": 0, "miss": 0})
+            counter["match" if matched else "miss"] += 1
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def reset(self):
+        with self._lock:
+            self.stages.clear()
+            self.counters.clear()
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "stages": {name: hist.to_dict() for name, hist in self.stages.items()},
+                "counters": {name: dict(c) for name, c in self.counters.items()},
+            }
+
+    def hot_stages(self, top=5):
+        """Stages sorted by total time spent, largest first."""
+        with self._lock:
+            ranked = sorted(self.stages.items(), key=lambda kv: kv[1].total_us, reverse=True)
+            return [(name, hist.total_us / 1000.0) for name, hist in ranked[:top]]
+
+    def dump_json(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, indent=2)
+        return path
+
+
+def stage(profiler, name):
+    """Times a stage if profiling is on; a shared no-op context otherwise."""
+    return profiler.stage(name) if profiler is not None else _NO_STAGE
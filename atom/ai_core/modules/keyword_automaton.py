@@ -0,0 +1,88 @@
+import re
+import string
+
+ALPHABET = string.ascii_lowercase
+
+
+def edit_distance_one(word):
+    """Returns every string within one delete/transpose/replace/insert of word."""
+    splits = [(word[:i], word[i:]) for i in range(len(word) + 1)]
+    deletes = [a + b[1:] for a, b in splits if b]
+    transposes = [a + b[1] + b[0] + b[2:] for a, b in splits if len(b) > 1]
+    replaces = [a + c + b[1:] for a, b in splits if b for c in ALPHABET]
+    inserts = [a + c + b for a, b in splits for c in ALPHABET]
+    return set(deletes + transposes + replaces + inserts)
+
+
+class KeywordAutomaton:
+    """
+    Multi-pattern keyword matcher.
+    All keywords are folded into a trie, and the trie is compiled once into a
+    single factored regex. Scanning a text is one C-level pass that reports, at
+    each position, the longest keyword starting there; every shorter keyword at
+    that position is a prefix of it, so its payloads are precomputed.
+    Typo keywords are expanded to their edit-distance-1 neighbourhood and
+    matched against whole tokens with a dict lookup.
+    """
+    def __init__(self):
+        self.trie = {}
+        self.payloads = {}       # keyword -> set of payloads
+        self.closure = {}        # keyword -> payloads of all its keyword prefixes
+        self.typo_index = {}     # neighbour word -> set of payloads
+        self.pattern = None
+
+    def add(self, keyword, payload):
+        node = self.trie
+        for ch in keyword:
+            node = node.setdefault(ch, {})
+        node[""] = True
+        self.payloads.setdefault(keyword, set()).add(payload)
+        self.pattern = None
+
+    def add_typo(self, word, payload):
+        for variant in edit_distance_one(word) | {word}:
+            self.typo_index.setdefault(variant, set()).add(payload)
+
+    def compile(self):
+        self.closure = {}
+        for keyword in self.payloads:
+            found = set()
+            for other, payloads in self.payloads.items():
+                if keyword.startswith(other):
+                    found |= payloads
+            self.closure[keyword] = frozenset(found)
+        body = self._to_regex(self.trie) if self.trie else "(?!)"
+        self.pattern = re.compile(f"(?=({body}))")
+        return self
+
+    def _to_regex(self, node):
+        # Longest alternatives first so the leftmost match is the longest keyword.
+        branches = []
+        for ch in sorted(k for k in node if k):
+            branches.append(re.escape(ch) + self._to_regex(node[ch]))
+        if not branches:
+            return ""
+        if len(branches) == 1 and "" not in node:
+            return branches[0]
+        group = "(?:" + "|".join(branches) + ")"
+        return group + "?" if "" in node else group
+
+    def scan(self, text):
+        """Returns the set of payloads whose keyword occurs anywhere in text."""
+        if self.pattern is None:
+            self.compile()
+        hits = set()
+        for keyword in self.pattern.findall(text):
+            hits |= self.closure[keyword]
+        return hits
+
+    def scan_typos(self, text):
+        """Returns the set of payloads with a token within one edit of a typo keyword."""
+        hits = set()
+        if not self.typo_index:
+            return hits
+        for token in text.split():
+            payloads = self.typo_index.get(token)
+            if payloads:
+                hits |= payloads
+        return hits
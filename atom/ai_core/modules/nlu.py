@@ -1,5 +1,7 @@
 import json
+import os
 import re
+import sys
 try:
     from transformers import T5ForConditionalGeneration, T5Tokenizer
     import torch
@@ -8,91 +10,180 @@ except ImportError:
     T5ForConditionalGeneration = None
     T5Tokenizer = None
 
+# atom/ root, so models.nlu is importable however this module was loaded
+ATOM_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if ATOM_ROOT not in sys.path:
+    sys.path.append(ATOM_ROOT)
+
 try:
-    from symspellpy import SymSpell
-    import pkg_resources
+    from .spell_index import SymSpell, get_sym_spell
 except ImportError:
+    from spell_index import SymSpell, get_sym_spell
+
+if SymSpell is None:
     print("Warning: symspellpy not found. Spelling correction disabled.")
-    SymSpell = None
+
+try:
+    from .keyword_automaton import KeywordAutomaton, edit_distance_one
+except ImportError:
+    from keyword_automaton import KeywordAutomaton, edit_distance_one
+
+try:
+    from .dataset_index import NearMatchIndex, keeps_entities, keeps_verb, normalize_key
+except ImportError:
+    from dataset_index import NearMatchIndex, keeps_entities, keeps_verb, normalize_key
+
+try:
+    from .dataset_store import DatasetStore, StoredNearMatchIndex, compile_dataset, store_is_current, store_path_for
+except ImportError:
+    from dataset_store import DatasetStore, StoredNearMatchIndex, compile_dataset, store_is_current, store_path_for
+
+try:
+    from .result_cache import LRUCache
+except ImportError:
+    from result_cache import LRUCache
+
+try:
+    from .instrumentation import Profiler, stage
+except ImportError:
+    from instrumentation import Profiler, stage
+
+try:
+    from .gazetteer import get_gazetteer, find_word, name_at, name_from
+except ImportError:
+    from gazetteer import get_gazetteer, find_word, name_at, name_from
+
+try:
+    from .slot_speller import SlotAwareSpeller
+except ImportError:
+    from slot_speller import SlotAwareSpeller
+
+try:
+    from .hot_commands import get_hot_commands
+except ImportError:
+    from hot_commands import get_hot_commands
+
+try:
+    from . import plan as P
+except ImportError:
+    import plan as P
 
 # --- Base Intent Class ---
 class Intent:
+    # Trigger substrings. Every match() must require at least one of them,
+    # so the router can use them as a prefilter.
+    keywords = []
+    # Whole words that also match with a single typo ("musi" -> "music").
+    typo_keywords = []
+    # Results depend on time or system state and must never be cached.
+    volatile = False
+
     def __init__(self, name):
         self.name = name
+        self.typo_variants = set()
+        for word in self.typo_keywords:
+            self.typo_variants |= edit_distance_one(word) | {word}
 
     def match(self, text):
         """Returns True if this intent matches the text."""
-        raise NotImplementedError
+        if any(k in text for k in self.keywords):
+            return True
+        return bool(self.typo_variants) and any(t in self.typo_variants for t in text.split())
 
     def extract(self, text):
         """Returns (instruction_string, json_data_dict)."""
         raise NotImplementedError
 
-    def generate_verbose_instruction(self, app, action_type, target, secondary_target=None):
-        """Helper to generate the specific verbose instruction format."""
+    def verbose_plan(self, app, action_type, target, secondary_target=None):
+        """Typed steps for the standard "open app, search, act" flow."""
+        find = [P.Step(P.FOCUS_SEARCH), P.Step(P.TYPE, target)]
         # Clean Universal Plan (Relies on platform_open_app in Executor)
         if action_type == "play":
-            action_desc = f"navigate to search bar then typr {target} then click on the song then play the song"
+            steps = find + [P.Step(P.CLICK, "the song"), P.Step(P.PLAY_RESULT)]
         elif action_type == "message":
-            action_desc = f"navigate to search bar then typr {target} then click on {target} then click on message bar then typr {secondary_target} then click on send"
+            steps = find + [P.Step(P.CLICK, target), P.Step(P.CLICK, "message bar"),
+                            P.Step(P.TYPE, secondary_target), P.Step(P.CLICK, "send")]
         elif action_type == "search":
-             action_desc = f"navigate to search bar then typr {target} then click on search"
+            steps = find + [P.Step(P.CLICK_SEARCH)]
         elif action_type == "call":
-            action_desc = f"navigate to search bar then typr {target} then click on {target} then click call"
+            steps = find + [P.Step(P.CLICK, target), P.Step(P.RAW, "click call")]
         elif action_type == "video_call":
-            action_desc = f"navigate to search bar then typr {target} then click on {target} then click on video call"
+            steps = find + [P.Step(P.CLICK, target), P.Step(P.CLICK, "video call")]
         elif action_type == "order":
-            action_desc = f"navigate to search bar then typr {target} then click on {target} then click order"
+            steps = find + [P.Step(P.CLICK, target), P.Step(P.RAW, "click order")]
         elif action_type == "pay":
-            action_desc = f"navigate to search bar then typr {target} then click on {target} then click pay then typr {secondary_target} then click pay"
+            steps = find + [P.Step(P.CLICK, target), P.Step(P.RAW, "click pay"),
+                            P.Step(P.TYPE, secondary_target), P.Step(P.RAW, "click pay")]
         elif action_type == "navigate":
-            action_desc = f"navigate to search bar then typr {target} then click on {target} then start navigation"
+            steps = find + [P.Step(P.CLICK, target), P.Step(P.RAW, "start navigation")]
         elif action_type == "open":
-            action_desc = "" # Just open
+            steps = [] # Just open
         else:
-            action_desc = f"perform action on {target}"
+            steps = [P.Step(P.RAW, f"perform action on {target}")]
 
         # Logic: "Open App" is sufficient for Executor to handle platform specifics
-        if action_desc:
-             return f"open {app} then {action_desc}"
-        else:
-             return f"open {app}"
+        return [P.Step(P.OPEN_APP, app)] + steps
+
+    def generate_verbose_instruction(self, app, action_type, target, secondary_target=None):
+        """Helper to generate the specific verbose instruction format."""
+        return P.plan_text(self.verbose_plan(app, action_type, target, secondary_target))
 
 # --- Specific Intents ---
 
+# "on" followed by one of these is part of a title ("rain on me"), not "on <player>"
+TITLE_PRONOUNS = {"me", "you", "us", "it", "him", "her", "them", "my", "your", "our", "his", "their"}
+
 class MusicIntent(Intent):
+    keywords = ["play", "listen to", "open spotify", "open youtube", "music", "song"]
+    typo_keywords = ["music"]
+
     def __init__(self):
         super().__init__("PlayMusic")
-        
-    def match(self, text):
-        return any(k in text for k in ["play", "listen to", "open spotify", "open youtube", "music", "song", "musi", "musc"])
+        self.gazetteer = get_gazetteer()
 
     def extract(self, text):
-        # 1. YouTube Specific
-        yt_play = re.search(r"(?:play|listen to) (.+) on youtube", text, re.IGNORECASE)
-        yt_open = re.search(r"open youtube and (?:play|listen to) (.+)", text, re.IGNORECASE)
-        
-        if yt_play or yt_open:
-            query = yt_play.group(1).strip() if yt_play else yt_open.group(1).strip()
-            return (
-                self.generate_verbose_instruction("YouTube", "play", query),
-                {"action": "play_music", "app": "YouTube", "query": query}
-            )
+        words = text.split()
+        lower = [w.lower() for w in words]
+        # One gazetteer pass: player apps and known songs, by token position
+        spans = self.gazetteer.spans_by_start(text, kinds={"app", "song"})
+
+        # The song slot starts after "play" / "listen to"...
+        start = find_word(lower, "play")
+        listen = find_word(lower, "listen")
+        if listen is not None and lower[listen + 1:listen + 2] == ["to"] and (start is None or listen < start):
+            start = listen + 1
+        if start is not None:
+            start += 1
+
+        # ...and ends at "on <app>" ("play X on spotifi"); "open youtube and play X" names the app up front
+        app, end = None, len(words)
+        if start is not None:
+            for span in spans.values():
+                if span.kind != "app" or not span.start:
+                    continue
+                before = lower[span.start - 1]
+                if before == "on" and span.start > start:
+                    app, end = span.value, span.start - 1
+                elif before == "open" and span.end < start:
+                    app = span.value
 
-        # 2. Spotify/Generic
-        spot_play = re.search(r"(?:play|listen to) (.+) on spotify", text, re.IGNORECASE)
-        spot_open = re.search(r"open spotify and (?:play|listen to) (.+)", text, re.IGNORECASE)
-        
-        # Generic "play X" (Assumes Spotify/Music app)
-        generic_play = re.search(r"(?:play|listen to) (.+)$", text, re.IGNORECASE)
-        
         song = ""
-        if spot_play: song = spot_play.group(1).strip()
-        elif spot_open: song = spot_open.group(1).strip()
-        elif generic_play:
-             potential_song = generic_play.group(1).strip()
-             if " on " not in potential_song:
-                 song = potential_song
+        if start is not None:
+            songs = {i: sp for i, sp in spans.items() if sp.kind == "song"}
+            on = find_word(lower, "on", start, last=True)
+            known = songs.get(start)
+            if (app is None and on is not None and start < on < len(words) - 1
+                    and lower[on + 1] not in TITLE_PRONOUNS and not (known and known.end > on)):
+                # "play X on <player we don't know>" still names a player, not part of the song
+                app, end = " ".join(lower[on + 1:]), on
+            song = name_at(words, songs, start, end).strip()
+            if app == "youtube" and song:
+                return (
+                    self.generate_verbose_instruction("YouTube", "play", song),
+                    {"action": "play_music", "app": "YouTube", "query": song}
+                )
+            if app not in (None, "spotify"):
+                song = "" # Another player named: play music generically, as before
 
         # Fix for "play song", "play sond", "play music" -> Generic Play/Resume
         # ALSO Handle standalone "music", "song" AND TYPOS "musi"
@@ -140,42 +231,88 @@ class IntentRouter:
             ScreenActionIntent(), # [NEW] Visual Actions
             GenericActionIntent() 
         ]
-
-    def parse(self, text):
+        self.profiler = None # Set by NLUModule.enable_instrumentation()
+        self.build_automaton()
+
+    def build_automaton(self):
+        """Compiles every intent's trigger keywords into one automaton (call again after editing self.intents)."""
+        self.automaton = KeywordAutomaton()
+        # Intents that keep the base keyword match need no confirmation after a hit.
+        self.keyword_only = []
+        for index, intent in enumerate(self.intents):
+            for keyword in intent.keywords:
+                self.automaton.add(keyword, index)
+            for word in intent.typo_keywords:
+                self.automaton.add_typo(word, index)
+            self.keyword_only.append(type(intent).match is Intent.match)
+        self.automaton.compile()
+
+    def candidates(self, text):
+        """Returns the intents whose match() accepts text, in priority order, from one automaton pass."""
+        hits = self.automaton.scan(text)
+        typo_hits = self.automaton.scan_typos(text)
+        ordered = []
+        for index in sorted(hits | typo_hits):
+            intent = self.intents[index]
+            if index in typo_hits or self.keyword_only[index] or intent.match(text):
+                ordered.append(intent)
+        return ordered
+
+    def route(self, text):
+        """Returns (intent, result); intent is None when nothing matched."""
+        prof = self.profiler
         lower_text = text.lower().strip()
-        for intent in self.intents:
-            matched = intent.match(lower_text)
-            if matched:
+        with stage(prof, "router.candidates"):
+            candidates = self.candidates(lower_text)
+        for intent in candidates:
+            with stage(prof, f"intent.{intent.name}.extract"):
                 result = intent.extract(lower_text)
-                if result:
-                    print(f"[IntentRouter] Matched: {intent.name}")
-                    return result
-        return "unknown command", {"action": "unknown"}
+            if prof:
+                prof.count(f"intent.{intent.name}", bool(result))
+            if result:
+                print(f"[IntentRouter] Matched: {intent.name}")
+                return intent, result
+        if prof:
+            prof.count("router", False)
+        return None, ("unknown command", {"action": "unknown"})
+
+    def parse(self, text):
+        return self.route(text)[1]
 
 
 class SocialIntent(Intent):
+    keywords = ["message", "send", "tell", "call", "video call"]
+
     def __init__(self):
         super().__init__("Social")
-
-    def match(self, text):
-        keywords = ["message", "send", "tell", "call", "video call"]
-        return any(k in text for k in keywords)
+        self.gazetteer = get_gazetteer()
 
     def extract(self, text):
-        # 1. Instagram
-        insta_msg = re.search(r"message (.+) on instagram", text)
-        if insta_msg:
-            contact = insta_msg.group(1).strip()
+        words = text.split()
+        lower = [w.lower() for w in words]
+        # One gazetteer pass; a known contact fixes where the name starts and ends
+        contacts = self.gazetteer.spans_by_start(text, kinds={"contact"})
+
+        def split_to(verb):
+            """(message, contact) around the "to" before the contact: a known one, else the last "to"."""
+            tos = [i for i in range(verb + 2, len(words)) if lower[i] == "to"]
+            if not tos:
+                return None, None
+            known = [i for i in tos if i + 1 in contacts]
+            at = known[-1] if known else tos[-1]
+            return " ".join(words[verb + 1:at]), name_from(lower, contacts, at + 1)
+
+        # 1. Instagram: "message X on instagram"
+        insta = find_word(lower, "message")
+        if insta is not None and lower[-2:] == ["on", "instagram"] and insta + 1 < len(words) - 2:
+            contact = name_from(lower, contacts, insta + 1)
             return (
                 self.generate_verbose_instruction("Instagram", "message", contact, "hello"),
                 {"action": "send_message", "app": "Instagram", "contact": contact}
             )
 
         # 2. WhatsApp / Generic Message
-        msg_pattern = re.search(r"send (.+) to (.+)", text) # "send hello to mom"
-        tell_pattern = re.search(r"tell (\w+) (.+)", text)   # "tell mom hello"
-        generic_msg = re.search(r"message (.+) to (.+)", text) # "message hello to mom"
-        
+        # "message hello to mom", "send hello to mom", "tell mom hello"
         # Check specific "send money" patterns first to avoid conflict (handled by PaymentIntent usually, 
         # but if PaymentIntent misses, we don't want to send "100 rupees" as a text message usually.
         # However, for now, we rely on IntentRouter order.)
@@ -183,18 +320,18 @@ class SocialIntent(Intent):
         contact = None
         msg = None
         
-        if generic_msg:
-            msg = generic_msg.group(1).strip()
-            contact = generic_msg.group(2).strip()
-        elif msg_pattern:
+        generic_msg, send, tell = find_word(lower, "message"), find_word(lower, "send"), find_word(lower, "tell")
+        if generic_msg is not None:
+            msg, contact = split_to(generic_msg)
+        if not (contact and msg) and send is not None:
             # Check if it's GPay first? Router logic handles priority.
-            if " on gpay" in text: return None # Defer to PaymentIntent
-            msg = msg_pattern.group(1).strip()
-            raw_contact = msg_pattern.group(2).strip()
-            contact = raw_contact.split(" on ")[0]
-        elif tell_pattern:
-            contact = tell_pattern.group(1).strip()
-            msg = tell_pattern.group(2).strip()
+            if "gpay" in lower: return None # Defer to PaymentIntent
+            msg, contact = split_to(send)
+        if not (contact and msg) and tell is not None and tell + 2 < len(words):
+            span = contacts.get(tell + 1)
+            after = span.end if span else tell + 2
+            contact = span.value if span else lower[tell + 1]
+            msg = " ".join(words[after:])
             
         if contact and msg:
             return (
@@ -203,32 +340,29 @@ class SocialIntent(Intent):
             )
 
         # 3. Calling
-        vid_call = re.search(r"video call (.+)", text)
-        if vid_call:
-            raw_c = vid_call.group(1).strip().split(" on ")[0]
-            # Custom instruction for Call
-            return (
-               self.generate_verbose_instruction("WhatsApp", "video_call", raw_c).replace("click video call", "click on video call"), # minor adjustment if needed
-               {"action": "video_call", "app": "WhatsApp", "contact": raw_c} 
-            )
-
-        audio_call = re.search(r"call (.+)", text)
-        if audio_call and "video" not in text:
-             raw_c = audio_call.group(1).strip().split(" on ")[0]
-             return (
-                 self.generate_verbose_instruction("WhatsApp", "call", raw_c),
-                 {"action": "voice_call", "app": "WhatsApp", "contact": raw_c}
-             )
+        call = find_word(lower, "call")
+        if call is not None and call + 1 < len(words):
+            raw_c = name_from(lower, contacts, call + 1)
+            if call and lower[call - 1] == "video":
+                # Custom instruction for Call
+                return (
+                   self.generate_verbose_instruction("WhatsApp", "video_call", raw_c),
+                   {"action": "video_call", "app": "WhatsApp", "contact": raw_c} 
+                )
+            if "video" not in lower:
+                 return (
+                     self.generate_verbose_instruction("WhatsApp", "call", raw_c),
+                     {"action": "voice_call", "app": "WhatsApp", "contact": raw_c}
+                 )
 
         return None
 
 class SearchIntent(Intent):
+    keywords = ["search", "buy"]
+
     def __init__(self):
         super().__init__("Search")
 
-    def match(self, text):
-        return "search" in text or "buy" in text
-
     def extract(self, text):
         # YouTube
         if "youtube" in text:
@@ -263,9 +397,11 @@ class SearchIntent(Intent):
         return None
 
 class CommerceIntent(Intent):
+    keywords = ["order"]
+
     def __init__(self):
         super().__init__("Commerce")
-        
+
     def match(self, text):
         return "order" in text and "swiggy" in text
 
@@ -280,25 +416,30 @@ class CommerceIntent(Intent):
         return None
 
 class PaymentIntent(Intent):
+    keywords = ["pay", "gpay"]
+
     def __init__(self):
         super().__init__("Payment")
-
-    def match(self, text):
-        return ("pay" in text) or ("gpay" in text)
+        self.gazetteer = get_gazetteer()
 
     def extract(self, text):
-        # send 100 to mom on gpay
-        gpay_send = re.search(r"send (\d+)(?: rupees)? to (.+) on gpay", text)
-        # pay 100 to mom
-        gpay_pay = re.search(r"pay (\d+) (?:rupees )?to (.+)", text)
+        lower = text.lower().split()
+        contacts = self.gazetteer.spans_by_start(text, kinds={"contact"})
 
+        # "send 100 to mom on gpay", "pay 100 [rupees] to mom"
         amt, contact = None, None
-        if gpay_send:
-            amt = gpay_send.group(1).strip()
-            contact = gpay_send.group(2).strip()
-        elif gpay_pay:
-            amt = gpay_pay.group(1).strip()
-            contact = gpay_pay.group(2).strip().split(" on gpay")[0]
+        for verb in ("send", "pay"):
+            i = find_word(lower, verb)
+            if i is None or not lower[i + 1:i + 2] or not lower[i + 1].isdigit():
+                continue
+            if verb == "send" and lower[-2:] != ["on", "gpay"]:
+                continue
+            j = i + 2
+            if lower[j:j + 1] == ["rupees"]:
+                j += 1
+            if lower[j:j + 1] == ["to"] and j + 1 < len(lower):
+                amt, contact = lower[i + 1], name_from(lower, contacts, j + 1)
+                break
             
         if amt and contact:
              return (
@@ -308,11 +449,10 @@ class PaymentIntent(Intent):
         return None
 
 class NavigationIntent(Intent):
+    keywords = ["navigate to"]
+
     def __init__(self):
         super().__init__("Navigation")
-        
-    def match(self, text):
-        return "navigate to" in text
 
     def extract(self, text):
         m = re.search(r"navigate to (.+)", text)
@@ -325,6 +465,8 @@ class NavigationIntent(Intent):
         return None
 
 class ProductivityIntent(Intent):
+    keywords = ["note", "type"]
+
     def __init__(self):
         super().__init__("Productivity")
 
@@ -353,12 +495,14 @@ class ProductivityIntent(Intent):
         
     def get_note_instruction(self, app, text):
         save_step = " then save it"
-        win = f"if it is windows click windows buttion then search for {app} then open it then typr {text}{save_step}"
         mac = f"it it is mack click Command-Spacebar buttion then search for {app} then open it then typr {text}{save_step}"
-        return f"{win}/ {mac}"
+        return P.plan_text([P.Step(P.START_MENU), P.Step(P.SEARCH_FOR, app), P.Step(P.OPEN_RESULT),
+                            P.Step(P.TYPE, text), P.Step(P.SAVE)], mac)
 
 class ScreenActionIntent(Intent):
     """Handles visual actions: Click X, Find X, Search for X."""
+    keywords = ["click ", "select ", "tap ", "press ", "search for "]
+
     def __init__(self):
         super().__init__("ScreenAction")
 
@@ -388,6 +532,8 @@ class ScreenActionIntent(Intent):
 
 class GenericActionIntent(Intent):
     """Handles generic Open, Search, Type commands using standardized verbose flow."""
+    keywords = ["open", "search", "type", "run", "select", "click", "option", "tab"]
+
     def __init__(self):
         super().__init__("GenericAction")
         # Optimization: Known apps for fuzzy matching
@@ -396,21 +542,19 @@ class GenericActionIntent(Intent):
             "slack", "files", "settings", "camera", "word", "excel", "powerpoint", 
             "explorer", "terminal", "cmd", "paint", "vlc", "code"
         ]
-    
-    
-    def match(self, text):
-        return any(k in text for k in ["open", "search", "type", "run", "select", "click", "option", "tab"])
-    
+        # Typo-tolerant app names (shared trie, see gazetteer.py)
+        self.gazetteer = get_gazetteer()
+
     def extract(self, text):
         text = text.lower().strip()
         
         # Browser Control (Hotkeys)
         if "new tab" in text:
-            return "press ctrl+t", {"action": "browser", "command": "new_tab"}
+            return P.plan_text([P.Step(P.PRESS, "ctrl+t")]), {"action": "browser", "command": "new_tab"}
         if "close tab" in text or "close this tab" in text:
-            return "press ctrl+w", {"action": "browser", "command": "close_tab"}
+            return P.plan_text([P.Step(P.PRESS, "ctrl+w")]), {"action": "browser", "command": "close_tab"}
         if "next tab" in text:
-             return "press ctrl+tab", {"action": "browser", "command": "next_tab"}
+             return P.plan_text([P.Step(P.PRESS, "ctrl+tab")]), {"action": "browser", "command": "next_tab"}
              
         # "Select first/second option" logic
         if "option" in text or "result" in text:
@@ -420,26 +564,25 @@ class GenericActionIntent(Intent):
              if "fourth" in text or "4th" in text: count = 4
              
              # Verbose: Tab * Count -> Enter
-             tabs = " then ".join(["press tab"] * count)
-             return f"{tabs} then press enter", {"action": "browser", "command": "select_option", "index": count}
+             steps = [P.Step(P.PRESS, "tab")] * count + [P.Step(P.PRESS, "enter")]
+             return P.plan_text(steps), {"action": "browser", "command": "select_option", "index": count}
              
         # Type Generic (Context Aware)
         # If user says "type hello", we just type it. No "open notepad" needed.
         if text.startswith("type "):
             content = text[5:].strip()
-            return f"typr {content}", {"action": "type", "text": content}
+            return P.plan_text([P.Step(P.TYPE, content)]), {"action": "type", "text": content}
 
         # Open App
         if text.startswith("open ") or text.startswith("run "):
             app = text.replace("open ", "").replace("run ", "").strip()
             
             # --- FUZZY LOGIC (ACCURACY) ---
-            import difflib
             if app not in self.known_apps:
-                matches = difflib.get_close_matches(app, self.known_apps, n=1, cutoff=0.6)
-                if matches:
-                    print(f"[NLU] Typos Detected! Correcting '{app}' -> '{matches[0]}'")
-                    app = matches[0]
+                match = self.gazetteer.resolve(app, "app")
+                if match:
+                    print(f"[NLU] Typos Detected! Correcting '{app}' -> '{match}'")
+                    app = match
 
             return (
                 self.generate_verbose_instruction(app, "open", app),
@@ -461,69 +604,70 @@ class GenericActionIntent(Intent):
         # Optimized for speed
         if action_type == "search" and app == "Browser":
              # Browser Search: New Tab -> Type -> Enter
-             return f"press ctrl+t then typr {target} then press enter"
+             return P.plan_text([P.Step(P.PRESS, "ctrl+t"), P.Step(P.TYPE, target), P.Step(P.PRESS, "enter")])
              
-        win = f"if it is windows click windows buttion then search for {target} then open it"
         mac = f"it it is mack click Command-Spacebar buttion then search for {target} then open it"
-        return f"{win}/ {mac}"
+        return P.plan_text([P.Step(P.START_MENU), P.Step(P.SEARCH_FOR, target), P.Step(P.OPEN_RESULT)], mac)
 
 class SystemIntent(Intent):
+    keywords = ["volume", "mute", "unmute", "battery", "cpu", "ram", "memory", "check", "clean temp"]
+    volatile = True
+
     def __init__(self):
         super().__init__("System")
-        
-    def match(self, text):
-        return any(k in text for k in ["volume", "mute", "unmute", "battery", "cpu", "ram", "memory", "check", "clean temp"])
-        
+
     def extract(self, text):
         if "volume" in text:
-            if "up" in text: return "press volume_up", {"action": "system", "type": "volume_up"}
-            if "down" in text: return "press volume_down", {"action": "system", "type": "volume_down"}
-            if "mute" in text: return "press volume_mute", {"action": "system", "type": "volume_mute"}
+            for direction in ("up", "down", "mute"):
+                if direction in text:
+                    key = f"volume_{direction}"
+                    return P.plan_text([P.Step(P.PRESS, key)]), {"action": "system", "type": key}
         
         # New System Admin Commands
-        if "battery" in text: return "check battery", {"action": "system", "type": "battery"}
-        if "cpu" in text: return "check cpu", {"action": "system", "type": "cpu"}
-        if "memory" in text or "ram" in text: return "check memory", {"action": "system", "type": "memory"}
-        if "clean temp" in text: return "clean temp", {"action": "system", "type": "clean"}
+        if "battery" in text: return P.plan_text([P.Step(P.CHECK, "battery")]), {"action": "system", "type": "battery"}
+        if "cpu" in text: return P.plan_text([P.Step(P.CHECK, "cpu")]), {"action": "system", "type": "cpu"}
+        if "memory" in text or "ram" in text: return P.plan_text([P.Step(P.CHECK, "memory")]), {"action": "system", "type": "memory"}
+        if "clean temp" in text: return P.plan_text([P.Step(P.CLEAN_TEMP)]), {"action": "system", "type": "clean"}
             
-        return "press volume_mute", {"action": "system", "type": "mute"} # Default safety
+        return P.plan_text([P.Step(P.PRESS, "volume_mute")]), {"action": "system", "type": "mute"} # Default safety
 
 class MediaIntent(Intent):
+    keywords = ["pause", "resume", "next song", "previous song", "skip song"]
+
     def __init__(self):
         super().__init__("Media")
-        
-    def match(self, text):
-        return any(k in text for k in ["pause", "resume", "next song", "previous song", "skip song"])
-        
+
     def extract(self, text):
         if "pause" in text or "resume" in text or "stop" in text:
-            return "press playpause", {"action": "media", "command": "playpause"}
+            return P.plan_text([P.Step(P.PRESS, "playpause")]), {"action": "media", "command": "playpause"}
         if "next" in text or "skip" in text:
-            return "press nexttrack", {"action": "media", "command": "nexttrack"}
+            return P.plan_text([P.Step(P.PRESS, "nexttrack")]), {"action": "media", "command": "nexttrack"}
         if "previous" in text or "back" in text:
-            return "press prevtrack", {"action": "media", "command": "prevtrack"}
+            return P.plan_text([P.Step(P.PRESS, "prevtrack")]), {"action": "media", "command": "prevtrack"}
         return None
 
 class DateIntent(Intent):
+    keywords = ["time", "date"]
+    volatile = True
+
     def __init__(self):
         super().__init__("Date")
-        
-    def match(self, text):
-        return "time" in text or "date" in text
-        
+
     def extract(self, text):
         from datetime import datetime
         now = datetime.now()
         if "time" in text:
             t_str = now.strftime("%I:%M %p")
-            return f"inform The time is {t_str}", {"action": "info", "text": f"The time is {t_str}"}
+            return P.plan_text([P.Step(P.INFORM, f"The time is {t_str}")]), {"action": "info", "text": f"The time is {t_str}"}
         if "date" in text:
             d_str = now.strftime("%A, %B %d, %Y")
-            return f"inform The date is {d_str}", {"action": "info", "text": f"The date is {d_str}"}
+            return P.plan_text([P.Step(P.INFORM, f"The date is {d_str}")]), {"action": "info", "text": f"The date is {d_str}"}
         return None
 
 
 class GreetingIntent(Intent):
+    keywords = ["hello", "hi", "hey", "hola", "greetings"]
+
     def __init__(self):
         super().__init__("Greeting")
         
@@ -534,7 +678,7 @@ class GreetingIntent(Intent):
         # starts with "hello ", "hi ", "hey "
         # OR is exactly "hello", "hi", "hey"
         clean = text.lower().strip()
-        greetings = ["hello", "hi", "hey", "hola", "greetings"]
+        greetings = self.keywords
         
         # Exact match
         if clean in greetings: return True
@@ -547,26 +691,28 @@ class GreetingIntent(Intent):
         return False
         
     def extract(self, text):
-        return "inform Hello! How can I help you?", {"action": "info", "text": "Hello! How can I help you?"}
+        return P.plan_text([P.Step(P.INFORM, "Hello! How can I help you?")]), {"action": "info", "text": "Hello! How can I help you?"}
 
 class HumorIntent(Intent):
+    keywords = ["joke", "funny"]
+
     def __init__(self):
         super().__init__("Humor")
-        
-    def match(self, text):
-        return "joke" in text or "funny" in text
-        
+
     def extract(self, text):
         # A simple placeholder. In a real system, this would fetch from a DB or API.
-        return "inform Why did the robot go to school? To get smarter!", {"action": "info", "text": "Why did the robot go to school? To get smarter!"}
+        joke = "Why did the robot go to school? To get smarter!"
+        return P.plan_text([P.Step(P.INFORM, joke)]), {"action": "info", "text": joke}
 
 class SolverIntent(Intent):
+    keywords = ["plus", "minus", "times", "divided by", "+", "-", "*", "/"]
+    volatile = True
+
     def __init__(self):
         super().__init__("Solver")
         
     def match(self, text):
-        math_words = ["plus", "minus", "times", "divided by", "+", "-", "*", "/"]
-        return any(w in text for w in math_words) and any(c.isdigit() for c in text)
+        return any(w in text for w in self.keywords) and any(c.isdigit() for c in text)
         
     def extract(self, text):
         # Basic Safety: only allow digits and math ops
@@ -579,7 +725,7 @@ class SolverIntent(Intent):
             
             result = eval(expr) # Safe-ish constraint above
             ans = f"The result is {result}"
-            return f"inform {ans}", {"action": "info", "text": ans}
+            return P.plan_text([P.Step(P.INFORM, ans)]), {"action": "info", "text": ans}
         except:
             return None
 
@@ -589,26 +735,50 @@ class SolverIntent(Intent):
 
 # --- Main Module ---
 
+# Dataset intents only ever served from an exact (normalized) key, never a near match.
+EXACT_ONLY_INTENTS = {"CLOSE_APP", "SEND_MESSAGE"}
+
+# Module handed to forked batch workers. Set just before the pool forks so
+# children inherit the loaded dictionary and dataset copy-on-write.
+_BATCH_NLU = None
+
+def _predict_worker(text):
+    return _BATCH_NLU.predict_action(text)
+
 class NLUModule:
-    def __init__(self, model_path="t5-small", device=None):
+    def __init__(self, model_path="t5-small", device=None, near_match_distance=2,
+                 cache_size=256, cache_ttl=300.0, instrument=False, hot_commands=True):
         self.router = IntentRouter()
+        self.gazetteer = get_gazetteer()
         self.sym_spell = None
         self.dataset_cache = {}
+        self.near_match_distance = near_match_distance
+        self.dataset_index = None # Built on first near-match lookup
         
         # Load Dataset
         self.load_dataset()
         
-        # Initialize SymSpell
+        # Initialize SymSpell (process-wide instance, prebuilt index if available)
         if SymSpell:
-            self.sym_spell = SymSpell(max_dictionary_edit_distance=2, prefix_length=7)
             try:
-                dictionary_path = pkg_resources.resource_filename("symspellpy", "frequency_dictionary_en_82_765.txt")
-                self.sym_spell.load_dictionary(dictionary_path, term_index=0, count_index=1)
+                self.sym_spell = get_sym_spell()
                 print("SymSpell initialized.")
-            except:
+            except Exception:
                 print("SymSpell dictionary load failed.")
-
-        self.use_model = False 
+        # Skips entity names and free-text slots; per-token results are memoized
+        self.speller = SlotAwareSpeller(self.sym_spell, self.gazetteer)
+
+        # T5 fallback for commands the router can't place (only for a local saved model)
+        self.engine = self.load_model_engine(model_path)
+        self.use_model = self.engine is not None
+        # Repeated commands ("pause", "next song") skip the whole pipeline.
+        self.result_cache = LRUCache(max_size=cache_size, ttl=cache_ttl)
+        # Most frequent commands from the request log, resolved ahead of time
+        self.hot_commands = get_hot_commands() if hot_commands else None
+        self.profiler = None
+        if instrument:
+            self.enable_instrumentation()
+        self.batch_stats = {}
 
     def load_dataset(self):
         try:
@@ -628,6 +798,22 @@ class NLUModule:
                      atom_root = os.sep.join(parts[:atom_index+1])
                      data_path = os.path.join(atom_root, "data", "nlu", "nlu_dataset_50k.jsonl")
             
+            # Prefer the compiled store: opening it is near-instant and records load on demand.
+            store_path = store_path_for(data_path)
+            if os.path.exists(data_path) and (not store_is_current(store_path) or
+                                              os.path.getmtime(store_path) < os.path.getmtime(data_path)):
+                try:
+                    compile_dataset(data_path, store_path)
+                except Exception as e:
+                    print(f"[NLU] Could not compile dataset store: {e}")
+            if os.path.exists(store_path):
+                try:
+                    self.dataset_cache = DatasetStore(store_path)
+                    print(f"[NLU] Opened dataset store {store_path}")
+                    return
+                except Exception as e:
+                    print(f"[NLU] Could not open dataset store: {e}")
+
             if os.path.exists(data_path):
                 print(f"[NLU] Loading dataset from {data_path}...")
                 with open(data_path, 'r', encoding='utf-8') as f:
@@ -647,14 +833,55 @@ class NLUModule:
         except Exception as e:
             print(f"[NLU] Error loading dataset: {e}")
 
+    def load_model_engine(self, model_path):
+        if not model_path or not os.path.isdir(model_path) or T5ForConditionalGeneration is None:
+            return None
+        try:
+            from models.nlu.serving import T5ServingEngine
+            engine = T5ServingEngine(model_path, constrained=True)
+            print(f"[NLU] T5 serving engine loaded from {model_path} (int8: {engine.quantized})")
+            return engine
+        except Exception as e:
+            print(f"[NLU] T5 engine unavailable ({e}). Using router only.")
+            return None
+
+    def predict_with_model(self, text):
+        """Asks the T5 engine and maps its 'INTENT: X | ENTITIES: k=v' output to a plan."""
+        from models.nlu.serving import parse_t5_output
+        intent, entities = parse_t5_output(self.engine.predict(text))
+        if not intent:
+            return None
+        return self.plan_from_record(intent, entities)
+
+    def get_dataset_index(self):
+        if self.dataset_index is None:
+            if isinstance(self.dataset_cache, DatasetStore):
+                # Postings live in the store; nothing is indexed in memory.
+                self.dataset_index = StoredNearMatchIndex(self.dataset_cache, max_distance=self.near_match_distance)
+            else:
+                self.dataset_index = NearMatchIndex(self.dataset_cache, max_distance=self.near_match_distance)
+            print(f"[NLU] Indexed {len(self.dataset_index)} normalized commands for near matches.")
+        return self.dataset_index
+
     def lookup_dataset(self, text):
         # 1. Direct Match
         record = self.dataset_cache.get(text)
+        # 2. Near Match (normalized key, then trigram shortlist + edit distance)
+        if not record and self.dataset_cache:
+            key = self.get_dataset_index().closest(text)
+            if key is not None:
+                record = self.dataset_cache[key]
+                # Only filler wording may differ: an edited verb, contact or song is a different command,
+                # and a typo must never be what closes an app or sends a message
+                if normalize_key(key) != normalize_key(text) and (
+                        record.get("intent") in EXACT_ONLY_INTENTS or not keeps_verb(text, key)
+                        or not keeps_entities(text, key, record.get("entities", {}))):
+                    record = None
         if not record: return None
-        
-        intent = record.get("intent")
-        entities = record.get("entities", {})
-        
+        return self.plan_from_record(record.get("intent"), record.get("entities", {}))
+
+    def plan_from_record(self, intent, entities):
+        """Maps a dataset/T5 intent label and its entities to (instruction, action_data)."""
         # MAP DATASET INTENTS TO PLANS
         # "PLAY_MUSIC" -> keys: song, app
         if intent == "PLAY_MUSIC":
@@ -712,10 +939,7 @@ class NLUModule:
 
     def correct_spelling(self, text):
         if not self.sym_spell or not text: return text
-        suggestions = self.sym_spell.lookup_compound(text, max_edit_distance=2)
-        if suggestions:
-            return suggestions[0].term
-        return text
+        return self.speller.correct(text)
 
     def preprocess_text(self, text):
         """Strips filler phrases to extract main points."""
@@ -725,27 +949,141 @@ class NLUModule:
              text_lower = text_lower.replace(f, "")
         return text_lower.strip()
 
+    def enable_instrumentation(self, profiler=None):
+        """Starts recording per-stage and per-intent timings. Returns the Profiler."""
+        self.profiler = profiler or Profiler()
+        self.router.profiler = self.profiler
+        return self.profiler
+
+    def disable_instrumentation(self):
+        self.profiler = None
+        self.router.profiler = None
+
     def predict_action(self, text, image_path=None):
         if not text: return "unknown command", {"action": "unknown"}
-        
+
+        with stage(self.profiler, "predict_action"):
+            if self.hot_commands is not None:
+                self.hot_commands.reload_if_changed()
+                hot = self.hot_commands.get(text)
+                if self.profiler:
+                    self.profiler.count("hot_commands", hot is not None)
+                if hot is not None:
+                    return self.with_plan(hot) # Tables mined before plans were recorded lack one
+
+            cache_key = " ".join(text.lower().split())
+            cached = self.result_cache.get(cache_key)
+            if self.profiler:
+                self.profiler.count("cache", cached is not None)
+            if cached is not None:
+                # Copy so callers can't mutate the cached action data
+                return cached[0], dict(cached[1])
+
+            intent, result = self.predict_uncached(text)
+            if intent is None or not intent.volatile:
+                self.result_cache.put(cache_key, (result[0], dict(result[1])))
+            return result
+
+    def cache_stats(self):
+        """Hit rate and eviction counters of the predict_action result cache."""
+        return self.result_cache.stats()
+
+    def with_plan(self, result):
+        """Adds the typed steps as action_data["plan"] ([[op, arg], ...]) unless already present."""
+        instruction, data = result
+        if "plan" in data:
+            return result
+        return instruction, dict(data, plan=P.to_json(P.compile_plan(instruction)))
+
+    def predict_uncached(self, text):
+        """Runs the full pipeline. Returns (intent, result); intent is None for dataset hits and unknowns."""
+        intent, result = self.route_uncached(text)
+        return intent, self.with_plan(result)
+
+    def route_uncached(self, text):
+        prof = self.profiler
+        if self.gazetteer.reload_if_changed():
+            self.result_cache.clear() # Cached results may name stale entities
+
         # 1. Preprocessing (Main Point Extraction)
-        text_processed = self.preprocess_text(text)
+        with stage(prof, "preprocess_text"):
+            text_processed = self.preprocess_text(text)
         
         # --- DATASET LOOKUP (PRIORITY) ---
         # We check both: raw text (if user was brief) and processed text (without "hey atom")
-        db_match = self.lookup_dataset(text.lower().strip())
-        if not db_match:
-             db_match = self.lookup_dataset(text_processed)
+        with stage(prof, "lookup_dataset"):
+            db_match = self.lookup_dataset(text.lower().strip())
+            if not db_match:
+                 db_match = self.lookup_dataset(text_processed)
+        if prof:
+            prof.count("dataset", bool(db_match))
              
         if db_match:
             print(f"[NLU] Dataset Match Found for: '{text}'!")
-            return db_match
+            return None, db_match
         
         # 2. Cleaning & Spell Check
-        text_final = self.correct_spelling(text_processed)
+        with stage(prof, "correct_spelling"):
+            text_final = self.correct_spelling(text_processed)
         
         # 3. Intent Routing
-        return self.router.parse(text_final)
+        with stage(prof, "route"):
+            intent, result = self.router.route(text_final)
+
+        # 4. Model Fallback (router found nothing)
+        if intent is None and self.engine:
+            with stage(prof, "t5_engine"):
+                model_match = self.predict_with_model(text_processed)
+            if prof:
+                prof.count("t5_engine", bool(model_match))
+            if model_match:
+                print(f"[NLU] T5 Match Found for: '{text}'!")
+                return None, model_match
+        return intent, result
+
+    def predict_batch(self, texts, workers=None, chunksize=64):
+        """
+        Runs predict_action over many texts on a process pool.
+        Workers are forked from this already-loaded module, so SymSpell and the
+        dataset are shared copy-on-write instead of reloaded per process.
+        Returns results in input order; throughput is kept in self.batch_stats.
+        """
+        global _BATCH_NLU
+        import gc
+        import time
+        import multiprocessing
+
+        texts = list(texts)
+        workers = workers or multiprocessing.cpu_count()
+        start = time.perf_counter()
+
+        # Fork is required to share state; spawn would reload everything per worker.
+        can_fork = "fork" in multiprocessing.get_all_start_methods()
+        if workers <= 1 or len(texts) < 2 or not can_fork:
+            workers = 1
+            results = [self.predict_action(t) for t in texts]
+        else:
+            _BATCH_NLU = self
+            # Keep loaded objects out of GC passes so refcount churn doesn't dirty shared pages.
+            gc.freeze()
+            try:
+                ctx = multiprocessing.get_context("fork")
+                with ctx.Pool(processes=workers) as pool:
+                    results = pool.map(_predict_worker, texts, chunksize=chunksize)
+            finally:
+                gc.unfreeze()
+                _BATCH_NLU = None
+
+        elapsed = time.perf_counter() - start
+        self.batch_stats = {
+            "count": len(texts),
+            "workers": workers,
+            "seconds": elapsed,
+            "throughput": len(texts) / elapsed if elapsed > 0 else 0.0,
+        }
+        print(f"[NLU] Batch: {len(texts)} texts in {elapsed:.2f}s "
+              f"({self.batch_stats['throughput']:.0f}/s, {workers} workers)")
+        return results
 
 if __name__ == "__main__":
     nlu = NLUModule()
@@ -0,0 +1,308 @@
+"""
+Shared NLU daemon.
+
+backend/main.py, atom/main.py and the voice agent each used to build their own
+NLUModule (dataset, SymSpell, optional T5). Start one daemon instead:
+
+    python ai_core/modules/nlu_daemon.py
+
+and get_nlu() in every process returns an NLUClient talking to it over a Unix
+domain socket. Without a daemon (or on platforms without AF_UNIX), get_nlu()
+returns an in-process NLUModule, so nothing has to be started for things to work.
+
+The socket lives in $XDG_RUNTIME_DIR, or else in a 0700 per-user directory
+under the temp dir, and is created 0600. Clients refuse a socket (or
+directory) owned by another user, so nobody else can stand in for the daemon.
+
+Wire format, both directions: a 5-byte header (payload length as a big-endian
+uint32, one op byte) followed by a UTF-8 JSON payload.
+"""
+import os
+import sys
+import json
+import time
+import socket
+import stat
+import struct
+import argparse
+import tempfile
+import threading
+import socketserver
+
+HEADER = struct.Struct(">IB")
+MAX_FRAME = 16 * 2**20
+
+# Ops
+PING = 1
+PREDICT = 2
+STATS = 3
+OK = 0
+ERROR = 255
+
+HAS_UNIX_SOCKETS = hasattr(socket, "AF_UNIX")
+HAS_UIDS = hasattr(os, "getuid")
+
+
+def socket_dir():
+    """Per-user directory for the socket: $XDG_RUNTIME_DIR, else <tmp>/atom-<uid>."""
+    runtime = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime and os.path.isdir(runtime):
+        return runtime
+    return os.path.join(tempfile.gettempdir(), f"atom-{os.getuid() if HAS_UIDS else 0}")
+
+
+SOCKET_PATH = os.environ.get("ATOM_NLU_SOCKET", os.path.join(socket_dir(), "atom-nlu.sock"))
+
+
+def check_owner(path):
+    """Raises PermissionError unless path (not following symlinks) belongs to this user."""
+    if HAS_UIDS and os.lstat(path).st_uid != os.getuid():
+        raise PermissionError(f"{path} is owned by another user")
+
+
+def make_private_dir(path):
+    """Creates path 0700 if missing; refuses one another user owns or others can write to."""
+    try:
+        os.mkdir(path, 0o700)
+    except FileExistsError:
+        pass
+    check_owner(path)
+    info = os.lstat(path)
+    if not stat.S_ISDIR(info.st_mode):
+        raise PermissionError(f"{path} is not a directory")
+    if HAS_UIDS and info.st_mode & 0o022:
+        raise PermissionError(f"{path} is writable by other users")
+
+
+def _recv_exact(sock, n):
+    buf = bytearray()
+    while len(buf) < n:
+        chunk = sock.recv(n - len(buf))
+        if not chunk:
+            raise ConnectionError("connection closed")
+        buf += chunk
+    return bytes(buf)
+
+
+def send_frame(sock, op, payload=None):
+    body = b"" if payload is None else json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    sock.sendall(HEADER.pack(len(body), op) + body)
+
+
+def recv_frame(sock):
+    """Returns (op, payload) of the next frame."""
+    length, op = HEADER.unpack(_recv_exact(sock, HEADER.size))
+    if length > MAX_FRAME:
+        raise ValueError(f"frame of {length} bytes exceeds limit")
+    body = _recv_exact(sock, length) if length else b""
+    return op, (json.loads(body) if body else None)
+
+
+class NLUDaemon:
+    """Serves one NLUModule's predict_action to any number of local clients."""
+    def __init__(self, nlu=None, path=SOCKET_PATH):
+        if nlu is None:
+            try:
+                from .nlu import NLUModule
+            except ImportError:
+                from nlu import NLUModule
+            nlu = NLUModule()
+        self.nlu = nlu
+        self.path = path
+        self.requests = 0
+        self._lock = threading.Lock() # NLUModule is not written for concurrent callers
+        self._connections = set()
+        self.server = None
+
+    def handle(self, op, payload):
+        if op == PING:
+            return None
+        if op == PREDICT:
+            text, image_path = payload
+            with self._lock:
+                self.requests += 1
+                instruction, action = self.nlu.predict_action(text, image_path)
+            return [instruction, action]
+        if op == STATS:
+            return {"requests": self.requests, "pid": os.getpid()}
+        raise ValueError(f"unknown op {op}")
+
+    def start(self):
+        """Binds the socket and serves on a background thread; returns self."""
+        make_private_dir(os.path.dirname(os.path.abspath(self.path)))
+        if os.path.lexists(self.path):
+            check_owner(self.path)
+            os.unlink(self.path) # Stale socket from a previous run
+        daemon = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            def setup(self):
+                daemon._connections.add(self.request)
+
+            def finish(self):
+                daemon._connections.discard(self.request)
+
+            def handle(self):
+                while True:
+                    try:
+                        op, payload = recv_frame(self.request)
+                    except (ConnectionError, OSError):
+                        return
+                    try:
+                        send_frame(self.request, OK, daemon.handle(op, payload))
+                    except Exception as e:
+                        send_frame(self.request, ERROR, str(e))
+
+        umask = os.umask(0o177) # Socket is created 0600, no window before a chmod
+        try:
+            self.server = socketserver.ThreadingUnixStreamServer(self.path, Handler)
+        finally:
+            os.umask(umask)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        print(f"[NLU Daemon] Serving on {self.path}")
+        return self
+
+    def stop(self):
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+        for conn in list(self._connections): # Clients see the daemon go away immediately
+            try:
+                conn.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+
+class NLUClient:
+    """
+    predict_action() over the daemon socket, on one persistent connection.
+    If the daemon goes away, falls back to an in-process module built by
+    fallback() (once, on first failure).
+    """
+    def __init__(self, path=SOCKET_PATH, timeout=30.0, fallback=None):
+        self.path = path
+        self.timeout = timeout
+        self.fallback = fallback
+        self.local = None
+        self._sock = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        check_owner(self.path) # Never send commands to a socket someone else planted
+        if not stat.S_ISSOCK(os.lstat(self.path).st_mode):
+            raise ConnectionError(f"{self.path} is not a socket")
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(self.path)
+        return sock
+
+    def call(self, op, payload=None):
+        with self._lock:
+            for attempt in range(2): # One reconnect, e.g. after a daemon restart
+                try:
+                    if self._sock is None:
+                        self._sock = self._connect()
+                    send_frame(self._sock, op, payload)
+                    status, result = recv_frame(self._sock)
+                    break
+                except (ConnectionError, OSError):
+                    self.close()
+                    if attempt:
+                        raise
+        if status == ERROR:
+            raise RuntimeError(f"NLU daemon error: {result}")
+        return result
+
+    def ping(self):
+        try:
+            self.call(PING)
+            return True
+        except (ConnectionError, OSError):
+            return False
+
+    def predict_action(self, text, image_path=None):
+        if self.local is None:
+            try:
+                instruction, action = self.call(PREDICT, [text, image_path])
+                return instruction, action
+            except (ConnectionError, OSError):
+                if self.fallback is None:
+                    raise
+                print("[NLU] Daemon unreachable. Loading NLU in-process.")
+                self.local = self.fallback()
+        return self.local.predict_action(text, image_path)
+
+    def close(self):
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except OSError:
+                pass
+            self._sock = None
+
+
+def get_nlu(path=SOCKET_PATH, **kwargs):
+    """
+    NLUClient if a daemon answers on path, else an in-process NLUModule(**kwargs).
+    Set ATOM_NLU_DAEMON=0 to always load in-process.
+    """
+    try:
+        from .nlu import NLUModule
+    except ImportError:
+        from nlu import NLUModule
+
+    if HAS_UNIX_SOCKETS and os.environ.get("ATOM_NLU_DAEMON", "1") != "0" and os.path.exists(path):
+        client = NLUClient(path, fallback=lambda: NLUModule(**kwargs))
+        if client.ping():
+            print(f"[NLU] Using shared daemon at {path}")
+            return client
+        client.close()
+    return NLUModule(**kwargs)
+
+
+def measure_round_trip(client, nlu, texts, rounds=5):
+    """Mean seconds per call: (in-process predict, daemon predict, daemon ping)."""
+    def per_call(fn):
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for t in texts:
+                fn(t)
+        return (time.perf_counter() - start) / (rounds * len(texts))
+    for t in texts: # Warm the result cache both paths share
+        nlu.predict_action(t)
+    local = per_call(nlu.predict_action)
+    remote = per_call(client.predict_action)
+    ping = per_call(lambda t: client.call(PING))
+    return local, remote, ping
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the shared NLU daemon")
+    parser.add_argument("--socket", default=SOCKET_PATH)
+    parser.add_argument("--bench", action="store_true", help="Report per-call round-trip overhead and exit")
+    args = parser.parse_args()
+    if not HAS_UNIX_SOCKETS:
+        print("Unix domain sockets are not available on this platform.")
+        sys.exit(1)
+
+    daemon = NLUDaemon(path=args.socket).start()
+    if args.bench:
+        texts = ["open notepad", "play believer on spotify", "what time is it", "send hello to mom",
+                 "search for weather today", "pause", "volume up", "open chrome and search cats"]
+        client = NLUClient(args.socket)
+        local, remote, ping = measure_round_trip(client, daemon.nlu, texts)
+        print(f"in-process predict : {local * 1e6:8.1f} us")
+        print(f"daemon predict     : {remote * 1e6:8.1f} us")
+        print(f"round-trip overhead: {(remote - local) * 1e6:8.1f} us (ping {ping * 1e6:.1f} us)")
+        client.close()
+        daemon.stop()
+    else:
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            daemon.stop()
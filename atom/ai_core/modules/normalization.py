@@ -1,28 +1,24 @@
 import os
 
+try:
+    from .spell_index import get_sym_spell
+    from .slot_speller import SlotAwareSpeller
+    from .gazetteer import get_gazetteer
+except ImportError:
+    from spell_index import get_sym_spell
+    from slot_speller import SlotAwareSpeller
+    from gazetteer import get_gazetteer
+
 class NormalizationModule:
     def __init__(self, max_dictionary_edit_distance=2, prefix_length=7):
         self.mock_mode = False
         try:
-            import pkg_resources
             from symspellpy import SymSpell, Verbosity
             
-            # Create SymSpell object
-            self.sym_spell = SymSpell(max_dictionary_edit_distance, prefix_length)
-            
-            # Load default dictionary
-            dictionary_path = pkg_resources.resource_filename(
-                "symspellpy", "frequency_dictionary_en_82_765.txt"
-            )
-            bigram_path = pkg_resources.resource_filename(
-                "symspellpy", "frequency_bigramdictionary_en_243_342.txt"
-            )
-            
-            if not self.sym_spell.load_dictionary(dictionary_path, term_index=0, count_index=1):
-                print("Warning: Dictionary file not found")
-            if not self.sym_spell.load_bigram_dictionary(bigram_path, term_index=0, count_index=2):
-                print("Warning: Bigram dictionary file not found")
-                
+            # Shared SymSpell object (unigram + bigram dictionaries, built once per process)
+            self.sym_spell = get_sym_spell(max_dictionary_edit_distance, prefix_length)
+            self.speller = SlotAwareSpeller(self.sym_spell, get_gazetteer(), max_dictionary_edit_distance)
+
             print("SymSpell loaded for normalization.")
         except ImportError as e:
             print(f"WARNING: SymSpell dependencies missing ({e}). Using Mock Mode.")
@@ -30,19 +26,13 @@ class NormalizationModule:
 
     def normalize(self, text):
         """
-        Corrects spelling errors in the input text using SymSpell compound lookup.
+        Corrects spelling errors word by word, leaving app/contact names and
+        free-text slots (message bodies, dictation) untouched.
         """
         if self.mock_mode:
             return text
 
-        suggestions = self.sym_spell.lookup_compound(
-            text, max_edit_distance=2
-        )
-        
-        # return the best suggestion
-        if suggestions:
-            return suggestions[0].term
-        return text
+        return self.speller.correct(text.lower())
 
 if __name__ == "__main__":
     norm = NormalizationModule()
@@ -0,0 +1,195 @@
+"""
+Typed action plans.
+
+A plan is a tuple of Steps, each a typed op with at most one argument:
+
+    (Step(OPEN_APP, "spotify"), Step(FOCUS_SEARCH), Step(TYPE, "believer"), ...)
+
+Intents build plans with the helpers below. The rendered instruction text
+stays the public, human-readable format ("open spotify then navigate to search
+bar then typr believer ..."); the steps themselves travel in action_data["plan"]
+as JSON ([[op, arg], ...]), so they survive the NLU daemon, the hot-command
+table and the result cache unchanged. The executor runs that list. Only
+legacy input (plain instruction text from old callers) goes through
+parse_step(), the compatibility parser, once per distinct instruction.
+"""
+from collections import namedtuple
+
+try:
+    from .result_cache import LRUCache
+except ImportError:
+    from result_cache import LRUCache
+
+Step = namedtuple("Step", "op arg")
+Step.__new__.__defaults__ = (None,)
+
+# Ops
+START_MENU = "start_menu"      # Press the Windows key
+SEARCH_FOR = "search_for"      # Type a query into the open search box
+OPEN_RESULT = "open_result"    # Enter on the highlighted result
+OPEN_APP = "open_app"          # Launch through the platform command
+TYPE = "type"
+PRESS = "press"                # Key name or "+"-joined combination
+SPEAK = "speak"
+CHECK = "check"                # battery / cpu / memory
+CLEAN_TEMP = "clean_temp"
+INFORM = "inform"
+FOCUS_SEARCH = "focus_search"  # Ctrl+L
+CLICK_SEARCH = "click_search"
+CLICK = "click"                # Visual click on text, Enter as fallback
+SAVE = "save"                  # Save As with a timestamped name
+PLAY_RESULT = "play_result"
+RAW = "raw"                    # Step text with no executor support; reported as unknown
+
+# Canonical wording of each op; parse_step() reads every one of these back
+TEMPLATES = {
+    START_MENU: "click windows buttion",
+    SEARCH_FOR: "search for {}",
+    OPEN_RESULT: "open it",
+    OPEN_APP: "open {}",
+    TYPE: "typr {}",
+    PRESS: "press {}",
+    SPEAK: "say {}",
+    CHECK: "check {}",
+    CLEAN_TEMP: "clean temp",
+    INFORM: "inform {}",
+    FOCUS_SEARCH: "navigate to search bar",
+    CLICK_SEARCH: "click on search",
+    CLICK: "click on {}",
+    SAVE: "save it",
+    PLAY_RESULT: "play the song",
+    RAW: "{}",
+}
+
+WINDOWS_PREFIX = "if it is windows"
+
+# Ops answered without the screen: no UI to wait for, nothing to read back
+INFO_OPS = {SPEAK, CHECK, CLEAN_TEMP, INFORM}
+# Keys handled by the OS rather than the focused window
+SYSTEM_KEYS = {"volume_up", "volume_down", "volume_mute", "playpause", "nexttrack", "prevtrack"}
+
+_plans = LRUCache(max_size=1024, ttl=float("inf"))
+
+
+def render_step(step):
+    return TEMPLATES[step.op].format(step.arg)
+
+
+def render(steps):
+    return " then ".join(render_step(s) for s in steps)
+
+
+class Instruction(str):
+    """Instruction text that still carries the typed steps it was rendered from."""
+    steps = None
+
+
+def plan_text(steps, mac_text=None):
+    """
+    Instruction text for a typed plan; the steps ride along as .steps until
+    NLUModule copies them into action_data["plan"].
+    mac_text adds the old "if it is windows .../ <mac steps>" form, whose mac
+    half is informational only.
+    """
+    steps = tuple(steps)
+    text = render(steps)
+    if mac_text is not None:
+        text = f"{WINDOWS_PREFIX} {text}/ {mac_text}"
+    instruction = Instruction(text)
+    instruction.steps = steps
+    return instruction
+
+
+def to_json(steps):
+    """[[op, arg], ...] for action_data["plan"]."""
+    return [[s.op, s.arg] for s in steps]
+
+
+def parse_step(step_text):
+    """Compatibility parser: one legacy step string -> Step (same precedence as the old if-chain)."""
+    step = step_text.strip().lower()
+
+    def after(marker):
+        return step.split(marker)[1].strip()
+
+    if "click windows" in step:
+        return Step(START_MENU)
+    if "search for" in step:
+        return Step(SEARCH_FOR, after("search for"))
+    if "type" in step and "search" not in step:
+        return Step(TYPE, after("type"))
+    if "press " in step:
+        return Step(PRESS, after("press "))
+    if "speak" in step or "say" in step:
+        return Step(SPEAK, step.replace("speak", "").replace("say", "").strip())
+    if "check" in step:
+        for what in ("battery", "cpu", "memory", "ram"):
+            if what in step:
+                return Step(CHECK, "memory" if what == "ram" else what)
+    if "clean temp" in step:
+        return Step(CLEAN_TEMP)
+    if "inform " in step:
+        return Step(INFORM, after("inform "))
+    if "typr" in step:
+        return Step(TYPE, after("typr"))
+    if "open it" in step or "click open" in step:
+        return Step(OPEN_RESULT)
+    if "open " in step:
+        return Step(OPEN_APP, after("open "))
+    if "navigate to search bar" in step:
+        return Step(FOCUS_SEARCH)
+    if "click on search" in step:
+        return Step(CLICK_SEARCH)
+    if "click on " in step:
+        return Step(CLICK, step.split("click on ")[-1].strip())
+    if "save it" in step or "save file" in step:
+        return Step(SAVE)
+    if "play the song" in step or "play song" in step:
+        return Step(PLAY_RESULT)
+    return Step(RAW, step)
+
+
+def parse(command_string):
+    """Legacy "do X then do Y" text -> tuple of Steps."""
+    task_str = command_string
+    if WINDOWS_PREFIX in task_str.lower():
+        task_str = task_str.lower().replace(WINDOWS_PREFIX, "").strip()
+        if "/" in task_str: task_str = task_str.split("/")[0]
+    return tuple(parse_step(s) for s in task_str.split(" then ") if s.strip())
+
+
+def compile_plan(plan):
+    """
+    Steps for an instruction: typed plans (any sequence of (op, arg) pairs,
+    e.g. action_data["plan"]) and freshly rendered Instructions pass through;
+    legacy text is parsed, with the result cached per instruction.
+    """
+    if not isinstance(plan, str):
+        return tuple(Step(*s) for s in plan)
+    if getattr(plan, "steps", None) is not None:
+        return plan.steps
+    steps = _plans.get(plan)
+    if steps is None:
+        steps = parse(plan)
+        _plans.put(plan, steps)
+    return steps
+
+
+def step_needs_screen(step):
+    if step.op in INFO_OPS or step.op == TYPE:
+        return False
+    return not (step.op == PRESS and step.arg in SYSTEM_KEYS)
+
+
+def needs_screen(steps):
+    """
+    False for plans made only of typing, volume/media keys and informational
+    steps (battery/CPU checks, jokes, math, dates); those run on the executor's
+    fast lane. App launches, menus, clicks and window hotkeys (whose next step
+    waits on the redraw) need the screen.
+    """
+    return any(step_needs_screen(s) for s in steps)
+
+
+def cache_stats():
+    return _plans.stats()
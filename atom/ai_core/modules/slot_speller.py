@@ -0,0 +1,75 @@
+import re
+
+try:
+    from symspellpy import Verbosity
+    TOP = Verbosity.TOP
+except ImportError:
+    TOP = None
+
+try:
+    from .result_cache import LRUCache
+except ImportError:
+    from result_cache import LRUCache
+
+# Free-text payloads: dictated text and message bodies are kept verbatim.
+FREE_TEXT_PATTERNS = [
+    re.compile(r"^(?:type|write|dictate|note)\s+(.+)$"),
+    re.compile(r"\bsaying\s+(.+)$"),
+    re.compile(r"^(?:tell|text)\s+\S+\s+(.+)$"),
+    re.compile(r"^(?:send|message)\s+(.+?)\s+to\s+\S+"),
+]
+WORD = re.compile(r"^[a-z]+$")
+
+
+class SlotAwareSpeller:
+    """
+    Per-token SymSpell correction that leaves slots alone.
+    Tokens inside free-text spans (FREE_TEXT_PATTERNS) and known entities
+    (gazetteer apps, contacts, songs; typos included) are kept as typed;
+    every other word is corrected with a single-word lookup whose result is
+    memoized in a bounded LRU, so cost grows with the number of new words
+    rather than with utterance length.
+    """
+    def __init__(self, sym_spell, gazetteer=None, max_edit_distance=2, cache_size=4096):
+        self.sym_spell = sym_spell
+        self.gazetteer = gazetteer
+        self.max_edit_distance = max_edit_distance
+        self.cache = LRUCache(max_size=cache_size, ttl=float("inf"))
+
+    def protected_tokens(self, tokens):
+        """Indices of tokens that must not be corrected."""
+        protected = set()
+        text = " ".join(tokens)
+        for pattern in FREE_TEXT_PATTERNS:
+            m = pattern.search(text)
+            if m:
+                # Character span -> token indices
+                first = len(text[:m.start(1)].split())
+                protected.update(range(first, first + len(m.group(1).split())))
+        if self.gazetteer is not None:
+            for span in self.gazetteer.spot(text):
+                protected.update(range(span.start, span.end))
+        return protected
+
+    def correct_token(self, token):
+        corrected = self.cache.get(token)
+        if corrected is None:
+            suggestions = self.sym_spell.lookup(token, TOP, max_edit_distance=self.max_edit_distance,
+                                                include_unknown=True)
+            corrected = suggestions[0].term if suggestions else token
+            self.cache.put(token, corrected)
+        return corrected
+
+    def correct(self, text):
+        tokens = text.split()
+        if not self.sym_spell or not tokens:
+            return text
+        # The leading verb decides which free-text pattern applies ("sned x to y")
+        if WORD.match(tokens[0]):
+            tokens[0] = self.correct_token(tokens[0])
+        protected = self.protected_tokens(tokens)
+        protected.add(0)
+        return " ".join(
+            tok if i in protected or not WORD.match(tok) else self.correct_token(tok)
+            for i, tok in enumerate(tokens)
+        )
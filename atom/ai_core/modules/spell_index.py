@@ -0,0 +1,287 @@
+"""
+Prebuilt SymSpell index shared by every consumer in the process.
+
+Building SymSpell's delete index from the 82k-word dictionary takes seconds and
+hundreds of MB. Run this file once to serialize the built index:
+
+    python ai_core/modules/spell_index.py
+
+Afterwards get_sym_spell() unpickles it on first use and hands the same
+instance to NLUModule, NormalizationModule and anything else that asks.
+
+Commands only use a few thousand words, so there is also a domain tier:
+
+    python ai_core/modules/spell_index.py --domain
+
+writes a small frequency dictionary (NLU dataset, intent keywords, gazetteer
+names). When it exists get_sym_spell() returns a TieredSymSpell that answers
+from the domain tier and only loads the general index on a miss.
+"""
+import os
+import re
+import json
+import pickle
+import argparse
+import threading
+from collections import Counter
+
+try:
+    from symspellpy import SymSpell, Verbosity
+    import symspellpy
+    import pkg_resources
+except ImportError:
+    SymSpell = None
+
+MAX_EDIT_DISTANCE = 2
+PREFIX_LENGTH = 7
+DICTIONARY_FILE = "frequency_dictionary_en_82_765.txt"
+BIGRAM_FILE = "frequency_bigramdictionary_en_243_342.txt"
+
+INDEX_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "data", "symspell")
+INDEX_PATH = os.environ.get("ATOM_SYMSPELL_INDEX", os.path.join(INDEX_DIR, "symspell_index.pkl"))
+DOMAIN_PATH = os.environ.get("ATOM_SYMSPELL_DOMAIN", os.path.join(INDEX_DIR, "domain_frequency.txt"))
+DATASET_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "data", "nlu", "nlu_dataset_50k.jsonl")
+
+TRUSTED_COUNT = 10000 # Count floor for keywords and entity names, so they outrank dataset noise
+MIN_DATASET_COUNT = 3 # Dataset words seen fewer times are dropped
+WORD = re.compile(r"^[a-z']+$")
+
+_instances = {}
+_lock = threading.Lock()
+
+
+def _index_version(max_edit_distance, prefix_length):
+    # Rebuild whenever symspellpy or the build parameters change.
+    return (getattr(symspellpy, "__version__", "unknown"), DICTIONARY_FILE, BIGRAM_FILE, max_edit_distance, prefix_length)
+
+
+def general_words():
+    """Every word of the bundled general English dictionary (a plain set; no delete index)."""
+    with open(pkg_resources.resource_filename("symspellpy", DICTIONARY_FILE), "r", encoding="utf-8") as f:
+        return {line.split(" ", 1)[0] for line in f if line.strip()}
+
+
+def _words(text):
+    return [w for w in text.lower().split() if WORD.match(w)]
+
+
+def _one_edit_forms(word):
+    """word and its single-character deletes; two words within one edit share one."""
+    return {word} | {word[:i] + word[i + 1:] for i in range(len(word))}
+
+
+def domain_vocabulary(dataset_path=DATASET_PATH, known_words=None, min_count=MIN_DATASET_COUNT):
+    """
+    Word -> count for the domain tier.
+    Intent keywords, gazetteer names and dataset entity values are trusted.
+    Other dataset words need min_count occurrences and, when known_words is
+    given, must be real words that are not one edit from a trusted word of four
+    or more letters. The dataset is generated with ASR-style noise ("spotifi",
+    "ply" for "play"), which must not become correction targets; real words
+    still pass through TieredSymSpell unchanged.
+    """
+    try:
+        from .nlu import IntentRouter
+        from .gazetteer import get_gazetteer
+    except ImportError:
+        from nlu import IntentRouter
+        from gazetteer import get_gazetteer
+
+    trusted = set(get_gazetteer().vocabulary())
+    for intent in IntentRouter().intents:
+        for keyword in list(intent.keywords) + list(intent.typo_keywords):
+            trusted.update(_words(keyword))
+
+    counts = Counter()
+    if dataset_path and os.path.exists(dataset_path):
+        with open(dataset_path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                counts.update(_words(record["text"]))
+                for value in record.get("entities", {}).values():
+                    trusted.update(_words(str(value)))
+
+    # Short words have too many real neighbours ("on", "of", "to") to judge this way
+    near_trusted = set()
+    for word in trusted:
+        if len(word) >= 4:
+            near_trusted |= _one_edit_forms(word)
+
+    vocabulary = {}
+    for word, n in counts.items():
+        if word in trusted:
+            vocabulary[word] = n
+        elif (n >= min_count and (known_words is None or word in known_words)
+              and not _one_edit_forms(word) & near_trusted):
+            vocabulary[word] = n
+    for word in trusted:
+        vocabulary[word] = vocabulary.get(word, 0) + TRUSTED_COUNT
+    return vocabulary
+
+
+def build_domain_dictionary(path=DOMAIN_PATH, dataset_path=DATASET_PATH):
+    """Build step: writes the domain frequency dictionary ("word count" per line)."""
+    vocabulary = domain_vocabulary(dataset_path, general_words())
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        for word, n in sorted(vocabulary.items(), key=lambda item: (-item[1], item[0])):
+            f.write(f"{word} {n}\n")
+    os.replace(tmp_path, path)
+    print(f"[SymSpell] Domain dictionary ({len(vocabulary)} words) written to {path}")
+    return vocabulary
+
+
+class TieredSymSpell:
+    """
+    Domain tier first, general English as backoff.
+    Real English words come back unchanged, checked against a plain word set
+    (as the general index would return them at distance 0). Typos within
+    domain_distance of a domain word are answered by the small domain index.
+    Only the remaining misses reach the general index, which is loaded on the
+    first one. Exposes the SymSpell
+    lookup()/lookup_compound() calls that the rest of the code uses.
+    """
+    def __init__(self, domain, load_general, known_words=None, domain_distance=1):
+        self.domain = domain
+        self._load_general = load_general
+        self._general = None
+        self._lock = threading.Lock()
+        self.known_words = known_words or set()
+        self.domain_distance = domain_distance
+        self.stats = {"domain": 0, "known": 0, "general": 0}
+
+    @property
+    def general(self):
+        if self._general is None:
+            with self._lock:
+                if self._general is None:
+                    self._general = self._load_general()
+        return self._general
+
+    def lookup(self, phrase, verbosity, max_edit_distance=None, include_unknown=False, **kwargs):
+        max_edit_distance = MAX_EDIT_DISTANCE if max_edit_distance is None else max_edit_distance
+        if phrase in self.known_words:
+            # The general index would return it at distance 0 too
+            self.stats["known"] += 1
+            return self.domain.lookup(phrase, verbosity, max_edit_distance=0, include_unknown=True)
+        suggestions = self.domain.lookup(phrase, verbosity, max_edit_distance=min(self.domain_distance, max_edit_distance))
+        if suggestions:
+            self.stats["domain"] += 1
+            return suggestions
+        self.stats["general"] += 1
+        # Domain words win ties at the same distance
+        suggestions = self.domain.lookup(phrase, verbosity, max_edit_distance=max_edit_distance)
+        suggestions += self.general.lookup(phrase, verbosity, max_edit_distance=max_edit_distance, **kwargs)
+        suggestions.sort(key=lambda s: s.distance)
+        # Both tiers know common words; keep the first (domain) suggestion per term
+        seen = set()
+        suggestions = [s for s in suggestions if not (s.term in seen or seen.add(s.term))]
+        if suggestions:
+            return suggestions[:1] if verbosity == Verbosity.TOP else suggestions
+        return self.general.lookup(phrase, verbosity, max_edit_distance=max_edit_distance,
+                                   include_unknown=include_unknown, **kwargs)
+
+    def lookup_compound(self, phrase, max_edit_distance=None, **kwargs):
+        return self.general.lookup_compound(phrase, max_edit_distance, **kwargs)
+
+
+def load_domain_sym_spell(path=DOMAIN_PATH, max_edit_distance=MAX_EDIT_DISTANCE, prefix_length=PREFIX_LENGTH):
+    """SymSpell over the domain dictionary alone; small enough to build on every start."""
+    sym_spell = SymSpell(max_edit_distance, prefix_length)
+    if not sym_spell.load_dictionary(path, term_index=0, count_index=1):
+        return None
+    return sym_spell
+
+
+def build_sym_spell(max_edit_distance=MAX_EDIT_DISTANCE, prefix_length=PREFIX_LENGTH):
+    """Builds a SymSpell instance from the bundled unigram and bigram dictionaries."""
+    sym_spell = SymSpell(max_edit_distance, prefix_length)
+    dictionary_path = pkg_resources.resource_filename("symspellpy", DICTIONARY_FILE)
+    bigram_path = pkg_resources.resource_filename("symspellpy", BIGRAM_FILE)
+    if not sym_spell.load_dictionary(dictionary_path, term_index=0, count_index=1):
+        print("Warning: Dictionary file not found")
+    if not sym_spell.load_bigram_dictionary(bigram_path, term_index=0, count_index=2):
+        print("Warning: Bigram dictionary file not found")
+    return sym_spell
+
+
+def build_index(path=INDEX_PATH, max_edit_distance=MAX_EDIT_DISTANCE, prefix_length=PREFIX_LENGTH):
+    """One-time build step: serializes the precomputed delete index to disk."""
+    sym_spell = build_sym_spell(max_edit_distance, prefix_length)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump((_index_version(max_edit_distance, prefix_length), sym_spell), f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+    print(f"[SymSpell] Index written to {path}")
+    return sym_spell
+
+
+def _load_index(path, max_edit_distance, prefix_length):
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "rb") as f:
+            version, sym_spell = pickle.load(f)
+    except Exception as e:
+        print(f"[SymSpell] Could not read index {path}: {e}")
+        return None
+    if version != _index_version(max_edit_distance, prefix_length):
+        print("[SymSpell] Index is stale. Rebuild it with spell_index.py.")
+        return None
+    return sym_spell
+
+
+def _general_sym_spell(max_edit_distance, prefix_length, path):
+    sym_spell = _load_index(path, max_edit_distance, prefix_length)
+    if sym_spell is not None:
+        print(f"[SymSpell] Loaded prebuilt index from {path}")
+    else:
+        sym_spell = build_sym_spell(max_edit_distance, prefix_length)
+        print("[SymSpell] Built index in memory (run spell_index.py to prebuild).")
+    return sym_spell
+
+
+def get_sym_spell(max_edit_distance=MAX_EDIT_DISTANCE, prefix_length=PREFIX_LENGTH, path=INDEX_PATH,
+                  domain_path=DOMAIN_PATH, tiered=True):
+    """
+    Returns the process-wide SymSpell instance, or None if symspellpy is missing.
+    With a domain dictionary on disk (and tiered=True) this is a TieredSymSpell
+    whose general tier loads lazily; otherwise the general index is loaded from
+    the prebuilt file if present, or built in memory once.
+    """
+    if SymSpell is None:
+        return None
+    tiered = tiered and os.path.exists(domain_path)
+    key = (max_edit_distance, prefix_length, tiered)
+    with _lock:
+        sym_spell = _instances.get(key)
+        if sym_spell is None:
+            domain = load_domain_sym_spell(domain_path, max_edit_distance, prefix_length) if tiered else None
+            if domain is not None:
+                sym_spell = TieredSymSpell(
+                    domain,
+                    lambda: get_sym_spell(max_edit_distance, prefix_length, path, tiered=False),
+                    general_words(),
+                )
+                print(f"[SymSpell] Loaded domain dictionary from {domain_path}")
+            else:
+                sym_spell = _general_sym_spell(max_edit_distance, prefix_length, path)
+            _instances[key] = sym_spell
+        return sym_spell
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Prebuild the SymSpell index or the domain dictionary")
+    parser.add_argument("--domain", action="store_true", help="Build the domain frequency dictionary instead")
+    parser.add_argument("--dataset", default=DATASET_PATH)
+    args = parser.parse_args()
+    if SymSpell is None:
+        print("symspellpy is not installed.")
+    elif args.domain:
+        build_domain_dictionary(dataset_path=args.dataset)
+    else:
+        build_index()
@@ -6,7 +6,7 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from modules.asr import ASRModule
 from modules.normalization import NormalizationModule
-from modules.nlu import NLUModule
+from modules.nlu_daemon import get_nlu
 from modules.executor import ActionExecutor
 
 class ECOPipeline:
@@ -20,7 +20,7 @@ class ECOPipeline:
              model_path = "Models/nlu_t5"
         else:
              model_path = "t5-small"
-        self.nlu = NLUModule(model_path=model_path)
+        self.nlu = get_nlu(model_path=model_path) # Shared daemon if running
         self.executor = ActionExecutor(safe_mode=True)
         print("Pipeline initialized.")
 
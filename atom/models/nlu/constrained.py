@@ -0,0 +1,225 @@
+import json
+
+try:
+    import torch
+except ImportError:
+    torch = None
+
+# Intent -> entity keys, as produced by scripts/generate_nlu_dataset.py
+DEFAULT_SCHEMA = {
+    "PLAY_MUSIC": ["song", "app"],
+    "OPEN_APP": ["app"],
+    "CLOSE_APP": ["app"],
+    "SEARCH_WEB": ["query"],
+    "SEND_MESSAGE": ["contact", "message"],
+}
+
+ANY = None # Marker: the model may pick any token (entity values are free text)
+
+
+def schema_from_dataset(path):
+    """Collects intent -> entity keys from an NLU JSONL dataset."""
+    schema = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip(): continue
+            record = json.loads(line)
+            keys = schema.setdefault(record["intent"], [])
+            for key in record.get("entities", {}):
+                if key not in keys:
+                    keys.append(key)
+    return schema
+
+
+def _insert(trie, tokens, terminal):
+    node = trie
+    for tok in tokens:
+        node = node.setdefault(tok, {})
+    node.setdefault("_end", []).append(terminal)
+
+
+class SchemaConstraint:
+    """
+    Token-level state machine for "INTENT: X | ENTITIES: k=v, k=v".
+    The header (intent names and the first key) and every following key are
+    token tries built with the model's own tokenizer; only values are free.
+    Keys are drawn from the intent's schema and never repeated.
+    """
+    def __init__(self, tokenizer, schema=None, max_value_tokens=16):
+        self.schema = schema or DEFAULT_SCHEMA
+        self.eos = tokenizer.eos_token_id
+        self.pad = tokenizer.pad_token_id
+        self.max_value_tokens = max_value_tokens
+
+        def encode(text):
+            return tokenizer(text, add_special_tokens=False).input_ids
+
+        self.header = {}
+        self.key_tries = {}
+        for intent, keys in self.schema.items():
+            _insert(self.header, encode(f"INTENT: {intent}"), ("intent", intent, None))
+            for key in keys:
+                _insert(self.header, encode(f"INTENT: {intent} | ENTITIES: {key}="), ("key", intent, key))
+                # Tokens of ", key=" as they appear after a value word
+                self.key_tries.setdefault(key, encode(f"x, {key}=")[1:])
+        self.separators = {seq[0] for seq in self.key_tries.values() if seq}
+        self._remaining = {}
+
+    def start(self):
+        return ("header", self.header, None, frozenset(), 0)
+
+    def _key_trie(self, intent, used):
+        trie = self._remaining.get((intent, used))
+        if trie is None:
+            trie = {}
+            for key in self.schema.get(intent, []):
+                if key not in used and self.key_tries.get(key):
+                    _insert(trie, self.key_tries[key], ("key", intent, key))
+            self._remaining[(intent, used)] = trie
+        return trie
+
+    def allowed(self, state):
+        """Returns the allowed next token ids, or ANY inside a value."""
+        phase, node, intent, used, value_len = state
+        if phase == "value":
+            if value_len >= self.max_value_tokens:
+                return [self.eos] + sorted(self._key_trie(intent, used))
+            return ANY
+        allowed = [tok for tok in node if tok != "_end"]
+        if any(kind == "intent" for kind, _, _ in node.get("_end", [])):
+            allowed.append(self.eos)
+        return allowed
+
+    def mask(self, state, logits):
+        """Applies the ANY-phase restrictions to a logits vector in place."""
+        phase, node, intent, used, value_len = state
+        blocked = [self.pad]
+        if value_len == 0:
+            blocked.append(self.eos)
+        if value_len == 0 or not self._key_trie(intent, used):
+            blocked.extend(self.separators)
+        logits[blocked] = float("-inf")
+        return logits
+
+    def advance(self, state, tok):
+        phase, node, intent, used, value_len = state
+        if phase == "value":
+            trie = self._key_trie(intent, used)
+            if value_len > 0 and tok in trie:
+                return ("keys", trie[tok], intent, used, 0)
+            return ("value", None, intent, used, value_len + 1)
+        child = node[tok]
+        for kind, end_intent, key in child.get("_end", []):
+            if kind == "key" and not [t for t in child if t != "_end"]:
+                return ("value", None, end_intent, used | {key}, 0)
+        return (phase, child, intent, used, value_len)
+
+
+class ConstrainedDecoder:
+    """
+    Greedy decoder that follows SchemaConstraint.
+    A batch is decoded together: one forward pass per step for every row,
+    each row with its own constraint state and logit mask, so the
+    micro-batches built by T5ServingEngine stay batched. Rows that finish
+    are fed padding until the last one ends.
+    A single text takes the unbatched path, which feeds a whole forced run
+    (the "INTENT:" / "| ENTITIES:" scaffolding, the tail of an intent or key
+    name) in one forward pass. stats["forward_passes"] counts the decoder
+    steps actually run.
+    """
+    def __init__(self, model, tokenizer, schema=None, max_new_tokens=32):
+        self.model = model
+        self.tokenizer = tokenizer
+        self.constraint = SchemaConstraint(tokenizer, schema)
+        self.max_new_tokens = max_new_tokens
+        self.start_id = model.config.decoder_start_token_id
+        self.stats = {"sequences": 0, "tokens": 0, "forward_passes": 0}
+
+    def decode(self, texts):
+        with torch.inference_mode():
+            inputs = self.tokenizer(texts, return_tensors="pt", padding=True, truncation=True)
+            encoder = self.model.get_encoder()(input_ids=inputs.input_ids, attention_mask=inputs.attention_mask)
+            if len(texts) == 1:
+                rows = [self._decode_one(encoder.last_hidden_state, inputs.attention_mask)]
+            else:
+                rows = self._decode_batch(encoder.last_hidden_state, inputs.attention_mask)
+            return [self.tokenizer.decode(tokens, skip_special_tokens=True) for tokens in rows]
+
+    def _pick(self, state, allowed, logits):
+        """Greedy choice for one row under its constraint state."""
+        if allowed is ANY:
+            return int(torch.argmax(self.constraint.mask(state, logits.clone())))
+        if len(allowed) == 1:
+            return allowed[0]
+        return allowed[int(torch.argmax(logits[allowed]))]
+
+    def _decode_batch(self, hidden, mask):
+        c = self.constraint
+        n = hidden.shape[0]
+        states = [c.start() for _ in range(n)]
+        generated = [[] for _ in range(n)]
+        done = [False] * n
+        inputs, past = [self.start_id] * n, None
+        while not all(done):
+            out = self.model(
+                encoder_outputs=(hidden,),
+                attention_mask=mask,
+                decoder_input_ids=torch.tensor(inputs).unsqueeze(1),
+                past_key_values=past,
+                use_cache=True,
+            )
+            self.stats["forward_passes"] += 1
+            past = out.past_key_values
+            logits = out.logits[:, -1]
+            for i in range(n):
+                tok = c.eos if done[i] else self._pick(states[i], c.allowed(states[i]), logits[i])
+                if tok == c.eos:
+                    done[i] = True
+                    inputs[i] = c.pad # Finished rows ride along; their logits are ignored
+                    continue
+                generated[i].append(tok)
+                states[i] = c.advance(states[i], tok)
+                inputs[i] = tok
+                # Nothing left but EOS: no need to wait for another pass
+                if len(generated[i]) >= self.max_new_tokens or c.allowed(states[i]) == [c.eos]:
+                    done[i] = True
+
+        self.stats["sequences"] += n
+        self.stats["tokens"] += sum(len(g) for g in generated)
+        return generated
+
+    def _decode_one(self, hidden, mask):
+        c = self.constraint
+        state = c.start()
+        generated, pending, past = [], [self.start_id], None
+        while len(generated) < self.max_new_tokens:
+            allowed = c.allowed(state)
+            # Fast-forward through tokens the schema forces
+            while allowed is not ANY and len(allowed) == 1 and allowed[0] != c.eos:
+                tok = allowed[0]
+                pending.append(tok)
+                generated.append(tok)
+                state = c.advance(state, tok)
+                allowed = c.allowed(state)
+            if allowed is not ANY and allowed == [c.eos]:
+                break
+
+            out = self.model(
+                encoder_outputs=(hidden,),
+                attention_mask=mask,
+                decoder_input_ids=torch.tensor([pending]),
+                past_key_values=past,
+                use_cache=True,
+            )
+            self.stats["forward_passes"] += 1
+            past = out.past_key_values
+            tok = self._pick(state, allowed, out.logits[0, -1])
+            if tok == c.eos:
+                break
+            generated.append(tok)
+            state = c.advance(state, tok)
+            pending = [tok]
+
+        self.stats["sequences"] += 1
+        self.stats["tokens"] += len(generated)
+        return generated
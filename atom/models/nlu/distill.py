@@ -0,0 +1,166 @@
+import os
+import sys
+import json
+import time
+import argparse
+
+import numpy as np
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from models.nlu.distilled import (
+    DistilledNLU, WEIGHTS_PATH, N_FEATURES, FORMAT_VERSION,
+    tokenize, intent_features, token_features, prev_tag_feature, bio_tags,
+)
+
+DATA_FILE = os.path.join("data", "nlu", "nlu_dataset_50k.jsonl")
+TEACHER_DIR = os.path.join("models", "nlu", "saved_model")
+
+
+def load_examples(path):
+    """Unique (text, intent, entities) records; the generated dataset repeats most commands."""
+    examples = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip(): continue
+            record = json.loads(line)
+            text = " ".join(tokenize(record["text"]))
+            examples.setdefault(text, (record["intent"], record.get("entities", {})))
+    return examples
+
+
+def relabel_with_teacher(examples, teacher_dir, extra_texts=()):
+    """Replaces labels with T5 predictions (the distillation targets)."""
+    from models.nlu.serving import T5ServingEngine, parse_t5_output
+    engine = T5ServingEngine(teacher_dir, constrained=True)
+    texts = list(examples) + [" ".join(tokenize(t)) for t in extra_texts if t.strip()]
+    relabeled = dict(examples)
+    for text, output in zip(texts, engine.predict_many(texts)):
+        intent, entities = parse_t5_output(output)
+        if intent:
+            relabeled[text] = (intent, entities)
+    engine.close()
+    return relabeled
+
+
+class AveragedPerceptron:
+    """Multiclass perceptron over hashed sparse features, with weight averaging."""
+    def __init__(self, n_classes):
+        self.W = np.zeros((N_FEATURES, n_classes), dtype=np.float32)
+        self._totals = np.zeros_like(self.W)
+        self._step = 1
+
+    def predict(self, idx):
+        return int(self.W[idx].sum(axis=0).argmax())
+
+    def update(self, idx, gold, pred):
+        if gold != pred:
+            # add.at: the same feature id can occur more than once in idx
+            np.add.at(self.W, (idx, gold), 1.0)
+            np.add.at(self.W, (idx, pred), -1.0)
+            np.add.at(self._totals, (idx, gold), self._step)
+            np.add.at(self._totals, (idx, pred), -self._step)
+        self._step += 1
+
+    def averaged(self):
+        return (self.W - self._totals / self._step).astype(np.float32)
+
+
+def train(examples, epochs=8, seed=13):
+    rng = np.random.default_rng(seed)
+    intent_labels = sorted({intent for intent, _ in examples.values()})
+    slot_labels = ["O"] + sorted({
+        f"{prefix}-{key}" for _, entities in examples.values() for key in entities for prefix in "BI"
+    })
+    intent_ids = {label: i for i, label in enumerate(intent_labels)}
+    tag_ids = {label: i for i, label in enumerate(slot_labels)}
+
+    # Features are fixed per example (slot features use the gold previous tag)
+    intent_data, slot_data = [], []
+    for text, (intent, entities) in examples.items():
+        words = text.split()
+        intent_data.append((intent_features(words), intent_ids[intent]))
+        tags = bio_tags(words, entities)
+        for i, tag in enumerate(tags):
+            prev = tags[i - 1] if i else "O"
+            idx = np.append(token_features(words, i, intent), prev_tag_feature(intent, prev))
+            slot_data.append((idx, tag_ids[tag]))
+
+    classifier = AveragedPerceptron(len(intent_labels))
+    tagger = AveragedPerceptron(len(slot_labels))
+    for epoch in range(epochs):
+        for model, data in ((classifier, intent_data), (tagger, slot_data)):
+            for k in rng.permutation(len(data)):
+                idx, gold = data[k]
+                model.update(idx, gold, model.predict(idx))
+    return classifier.averaged(), intent_labels, tagger.averaged(), slot_labels
+
+
+def save(path, intent_W, intent_labels, slot_W, slot_labels):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    np.savez(
+        path,
+        version=np.array(FORMAT_VERSION),
+        n_features=np.array(N_FEATURES),
+        intent_W=intent_W,
+        intent_labels=np.array(intent_labels),
+        slot_W=slot_W,
+        slot_labels=np.array(slot_labels),
+    )
+    return path
+
+
+def evaluate(nlu, examples):
+    intent_ok = exact = 0
+    latencies = []
+    for text, (intent, entities) in examples.items():
+        start = time.perf_counter()
+        result = nlu.parse(text)
+        latencies.append(time.perf_counter() - start)
+        intent_ok += result["intent"] == intent
+        exact += result["intent"] == intent and result["entities"] == entities
+    latencies.sort()
+    n = max(1, len(examples))
+    print(f"Held-out: intent acc {intent_ok / n:.3f} | exact match {exact / n:.3f} | "
+          f"p50 {latencies[len(latencies) // 2] * 1e6:.0f} us | p99 {latencies[int(len(latencies) * 0.99)] * 1e6:.0f} us")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Distill the NLU into a NumPy intent classifier + slot tagger")
+    parser.add_argument("--data", default=DATA_FILE)
+    parser.add_argument("--out", default=WEIGHTS_PATH)
+    parser.add_argument("--teacher", default=None, help="T5 model dir whose outputs become the labels")
+    parser.add_argument("--unlabeled", default=None, help="Extra texts (one per line) labelled by the teacher")
+    parser.add_argument("--epochs", type=int, default=8)
+    parser.add_argument("--holdout", type=float, default=0.1)
+    args = parser.parse_args()
+
+    examples = load_examples(args.data)
+    print(f"📚 {len(examples)} unique examples from {args.data}")
+    if args.teacher:
+        extra = []
+        if args.unlabeled:
+            with open(args.unlabeled, "r", encoding="utf-8") as f:
+                extra = f.read().splitlines()
+        examples = relabel_with_teacher(examples, args.teacher, extra)
+        print(f"🧠 Relabelled with T5 teacher from {args.teacher} ({len(examples)} examples)")
+
+    texts = sorted(examples)
+    np.random.default_rng(0).shuffle(texts)
+    n_test = int(len(texts) * args.holdout)
+    test = {t: examples[t] for t in texts[:n_test]}
+    train_set = {t: examples[t] for t in texts[n_test:]}
+
+    start = time.perf_counter()
+    weights = train(train_set, epochs=args.epochs)
+    print(f"⏱️  Trained in {time.perf_counter() - start:.1f}s")
+    save(args.out, *weights)
+    print(f"💾 Saved {args.out} ({os.path.getsize(args.out) / 1e6:.1f} MB)")
+
+    if test:
+        evaluate(DistilledNLU(args.out), test)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+import os
+import zlib
+
+import numpy as np
+
+WEIGHTS_PATH = os.path.join("models", "nlu", "distilled", "distilled_nlu.npz")
+N_FEATURES = 1 << 16
+FORMAT_VERSION = 1
+
+
+def feature_id(name):
+    # crc32 rather than hash(): ids must be stable across processes
+    return zlib.crc32(name.encode("utf-8")) & (N_FEATURES - 1)
+
+
+def tokenize(text):
+    return text.lower().strip().split()
+
+
+def intent_features(words):
+    """Char 2-4 grams over the padded utterance plus word unigrams/bigrams."""
+    text = f" {' '.join(words)} "
+    feats = ["bias"]
+    for n in (2, 3, 4):
+        feats.extend("c:" + text[i:i + n] for i in range(len(text) - n + 1))
+    feats.extend("w:" + w for w in words)
+    feats.extend(f"b:{a}_{b}" for a, b in zip(words, words[1:]))
+    return np.fromiter((feature_id(f) for f in feats), dtype=np.int64)
+
+
+def token_features(words, i, intent):
+    """Window features for token i, conjoined with the utterance intent."""
+    pad = ["<s>", "<s>"] + words + ["</s>", "</s>"]
+    w, p1, p2, n1, n2 = pad[i + 2], pad[i + 1], pad[i], pad[i + 3], pad[i + 4]
+    feats = [
+        "i:" + intent, "w0:" + w, "w-1:" + p1, "w+1:" + n1, "w-2:" + p2, "w+2:" + n2,
+        "suf:" + w[-3:], f"iw0:{intent}_{w}", f"iw-1:{intent}_{p1}", f"iw+1:{intent}_{n1}",
+        f"pos:{intent}_{min(i, 4)}",
+    ]
+    return np.fromiter((feature_id(f) for f in feats), dtype=np.int64)
+
+
+def prev_tag_feature(intent, prev_tag):
+    return feature_id(f"t-1:{intent}_{prev_tag}")
+
+
+def bio_tags(words, entities):
+    """Gold BIO tags: each entity value is located as a word span in the utterance."""
+    tags = ["O"] * len(words)
+    for key, value in entities.items():
+        span = tokenize(str(value))
+        if not span:
+            continue
+        for start in range(len(words) - len(span) + 1):
+            if words[start:start + len(span)] == span and all(t == "O" for t in tags[start:start + len(span)]):
+                tags[start] = "B-" + key
+                for j in range(start + 1, start + len(span)):
+                    tags[j] = "I-" + key
+                break
+    return tags
+
+
+class DistilledNLU:
+    """
+    NumPy-only intent classifier + slot tagger distilled from the NLU dataset
+    (and optionally T5 outputs) by distill.py.
+    Same parse() contract as RuleBasedNLU.
+    """
+    def __init__(self, path=WEIGHTS_PATH, min_confidence=0.5):
+        with np.load(path, allow_pickle=False) as data:
+            if int(data["version"]) != FORMAT_VERSION or int(data["n_features"]) != N_FEATURES:
+                raise ValueError(f"Incompatible distilled weights at {path}")
+            self.intent_W = data["intent_W"]
+            self.intent_labels = [str(x) for x in data["intent_labels"]]
+            self.slot_W = data["slot_W"]
+            self.slot_labels = [str(x) for x in data["slot_labels"]]
+        self.min_confidence = min_confidence
+
+        # Tags that may not follow each tag: I-x is only legal after B-x/I-x
+        self.outside = self.slot_labels.index("O")
+        self.illegal_after = []
+        for prev in self.slot_labels:
+            prev_key = prev[2:] if prev != "O" else None
+            self.illegal_after.append(np.array([
+                j for j, tag in enumerate(self.slot_labels)
+                if tag.startswith("I-") and tag[2:] != prev_key
+            ], dtype=np.int64))
+
+    def classify(self, words):
+        scores = self.intent_W[intent_features(words)].sum(axis=0)
+        probs = np.exp(scores - scores.max())
+        probs /= probs.sum()
+        best = int(probs.argmax())
+        return self.intent_labels[best], float(probs[best])
+
+    def tag(self, words, intent):
+        tags, prev = [], self.outside
+        for i in range(len(words)):
+            idx = token_features(words, i, intent)
+            scores = self.slot_W[idx].sum(axis=0) + self.slot_W[prev_tag_feature(intent, self.slot_labels[prev])]
+            scores[self.illegal_after[prev]] = -np.inf
+            prev = int(scores.argmax())
+            tags.append(self.slot_labels[prev])
+        return tags
+
+    def parse(self, text):
+        words = tokenize(text)
+        if not words:
+            return {"intent": "UNKNOWN", "entities": {}, "confidence": 0.0}
+        intent, confidence = self.classify(words)
+        if confidence < self.min_confidence:
+            return {"intent": "UNKNOWN", "entities": {}, "confidence": confidence}
+
+        entities, key = {}, None
+        for word, tag in zip(words, self.tag(words, intent)):
+            if tag.startswith("B-"):
+                key = tag[2:]
+                if key in entities: # Keep the first span per slot
+                    key = None
+                    continue
+                entities[key] = word
+            elif tag.startswith("I-") and key == tag[2:]:
+                entities[key] += " " + word
+            else:
+                key = None
+        return {"intent": intent, "entities": entities, "confidence": confidence}
+
+
+if __name__ == "__main__":
+    nlu = DistilledNLU()
+    print(nlu.parse("play believer on spotify"))
+    print(nlu.parse("open youtube"))
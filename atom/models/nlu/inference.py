@@ -4,23 +4,32 @@ import sys
 # Add project root to path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 
+from models.nlu.rule_based import RuleBasedNLU
+
+try:
+    from models.nlu.distilled import DistilledNLU, WEIGHTS_PATH as DISTILLED_PATH
+except ImportError:
+    DistilledNLU = None
+
 try:
-    import torch
-    from transformers import T5ForConditionalGeneration, T5Tokenizer
+    from models.nlu.serving import T5ServingEngine
     USE_ML = True
 except ImportError:
     print("⚠️  ML Libraries not found. Switching to Rule-Based Fallback.")
     USE_ML = False
-    from models.nlu.rule_based import RuleBasedNLU
 
 MODEL_DIR = os.path.join("models", "nlu", "saved_model")
 
 def load_brain():
+    # ATOM_NLU_ENGINE=distilled picks the NumPy classifier built by distill.py
+    if os.environ.get("ATOM_NLU_ENGINE", "").lower() == "distilled":
+        if DistilledNLU is not None and os.path.exists(DISTILLED_PATH):
+            return ("DISTILLED", DistilledNLU(DISTILLED_PATH), None)
+        print("⚠️  Distilled weights not found (run models/nlu/distill.py). Using default engine.")
     if USE_ML:
         try:
-            tokenizer = T5Tokenizer.from_pretrained(MODEL_DIR, legacy=False)
-            model = T5ForConditionalGeneration.from_pretrained(MODEL_DIR)
-            return ("ML", tokenizer, model)
+            # Quantized, micro-batching CPU engine with schema-constrained decoding
+            return ("ML", T5ServingEngine(MODEL_DIR, constrained=True), None)
         except:
             print("⚠️  Model not found. Switching to Rule-Based Fallback.")
             return ("RULE", RuleBasedNLU(), None)
@@ -29,12 +38,11 @@ def load_brain():
 
 def predict(text, engine, tokenizer=None, model=None):
     if engine == "ML":
-        input_ids = tokenizer(text, return_tensors="pt").input_ids
-        outputs = model.generate(input_ids)
-        return tokenizer.decode(outputs[0], skip_special_tokens=True)
+        # In this case 'tokenizer' is the T5ServingEngine instance
+        return tokenizer.predict(text)
     else:
-        # Rule Based
-        result = tokenizer.parse(text) # In this case 'tokenizer' is the RuleBasedNLU instance
+        # Rule Based / Distilled
+        result = tokenizer.parse(text) # In this case 'tokenizer' is the RuleBasedNLU or DistilledNLU instance
         if result["intent"] == "UNKNOWN":
             return "I didn't understand that."
         
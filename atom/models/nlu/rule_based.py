@@ -1,8 +1,56 @@
+import os
 import re
+import sys
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from ai_core.modules.keyword_automaton import KeywordAutomaton
+
+META = set(".^$*+?{}[]\\|()")
+
+
+def leading_literal(pattern):
+    """
+    The literal text every match of pattern must contain ("" if unknown):
+    the characters before the first regex metacharacter, provided the
+    pattern has no top-level alternation.
+    """
+    depth, escaped, in_class = 0, False, False
+    for ch in pattern:
+        if escaped:
+            escaped = False
+        elif ch == "\\":
+            escaped = True
+        elif in_class:
+            in_class = ch != "]"
+        elif ch == "[":
+            in_class = True
+        elif ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        elif ch == "|" and depth == 0:
+            return ""
+    literal = []
+    for ch in pattern:
+        if ch in META:
+            if ch in "*?{" and literal:
+                literal.pop() # Quantifier makes the previous char optional
+            break
+        literal.append(ch)
+    return "".join(literal)
 
 class RuleBasedNLU:
-    def __init__(self):
-        self.intents = {
+    """
+    Regex intent table. Patterns are tried in table order and the first one
+    found anywhere in the utterance wins.
+    compile() precompiles every pattern and indexes each by the literal it
+    must contain ("play ", "send message to "), so parse() makes one
+    keyword-automaton scan and only runs the few candidate patterns.
+    """
+    def __init__(self, intents=None):
+        self.intents = intents or {
             "PLAY_MUSIC": [
                 r"play (?P<song>.+) on (?P<app>.+)",
                 r"play (?P<song>.+)",
@@ -27,21 +75,37 @@ class RuleBasedNLU:
                 r"text (?P<contact>.+) (?P<message>.+)"
             ]
         }
+        self.compile()
 
-    def parse(self, text):
-        text = text.lower().strip()
-        
+    def compile(self):
+        """Rebuilds the matcher; call again after editing self.intents."""
+        self.rules = []
+        self.automaton = KeywordAutomaton()
+        self.unfiltered = set() # Rules with no usable literal are always tried
         for intent, patterns in self.intents.items():
             for pattern in patterns:
-                match = re.search(pattern, text)
-                if match:
-                    entities = match.groupdict()
-                    return {
-                        "intent": intent,
-                        "entities": entities,
-                        "confidence": 1.0
-                    }
-        
+                rule = len(self.rules)
+                self.rules.append((intent, re.compile(pattern)))
+                literal = leading_literal(pattern)
+                if literal:
+                    self.automaton.add(literal, rule)
+                else:
+                    self.unfiltered.add(rule)
+        self.automaton.compile()
+
+    def parse(self, text):
+        text = text.lower().strip()
+
+        for rule in sorted(self.automaton.scan(text) | self.unfiltered):
+            intent, pattern = self.rules[rule]
+            match = pattern.search(text)
+            if match:
+                return {
+                    "intent": intent,
+                    "entities": match.groupdict(),
+                    "confidence": 1.0
+                }
+
         # Default fallback
         return {
             "intent": "UNKNOWN",
@@ -49,6 +113,11 @@ class RuleBasedNLU:
             "confidence": 0.0
         }
 
+    def parse_many(self, texts):
+        """Bulk parse; results are in input order."""
+        parse = self.parse
+        return [parse(text) for text in texts]
+
 if __name__ == "__main__":
     nlu = RuleBasedNLU()
     print(nlu.parse("play believer on spotify"))
@@ -0,0 +1,170 @@
+import os
+import sys
+import time
+import queue
+import threading
+from concurrent.futures import Future
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import torch
+from transformers import T5ForConditionalGeneration, T5Tokenizer
+
+from ai_core.modules.result_cache import LRUCache
+from models.nlu.constrained import ConstrainedDecoder
+
+MODEL_DIR = os.path.join("models", "nlu", "saved_model")
+
+
+def parse_t5_output(output):
+    """
+    Parses the training target format back into (intent, entities).
+    "INTENT: PLAY_MUSIC | ENTITIES: song=baby, app=spotify" -> ("PLAY_MUSIC", {...})
+    """
+    intent, entities = None, {}
+    for part in output.split("|"):
+        label, _, value = part.partition(":")
+        label = label.strip().upper()
+        if label == "INTENT":
+            intent = value.strip() or None
+        elif label == "ENTITIES":
+            for pair in value.split(","):
+                key, sep, val = pair.partition("=")
+                if sep and key.strip():
+                    entities[key.strip()] = val.strip()
+    return intent, entities
+
+
+class T5ServingEngine:
+    """
+    CPU serving engine for the fine-tuned T5 NLU model.
+    - Linear layers are dynamically quantized to int8.
+    - Concurrent predict() calls are grouped into micro-batches collected for
+      at most batch_window_ms (or until max_batch_size requests are queued).
+    - Each micro-batch is encoded once and decoding reuses those encoder
+      outputs plus the decoder KV cache; generation is capped at max_new_tokens.
+    - Repeated inputs are answered from an LRU cache without touching the model.
+    - constrained=True decodes against the intent/entity schema (see constrained.py).
+    """
+    def __init__(self, model_dir=MODEL_DIR, quantize=True, max_batch_size=16, batch_window_ms=5.0,
+                 max_new_tokens=32, num_threads=None, cache_size=512, constrained=False, schema=None):
+        self.model_dir = model_dir
+        self.max_batch_size = max_batch_size
+        self.batch_window = batch_window_ms / 1000.0
+        self.max_new_tokens = max_new_tokens
+        self.cache = LRUCache(max_size=cache_size, ttl=float("inf"))
+
+        if num_threads:
+            torch.set_num_threads(num_threads)
+        self.tokenizer = T5Tokenizer.from_pretrained(model_dir, legacy=False)
+        model = T5ForConditionalGeneration.from_pretrained(model_dir).to("cpu").eval()
+        if quantize:
+            model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        self.model = model
+        self.quantized = quantize
+        self.decoder = ConstrainedDecoder(model, self.tokenizer, schema, max_new_tokens) if constrained else None
+
+        self.stats = {"requests": 0, "batches": 0, "batched_requests": 0, "cache_hits": 0}
+        self._pid = None
+        self._queue = None
+        self._worker = None
+        self._start_lock = threading.Lock()
+
+    # --- Batching ---
+
+    def _ensure_worker(self):
+        # Threads don't survive fork(); restart the batcher in child processes.
+        if self._worker is not None and self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._worker is not None and self._pid == os.getpid():
+                return
+            self._queue = queue.Queue()
+            self._worker = threading.Thread(target=self._batch_loop, name="t5-batcher", daemon=True)
+            self._pid = os.getpid()
+            self._worker.start()
+
+    def _batch_loop(self):
+        q = self._queue
+        while True:
+            first = q.get()
+            if first is None:
+                return
+            batch = [first]
+            deadline = time.perf_counter() + self.batch_window
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    item = q.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    q.put(None) # Stop after this batch
+                    break
+                batch.append(item)
+
+            texts = [text for text, _ in batch]
+            try:
+                outputs = self.generate(texts)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            self.stats["batches"] += 1
+            self.stats["batched_requests"] += len(batch)
+            for (text, future), output in zip(batch, outputs):
+                self.cache.put(text, output)
+                future.set_result(output)
+
+    def submit(self, text):
+        """Queues text for the next micro-batch. Returns a Future with the decoded output."""
+        self.stats["requests"] += 1
+        future = Future()
+        cached = self.cache.get(text)
+        if cached is not None:
+            self.stats["cache_hits"] += 1
+            future.set_result(cached)
+            return future
+        self._ensure_worker()
+        self._queue.put((text, future))
+        return future
+
+    def predict(self, text, timeout=None):
+        return self.submit(text).result(timeout=timeout)
+
+    def close(self):
+        if self._worker is not None and self._pid == os.getpid():
+            self._queue.put(None)
+            self._worker.join(timeout=1.0)
+        self._worker = None
+
+    # --- Model ---
+
+    def generate(self, texts):
+        """Runs one batched encode + capped greedy decode. Pads only to the batch's longest input."""
+        if self.decoder is not None:
+            return self.decoder.decode(texts)
+        with torch.inference_mode():
+            inputs = self.tokenizer(texts, return_tensors="pt", padding=True, truncation=True)
+            encoder_outputs = self.model.get_encoder()(
+                input_ids=inputs.input_ids, attention_mask=inputs.attention_mask
+            )
+            outputs = self.model.generate(
+                encoder_outputs=encoder_outputs,
+                attention_mask=inputs.attention_mask,
+                max_new_tokens=self.max_new_tokens,
+                num_beams=1,
+                do_sample=False,
+                use_cache=True,
+            )
+        return self.tokenizer.batch_decode(outputs, skip_special_tokens=True)
+
+    def predict_many(self, texts):
+        """Bulk path for offline callers: chunks texts into max_batch_size batches directly."""
+        results = []
+        for i in range(0, len(texts), self.max_batch_size):
+            results.extend(self.generate(texts[i:i + self.max_batch_size]))
+        return results
@@ -1,15 +1,23 @@
 import os
 import json
+import time
+import zlib
+import hashlib
 import logging
+import argparse
+from collections import Counter
 from dataclasses import dataclass, field
 from typing import Optional
 
 import torch
-from datasets import load_dataset
+import torch.nn.functional as F
+from datasets import Dataset, load_dataset, load_from_disk
 from transformers import (
+    DataCollatorForSeq2Seq,
     T5ForConditionalGeneration,
     T5Tokenizer,
     Trainer,
+    TrainerCallback,
     TrainingArguments,
 )
 
@@ -21,20 +29,23 @@ logger = logging.getLogger(__name__)
 MODEL_NAME = "t5-small"
 DATA_FILE = os.path.join("data", "nlu", "nlu_dataset_50k.jsonl")
 OUTPUT_DIR = os.path.join("models", "nlu", "saved_model")
+CACHE_DIR = os.path.join("data", "nlu", "tokenized")
 MAX_SOURCE_LENGTH = 128
 MAX_TARGET_LENGTH = 128
+CACHE_VERSION = 1
+HOLDOUT_BUCKETS = 10 # 1 in 10 unique texts is held out for eval
+
+def format_target(intent, entities_dict):
+    # Format target: "INTENT: PLAY_MUSIC | ENTITIES: song=baby, app=spotify"
+    entity_str = ", ".join([f"{k}={v}" for k, v in entities_dict.items()])
+    target_str = f"INTENT: {intent}"
+    if entity_str:
+        target_str += f" | ENTITIES: {entity_str}"
+    return target_str
 
 def preprocess_function(examples, tokenizer):
     inputs = examples["text"]
-    targets = []
-    
-    # Format target: "INTENT: PLAY_MUSIC | ENTITIES: song=baby, app=spotify"
-    for intent, entities_dict in zip(examples["intent"], examples["entities"]):
-        entity_str = ", ".join([f"{k}={v}" for k, v in entities_dict.items()])
-        target_str = f"INTENT: {intent}"
-        if entity_str:
-            target_str += f" | ENTITIES: {entity_str}"
-        targets.append(target_str)
+    targets = [format_target(i, e) for i, e in zip(examples["intent"], examples["entities"])]
 
     model_inputs = tokenizer(inputs, max_length=MAX_SOURCE_LENGTH, truncation=True, padding="max_length")
     labels = tokenizer(targets, max_length=MAX_TARGET_LENGTH, truncation=True, padding="max_length")
@@ -42,55 +53,185 @@ def preprocess_function(examples, tokenizer):
     model_inputs["labels"] = labels["input_ids"]
     return model_inputs
 
-def train():
+def is_heldout(text):
+    # Split on a stable hash of the text so duplicates never straddle train/eval
+    return zlib.crc32(text.encode("utf-8")) % HOLDOUT_BUCKETS == 0
+
+def load_pairs(path):
+    """Returns (train, eval) Counters of (text, target) -> frequency."""
+    train_pairs, eval_pairs = Counter(), Counter()
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip(): continue
+            record = json.loads(line)
+            pair = (record["text"], format_target(record["intent"], record.get("entities", {})))
+            (eval_pairs if is_heldout(pair[0]) else train_pairs)[pair] += 1
+    return train_pairs, eval_pairs
+
+def tokenize_pairs(pairs, tokenizer):
+    """Unpadded input/label ids with the duplicate count as a weight; padding happens per batch."""
+    texts = [text for text, _ in pairs]
+    targets = [target for _, target in pairs]
+    model_inputs = tokenizer(texts, max_length=MAX_SOURCE_LENGTH, truncation=True)
+    labels = tokenizer(targets, max_length=MAX_TARGET_LENGTH, truncation=True)
+    return Dataset.from_dict({
+        "input_ids": model_inputs["input_ids"],
+        "attention_mask": model_inputs["attention_mask"],
+        "labels": labels["input_ids"],
+        "weight": [float(pairs[p]) for p in pairs],
+        "length": [len(ids) for ids in model_inputs["input_ids"]],
+    })
+
+def cache_key(path):
+    stat = os.stat(path)
+    raw = f"{CACHE_VERSION}:{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}:{MODEL_NAME}:" \
+          f"{MAX_SOURCE_LENGTH}:{MAX_TARGET_LENGTH}:{HOLDOUT_BUCKETS}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+def load_tokenized(path, tokenizer):
+    """Deduplicated, tokenized (train, eval) datasets, cached on disk per dataset file version."""
+    cache = os.path.join(CACHE_DIR, cache_key(path))
+    if os.path.isdir(cache):
+        logger.info(f"Using tokenization cache {cache}")
+        return load_from_disk(os.path.join(cache, "train")), load_from_disk(os.path.join(cache, "eval"))
+
+    train_pairs, eval_pairs = load_pairs(path)
+    logger.info(f"Deduplicated {sum(train_pairs.values())} train rows to {len(train_pairs)} weighted samples")
+    train_dataset = tokenize_pairs(train_pairs, tokenizer)
+    val_dataset = tokenize_pairs(eval_pairs, tokenizer)
+    train_dataset.save_to_disk(os.path.join(cache, "train"))
+    val_dataset.save_to_disk(os.path.join(cache, "eval"))
+    return train_dataset, val_dataset
+
+class WeightedTrainer(Trainer):
+    """Per-sample seq2seq loss, weighted by duplicate count (weight 1 when absent)."""
+    def compute_loss(self, model, inputs, return_outputs=False, **kwargs):
+        weights = inputs.pop("weight", None)
+        inputs.pop("length", None)
+        labels = inputs["labels"]
+        outputs = model(**inputs)
+        token_loss = F.cross_entropy(outputs.logits.transpose(1, 2), labels, ignore_index=-100, reduction="none")
+        mask = (labels != -100).float()
+        per_sample = (token_loss * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1.0)
+        if weights is None:
+            loss = per_sample.mean()
+        else:
+            weights = weights.to(per_sample.dtype)
+            loss = (per_sample * weights).sum() / weights.sum()
+        return (loss, outputs) if return_outputs else loss
+
+class TargetLossCallback(TrainerCallback):
+    """Records wall-clock time until eval loss first reaches target, then stops training."""
+    def __init__(self, target):
+        self.target = target
+        self.start = time.perf_counter()
+        self.reached_at = None
+
+    def on_evaluate(self, args, state, control, metrics=None, **kwargs):
+        loss = (metrics or {}).get("eval_loss")
+        if self.target is not None and loss is not None and loss <= self.target and self.reached_at is None:
+            self.reached_at = time.perf_counter() - self.start
+            logger.info(f"Eval loss {loss:.4f} <= {self.target} after {self.reached_at:.1f}s")
+            control.should_training_stop = True
+
+def make_collator(tokenizer, model):
+    pad = DataCollatorForSeq2Seq(tokenizer, model=model, label_pad_token_id=-100)
+    def collate(features):
+        weights = [f.pop("weight", 1.0) for f in features]
+        for f in features:
+            f.pop("length", None)
+        batch = pad(features)
+        batch["weight"] = torch.tensor(weights)
+        return batch
+    return collate
+
+def train(fast=False, epochs=None, target_loss=None, eval_steps=None):
     logger.info("Loading tokenizer...")
     tokenizer = T5Tokenizer.from_pretrained(MODEL_NAME, legacy=False)
 
     logger.info(f"Loading dataset from {DATA_FILE}...")
-    dataset = load_dataset("json", data_files=DATA_FILE, split="train")
-
-    # Split dataset
-    dataset = dataset.train_test_split(test_size=0.1)
-    train_dataset = dataset["train"]
-    val_dataset = dataset["test"]
-
-    logger.info("Preprocessing dataset...")
-    train_dataset = train_dataset.map(lambda x: preprocess_function(x, tokenizer), batched=True)
-    val_dataset = val_dataset.map(lambda x: preprocess_function(x, tokenizer), batched=True)
+    if fast:
+        # Dedup + cached tokenization; batches are length-bucketed and padded dynamically
+        train_dataset, val_dataset = load_tokenized(DATA_FILE, tokenizer)
+    else:
+        dataset = load_dataset("json", data_files=DATA_FILE, split="train")
+        train_dataset = dataset.filter(lambda x: not is_heldout(x["text"]))
+        logger.info("Preprocessing dataset...")
+        train_dataset = train_dataset.map(lambda x: preprocess_function(x, tokenizer), batched=True,
+                                          remove_columns=dataset.column_names)
+        # Same weighted eval set as the fast mode, so eval losses are comparable
+        _, val_dataset = load_tokenized(DATA_FILE, tokenizer)
 
     logger.info("Loading model...")
     model = T5ForConditionalGeneration.from_pretrained(MODEL_NAME)
 
+    strategy = "steps" if eval_steps else "epoch"
     training_args = TrainingArguments(
         output_dir=OUTPUT_DIR,
-        evaluation_strategy="epoch",
+        evaluation_strategy=strategy,
+        eval_steps=eval_steps,
         learning_rate=2e-4,
         per_device_train_batch_size=8, # Small batch size for standard laptops
         per_device_eval_batch_size=8,
-        num_train_epochs=3,
+        num_train_epochs=epochs or (30 if fast else 3), # A fast epoch covers each unique sample once
         weight_decay=0.01,
         save_total_limit=2,
-        save_strategy="epoch",
+        save_strategy=strategy,
+        save_steps=eval_steps or 500,
         load_best_model_at_end=True,
         logging_dir='./logs',
         logging_steps=100,
+        group_by_length=fast,
+        length_column_name="length",
+        remove_unused_columns=False,
         use_cpu=not torch.cuda.is_available(), # Auto-detect GPU
     )
 
-    trainer = Trainer(
+    target = TargetLossCallback(target_loss)
+    trainer = WeightedTrainer(
         model=model,
         args=training_args,
         train_dataset=train_dataset,
         eval_dataset=val_dataset,
+        data_collator=make_collator(tokenizer, model),
+        callbacks=[target],
     )
 
     logger.info("Starting training...")
-    trainer.train()
+    start = time.perf_counter()
+    metrics = trainer.train().metrics
+    wall = time.perf_counter() - start
+    final_eval = trainer.evaluate()
+
+    weights = train_dataset["weight"] if "weight" in train_dataset.column_names else [1.0] * len(train_dataset)
+    epochs_run = metrics.get("epoch", training_args.num_train_epochs)
+    report = {
+        "mode": "fast" if fast else "baseline",
+        "train_rows": len(train_dataset),
+        "represented_samples": sum(weights),
+        "wall_seconds": wall,
+        "rows_per_second": metrics.get("train_samples_per_second"),
+        # Samples the run accounted for (rows x duplicate weight) per second
+        "effective_samples_per_second": sum(weights) * epochs_run / wall if wall else None,
+        "target_loss": target_loss,
+        "seconds_to_target_loss": target.reached_at,
+        "final_eval_loss": final_eval.get("eval_loss"),
+    }
+    logger.info("Training report: " + json.dumps(report))
 
     logger.info(f"Saving model to {OUTPUT_DIR}...")
     model.save_pretrained(OUTPUT_DIR)
     tokenizer.save_pretrained(OUTPUT_DIR)
+    with open(os.path.join(OUTPUT_DIR, "train_report.json"), "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
     logger.info("Training complete.")
+    return report
 
 if __name__ == "__main__":
-    train()
+    parser = argparse.ArgumentParser(description="Fine-tune T5 on the NLU dataset")
+    parser.add_argument("--fast", action="store_true", help="Dedup + cached tokenization + length-bucketed dynamic padding")
+    parser.add_argument("--epochs", type=float, default=None)
+    parser.add_argument("--target-loss", type=float, default=None, help="Stop once eval loss reaches this; reports time to it")
+    parser.add_argument("--eval-steps", type=int, default=None, help="Evaluate every N steps instead of every epoch")
+    args = parser.parse_args()
+    train(fast=args.fast, epochs=args.epochs, target_loss=args.target_loss, eval_steps=args.eval_steps)
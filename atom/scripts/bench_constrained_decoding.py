@@ -0,0 +1,97 @@
+import sys
+import os
+import time
+import argparse
+
+# CPU only
+os.environ["CUDA_VISIBLE_DEVICES"] = ""
+
+# Setup path
+ATOM_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ATOM_ROOT)
+
+import torch
+from models.nlu.serving import T5ServingEngine, parse_t5_output
+from models.nlu.constrained import ConstrainedDecoder, DEFAULT_SCHEMA
+
+MODEL_DIR = os.path.join(ATOM_ROOT, "models", "nlu", "saved_model")
+PHRASES = [
+    "play believer on spotify", "can you open notepad", "close chrome", "google bitcoin price",
+    "text mom saying i am coming", "start playing faded", "find movie timings on internet",
+    "send happy birthday to alex", "launch calculator", "i want to hear levitating",
+]
+
+def well_formed(output):
+    intent, entities = parse_t5_output(output)
+    return intent in DEFAULT_SCHEMA and all(k in DEFAULT_SCHEMA[intent] for k in entities)
+
+def bench_plain(engine, texts):
+    steps, outputs = 0, []
+    start = time.perf_counter()
+    for text in texts:
+        with torch.inference_mode():
+            ids = engine.tokenizer(text, return_tensors="pt").input_ids
+            out = engine.model.generate(ids, max_new_tokens=engine.max_new_tokens, num_beams=1, do_sample=False)
+        steps += out.shape[1] - 1 # One decoder pass per generated token
+        outputs.append(engine.tokenizer.decode(out[0], skip_special_tokens=True))
+    return outputs, steps, time.perf_counter() - start
+
+def bench_constrained(decoder, texts):
+    decoder.stats["forward_passes"] = 0
+    outputs = []
+    start = time.perf_counter()
+    for text in texts:
+        outputs.extend(decoder.decode([text]))
+    return outputs, decoder.stats["forward_passes"], time.perf_counter() - start
+
+def bench_batched(decode, texts, size):
+    """Micro-batches of `size`, as T5ServingEngine hands them to generate()."""
+    outputs = []
+    start = time.perf_counter()
+    for i in range(0, len(texts), size):
+        outputs.extend(decode(texts[i:i + size]))
+    return outputs, time.perf_counter() - start
+
+def report(name, outputs, steps, elapsed):
+    n = len(outputs)
+    valid = sum(well_formed(o) for o in outputs)
+    print(f"{name:<12} | {elapsed / n * 1000:7.2f} ms/req | {steps / n:5.1f} decoder passes/req | "
+          f"well-formed {valid}/{n}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Constrained vs plain T5 decoding on CPU")
+    parser.add_argument("--model", default=MODEL_DIR)
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--quantize", action="store_true")
+    parser.add_argument("--batch", type=int, default=16, help="Micro-batch size for the batched runs")
+    args = parser.parse_args()
+
+    texts = [PHRASES[i % len(PHRASES)] for i in range(args.requests)]
+    engine = T5ServingEngine(args.model, quantize=args.quantize)
+    decoder = ConstrainedDecoder(engine.model, engine.tokenizer, max_new_tokens=engine.max_new_tokens)
+
+    print(f"🧠 Decoding benchmark ({args.requests} requests, int8: {engine.quantized})")
+    print("-" * 80)
+    plain, plain_steps, plain_time = bench_plain(engine, texts)
+    report("generate", plain, plain_steps, plain_time)
+    constrained, steps, elapsed = bench_constrained(decoder, texts)
+    report("constrained", constrained, steps, elapsed)
+
+    # Batched: engine.generate is plain batched generate (the engine is built unconstrained)
+    batched_plain, batched_plain_time = bench_batched(engine.generate, texts, args.batch)
+    report(f"generate x{args.batch}", batched_plain, 0, batched_plain_time)
+    decoder.stats["forward_passes"] = 0
+    batched, batched_time = bench_batched(decoder.decode, texts, args.batch)
+    report(f"constr. x{args.batch}", batched, decoder.stats["forward_passes"], batched_time)
+    print("-" * 80)
+    print(f"Batched: constrained vs generate {batched_plain_time / batched_time:.2f}x | "
+          f"constrained batched vs one-by-one {elapsed / batched_time:.2f}x")
+
+    agree = sum(parse_t5_output(a)[0] == parse_t5_output(b)[0] for a, b in zip(plain, constrained))
+    print(f"Speedup: {plain_time / elapsed:.2f}x | intent agreement {agree}/{len(texts)}")
+    for text, a, b in list(zip(texts, plain, constrained))[:len(PHRASES)]:
+        if a != b:
+            print(f"  '{text}': generate='{a}' constrained='{b}'")
+
+if __name__ == "__main__":
+    main()
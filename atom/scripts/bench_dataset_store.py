@@ -0,0 +1,80 @@
+import sys
+import os
+import json
+import time
+import subprocess
+
+# Setup path
+ATOM_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ATOM_ROOT)
+
+from ai_core.modules.dataset_index import NearMatchIndex
+from ai_core.modules.dataset_store import DatasetStore, StoredNearMatchIndex, compile_dataset, store_path_for
+
+DATA_FILE = os.path.join(ATOM_ROOT, "data", "nlu", "nlu_dataset_50k.jsonl")
+QUERIES = ["play believer on spotify", "open calculator", "search weather today", "text mom saying hello"]
+# Misspelled commands take the near-match path
+NEAR_QUERIES = ["play beleiver on spotfy", "open calculater", "search wether today", "txt mom saying hello"]
+
+def rss_mb():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    except ImportError:
+        return float("nan")
+
+def load_json():
+    # The old NLUModule.load_dataset path
+    cache = {}
+    with open(DATA_FILE, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip(): continue
+            record = json.loads(line)
+            cache[record["text"].lower().strip()] = record
+    return cache
+
+def measure(mode):
+    before = rss_mb()
+    start = time.perf_counter()
+    cache = load_json() if mode == "json" else DatasetStore(store_path_for(DATA_FILE))
+    startup = time.perf_counter() - start
+    for q in QUERIES * 250:
+        cache.get(q)
+    start = time.perf_counter()
+    index = NearMatchIndex(cache) if mode == "json" else StoredNearMatchIndex(cache)
+    index_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    for q in NEAR_QUERIES * 25:
+        index.closest(q)
+    near_ms = (time.perf_counter() - start) * 1000 / (len(NEAR_QUERIES) * 25)
+    print(json.dumps({"mode": mode, "startup_ms": startup * 1000, "index_ms": index_ms,
+                      "near_ms": near_ms, "rss_delta_mb": rss_mb() - before}))
+
+def main():
+    if len(sys.argv) > 2 and sys.argv[1] == "--measure":
+        measure(sys.argv[2])
+        return
+
+    if not os.path.exists(DATA_FILE):
+        print(f"⚠️  Dataset not found at {DATA_FILE}. Run scripts/generate_nlu_dataset.py first.")
+        return
+    compile_dataset(DATA_FILE)
+
+    print(f"{'MODE':<8} | {'STARTUP':>12} | {'NEAR INDEX':>12} | {'NEAR LOOKUP':>12} | {'RSS DELTA':>10}")
+    print("-" * 68)
+    for mode in ["json", "store"]:
+        # Fresh interpreter per mode so RSS is not polluted by the other run
+        out = subprocess.run([sys.executable, __file__, "--measure", mode], capture_output=True, text=True)
+        result = json.loads(out.stdout.strip().splitlines()[-1])
+        print(f"{mode:<8} | {result['startup_ms']:>9.1f} ms | {result['index_ms']:>9.1f} ms | "
+              f"{result['near_ms']:>9.2f} ms | {result['rss_delta_mb']:>7.1f} MB")
+
+if __name__ == "__main__":
+    main()
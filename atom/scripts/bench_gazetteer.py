@@ -0,0 +1,67 @@
+import sys
+import os
+import time
+import random
+import difflib
+
+# Setup path
+ATOM_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ATOM_ROOT)
+
+from ai_core.modules.gazetteer import Gazetteer, DEFAULT_ENTRIES
+
+SIZES = [100, 1000, 10000, 50000]
+ONSETS = ["b", "c", "d", "f", "g", "h", "j", "k", "l", "m", "n", "p", "r", "s", "t", "v", "w", "z", "br", "st", "tr", "pl"]
+VOWELS = ["a", "e", "i", "o", "u", "ai", "ou", "ee"]
+
+def make_word(rng):
+    return "".join(rng.choice(ONSETS) + rng.choice(VOWELS) for _ in range(rng.randint(2, 4)))
+
+def make_name(rng):
+    # App-like names: mostly one word, some two ("pixo studio")
+    return make_word(rng) if rng.random() < 0.7 else f"{make_word(rng)} {make_word(rng)}"
+
+def typo(word, rng):
+    if len(word) < 5:
+        return word
+    i = rng.randrange(1, len(word) - 1)
+    if word[i] == " ":
+        return word
+    return word[:i] + word[i + 1:]
+
+def main():
+    rng = random.Random(3)
+    print("📇 Gazetteer vs difflib app lookup (queries with one typo)")
+    print("-" * 86)
+    print(f"{'entries':>8} | {'build':>9} | {'difflib':>11} | {'gazetteer':>10} | {'speedup':>7} | "
+          f"{'spot()':>9} | {'hits':>9}")
+    for size in SIZES:
+        apps = list(dict.fromkeys(DEFAULT_ENTRIES["app"][:19] + [make_name(rng) for _ in range(size)]))[:size]
+        queries = [typo(rng.choice(apps), rng) for _ in range(200)]
+        sentences = [f"open {q} and play {typo(rng.choice(apps), rng)} for mom" for q in queries]
+
+        start = time.perf_counter()
+        gaz = Gazetteer({"app": apps, "contact": ["mom", "dad"]})
+        build = time.perf_counter() - start
+
+        # The old GenericActionIntent path: one difflib scan per call
+        difflib_queries = queries[:20] if size > 1000 else queries
+        start = time.perf_counter()
+        for q in difflib_queries:
+            difflib.get_close_matches(q, apps, n=1, cutoff=0.6)
+        old = (time.perf_counter() - start) / len(difflib_queries)
+
+        start = time.perf_counter()
+        hits = sum(gaz.lookup(q, "app") is not None for q in queries)
+        new = (time.perf_counter() - start) / len(queries)
+
+        start = time.perf_counter()
+        for s in sentences:
+            gaz.spot(s)
+        spot = (time.perf_counter() - start) / len(sentences)
+
+        print(f"{len(gaz):>8} | {build * 1000:6.0f} ms | {old * 1e6:8.0f} us | {new * 1e6:7.1f} us | "
+              f"{old / new:6.0f}x | {spot * 1e6:6.1f} us | {hits:>4}/{len(queries)}")
+
+if __name__ == "__main__":
+    main()
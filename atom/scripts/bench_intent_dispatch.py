@@ -0,0 +1,56 @@
+import sys
+import os
+import json
+import time
+
+# Setup path
+ATOM_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ATOM_ROOT)
+
+from ai_core.modules.nlu import IntentRouter
+
+DATA_FILE = os.path.join(ATOM_ROOT, "data", "nlu", "nlu_dataset_50k.jsonl")
+
+FALLBACK_PHRASES = [
+    "play believer on spotify", "ply baby on spotifi", "open calculator", "launch notepad",
+    "close chrome", "search weather today", "google bitcoin price", "text mom saying hello",
+    "send i am coming to rahul", "turn volume up", "check battery", "pause", "next song",
+    "what is the time", "tell me a joke", "what is 100 plus 55", "musi", "click submit",
+    "navigate to home", "order pizza from swiggy", "pay 100 to mom", "note buy milk",
+]
+
+def load_phrasings():
+    if not os.path.exists(DATA_FILE):
+        print(f"⚠️  Dataset not found at {DATA_FILE}. Using built-in phrases.")
+        return FALLBACK_PHRASES * (50000 // len(FALLBACK_PHRASES))
+    with open(DATA_FILE, "r", encoding="utf-8") as f:
+        return [json.loads(line)["text"].lower().strip() for line in f if line.strip()]
+
+def linear_scan(router, text):
+    return [intent for intent in router.intents if intent.match(text)]
+
+def bench(name, fn, texts):
+    start = time.perf_counter()
+    for text in texts:
+        fn(text)
+    elapsed = time.perf_counter() - start
+    print(f"{name:<12} {elapsed:8.3f}s total | {elapsed / len(texts) * 1e6:7.2f} us/utterance")
+    return elapsed
+
+def main():
+    router = IntentRouter()
+    texts = load_phrasings()
+    print(f"Dispatching {len(texts)} phrasings through {len(router.intents)} intents")
+    print("-" * 60)
+
+    mismatches = [t for t in set(texts) if linear_scan(router, t) != router.candidates(t)]
+    if mismatches:
+        print(f"❌ {len(mismatches)} phrasings dispatch differently, e.g. {mismatches[:3]}")
+
+    linear = bench("linear", lambda t: linear_scan(router, t), texts)
+    automaton = bench("automaton", router.candidates, texts)
+    print("-" * 60)
+    print(f"Speedup: {linear / automaton:.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+import sys
+import os
+import io
+import json
+import time
+import argparse
+import platform
+import subprocess
+import contextlib
+
+# Setup path
+ATOM_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ATOM_ROOT)
+
+from ai_core.modules.hot_commands import REQUEST_LOG_PATH
+
+DATA_FILE = os.path.join(ATOM_ROOT, "data", "nlu", "nlu_dataset_50k.jsonl")
+DEFAULT_SOURCES = [DATA_FILE, os.path.normpath(REQUEST_LOG_PATH)] # Labelled dataset, then logged requests (latency only)
+RESULTS_DIR = os.path.join(ATOM_ROOT, "data", "bench")
+ENGINES = ["nlu", "rule", "distilled", "t5"]
+
+try:
+    import resource
+except ImportError: # Windows
+    resource = None
+
+
+def peak_rss_mb():
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024 # bytes on macOS, KB on Linux
+    try:
+        import psutil
+        info = psutil.Process().memory_info()
+        return getattr(info, "peak_wset", info.rss) / (1024 * 1024)
+    except ImportError:
+        return float("nan")
+
+
+def stream_records(path, limit=None):
+    """Yields {"text", "intent"?, "entities"?} from a JSONL file; lines without text are skipped."""
+    n = 0
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if limit is not None and n >= limit:
+                return
+            if not line.strip(): continue
+            record = json.loads(line)
+            if not isinstance(record, dict) or not record.get("text"):
+                continue
+            n += 1
+            yield record
+
+
+def normalize_entities(entities):
+    return {k: str(v).lower().strip() for k, v in (entities or {}).items() if v is not None}
+
+
+def load_engine(name, cache, hot=False):
+    """Returns predict(text) -> (label, entities) and expect(record) -> (label, entities)."""
+    def from_intent(record):
+        return record["intent"], normalize_entities(record.get("entities"))
+
+    if name == "nlu":
+        from ai_core.modules.nlu import NLUModule
+        # The mined hot-command table answers repeats from a dict; off unless asked for, like the cache
+        nlu = NLUModule(cache_size=256 if cache else 0, hot_commands=hot)
+        # NLUModule answers with an action plan; dataset labels are mapped through the same planner
+        def predict(text):
+            data = dict(nlu.predict_action(text)[1])
+            data.pop("plan", None) # Typed steps derived from the action; not a slot
+            return data.pop("action", None), normalize_entities(data)
+        def expect(record):
+            data = dict(nlu.plan_from_record(record["intent"], record.get("entities", {}))[1])
+            return data.pop("action", None), normalize_entities(data)
+        return predict, expect
+
+    if name == "rule":
+        from models.nlu.rule_based import RuleBasedNLU
+        nlu = RuleBasedNLU()
+    elif name == "distilled":
+        from models.nlu.distilled import DistilledNLU, WEIGHTS_PATH
+        nlu = DistilledNLU(os.path.join(ATOM_ROOT, WEIGHTS_PATH))
+    elif name == "t5":
+        from models.nlu.serving import T5ServingEngine, parse_t5_output
+        engine = T5ServingEngine(os.path.join(ATOM_ROOT, "models", "nlu", "saved_model"), constrained=True,
+                                 cache_size=512 if cache else 0)
+        def predict(text):
+            intent, entities = parse_t5_output(engine.predict(text))
+            return intent, normalize_entities(entities)
+        return predict, from_intent
+    else:
+        raise ValueError(f"Unknown engine: {name}")
+
+    def predict(text):
+        result = nlu.parse(text)
+        return result["intent"], normalize_entities(result["entities"])
+    return predict, from_intent
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(p / 100.0 * len(sorted_values)))]
+
+
+def run_engine(name, sources, limit=None, cache=False, hot=False):
+    """Streams every source through one engine. Engine logging is silenced while timing."""
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        start = time.perf_counter()
+        predict, expect = load_engine(name, cache, hot)
+        load_s = time.perf_counter() - start
+
+        results = {}
+        for path in sources:
+            latencies, labelled, intent_ok, exact_ok, errors = [], 0, 0, 0, 0
+            cpu_start, wall_start = time.process_time(), time.perf_counter()
+            for record in stream_records(path, limit):
+                t0 = time.perf_counter()
+                try:
+                    got = predict(record["text"])
+                except Exception:
+                    errors += 1
+                    got = (None, {})
+                latencies.append(time.perf_counter() - t0)
+                if record.get("intent"):
+                    want = expect(record)
+                    labelled += 1
+                    intent_ok += got[0] == want[0]
+                    exact_ok += got == want
+            cpu_s = time.process_time() - cpu_start
+            wall_s = time.perf_counter() - wall_start
+
+            latencies.sort()
+            n = len(latencies)
+            results[os.path.basename(path)] = {
+                "utterances": n,
+                "labelled": labelled,
+                "errors": errors,
+                "intent_accuracy": intent_ok / labelled if labelled else None,
+                "entity_accuracy": exact_ok / labelled if labelled else None, # intent + every entity right
+                "p50_ms": percentile(latencies, 50) * 1000,
+                "p95_ms": percentile(latencies, 95) * 1000,
+                "p99_ms": percentile(latencies, 99) * 1000,
+                "mean_ms": sum(latencies) / n * 1000 if n else 0.0,
+                "throughput_per_core": n / cpu_s if cpu_s else None, # utterances per CPU-second
+                "throughput_wall": n / wall_s if wall_s else None,
+            }
+    return {"engine": name, "load_s": load_s, "peak_rss_mb": peak_rss_mb(), "sources": results}
+
+
+def run_isolated(name, sources, limit, cache, hot):
+    # Fresh interpreter per engine so peak RSS belongs to that engine alone
+    cmd = [sys.executable, os.path.abspath(__file__), "--worker", name, "--limit", str(limit or 0)]
+    for path in sources:
+        cmd += ["--source", path]
+    if cache:
+        cmd.append("--cache")
+    if hot:
+        cmd.append("--hot-commands")
+    out = subprocess.run(cmd, capture_output=True, text=True)
+    if out.returncode != 0:
+        return {"engine": name, "error": (out.stderr.strip().splitlines() or ["failed"])[-1]}
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def git_revision():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ATOM_ROOT, capture_output=True, text=True)
+        return out.stdout.strip() or None
+    except OSError:
+        return None
+
+
+def print_report(report):
+    print(f"{'ENGINE':<10} | {'SOURCE':<24} | {'N':>6} | {'INTENT':>6} | {'EXACT':>6} | "
+          f"{'P50':>8} | {'P95':>8} | {'P99':>8} | {'/CORE-S':>8} | {'PEAK RSS':>8}")
+    print("-" * 118)
+    fmt = lambda v: f"{v * 100:5.1f}%" if v is not None else "    - "
+    for run in report["runs"]:
+        if "error" in run:
+            print(f"{run['engine']:<10} | skipped: {run['error']}")
+            continue
+        for source, r in run["sources"].items():
+            print(f"{run['engine']:<10} | {source[:24]:<24} | {r['utterances']:>6} | {fmt(r['intent_accuracy'])} | "
+                  f"{fmt(r['entity_accuracy'])} | {r['p50_ms']:6.3f}ms | {r['p95_ms']:6.3f}ms | {r['p99_ms']:6.3f}ms | "
+                  f"{r['throughput_per_core'] or 0:8.0f} | {run['peak_rss_mb']:6.1f}MB")
+
+
+def compare(report, previous_path):
+    with open(previous_path, "r", encoding="utf-8") as f:
+        previous = {run["engine"]: run for run in json.load(f)["runs"] if "error" not in run}
+    print(f"\nvs {previous_path}:")
+    for run in report["runs"]:
+        old = previous.get(run["engine"])
+        if "error" in run or old is None:
+            continue
+        for source, r in run["sources"].items():
+            o = old["sources"].get(source)
+            if not o:
+                continue
+            acc = (r["entity_accuracy"] or 0) - (o["entity_accuracy"] or 0)
+            print(f"  {run['engine']:<10} {source:<24} p50 {r['p50_ms'] - o['p50_ms']:+.3f} ms | "
+                  f"p99 {r['p99_ms'] - o['p99_ms']:+.3f} ms | exact {acc * 100:+.1f} pts | "
+                  f"rss {run['peak_rss_mb'] - old['peak_rss_mb']:+.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="NLU accuracy / latency / memory benchmark")
+    parser.add_argument("--engines", default="nlu,rule", help=f"Comma-separated subset of {','.join(ENGINES)}")
+    parser.add_argument("--source", action="append", default=None,
+                        help="JSONL with a 'text' field per line (labels optional); repeatable. "
+                             "Defaults to the 50k dataset and the request log")
+    parser.add_argument("--limit", type=int, default=0, help="Max utterances per source (0 = all)")
+    parser.add_argument("--cache", action="store_true", help="Keep engine result caches on (off: every call does full work)")
+    parser.add_argument("--hot-commands", action="store_true", help="Keep NLUModule's hot-command table on")
+    parser.add_argument("--inline", action="store_true", help="Run engines in this process (peak RSS is then cumulative)")
+    parser.add_argument("--out", default=None, help="Results JSON path")
+    parser.add_argument("--compare", default=None, help="Earlier results JSON to diff against")
+    parser.add_argument("--worker", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    sources = args.source or DEFAULT_SOURCES
+    limit = args.limit or None
+    if args.worker:
+        print(json.dumps(run_engine(args.worker, sources, limit, args.cache, args.hot_commands)))
+        return
+
+    missing = [p for p in sources if not os.path.exists(p)]
+    if missing and args.source:
+        print(f"⚠️  Source not found: {', '.join(missing)}.")
+        return
+    for path in missing:
+        hint = "Run scripts/generate_nlu_dataset.py first." if path == DATA_FILE else "Nothing logged yet."
+        print(f"⚠️  Skipping {path}: not found. {hint}")
+    sources = [p for p in sources if p not in missing]
+    if not sources:
+        return
+
+    engines = [e.strip() for e in args.engines.split(",") if e.strip()]
+    print(f"📊 NLU benchmark: {', '.join(engines)} over {len(sources)} source(s)")
+    runs = []
+    for name in engines:
+        runs.append(run_engine(name, sources, limit, args.cache, args.hot_commands) if args.inline
+                    else run_isolated(name, sources, limit, args.cache, args.hot_commands))
+
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "git": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "args": {"engines": engines, "sources": sources, "limit": limit, "cache": args.cache,
+                 "hot_commands": args.hot_commands, "inline": args.inline},
+        "runs": runs,
+    }
+    print_report(report)
+
+    out = args.out or os.path.join(RESULTS_DIR, f"nlu_{time.strftime('%Y%m%d_%H%M%S')}.json")
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"💾 Results saved to {out}")
+
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
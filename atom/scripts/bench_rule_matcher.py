@@ -0,0 +1,72 @@
+import sys
+import os
+import re
+import time
+import random
+
+# Setup path
+ATOM_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ATOM_ROOT)
+
+from models.nlu.rule_based import RuleBasedNLU
+
+SIZES = [11, 50, 100, 250, 500]
+UTTERANCES = [
+    "play believer on spotify", "open youtube", "close chrome", "google bitcoin price",
+    "text mom i am coming", "send message to alex saying happy birthday", "what is the weather",
+    "launch calculator", "find movie timings", "turn the volume up",
+]
+
+def legacy_parse(intents, text):
+    # The old RuleBasedNLU.parse: re.search per pattern, in table order
+    text = text.lower().strip()
+    for intent, patterns in intents.items():
+        for pattern in patterns:
+            match = re.search(pattern, text)
+            if match:
+                return {"intent": intent, "entities": match.groupdict(), "confidence": 1.0}
+    return {"intent": "UNKNOWN", "entities": {}, "confidence": 0.0}
+
+def grow_table(base, size, rng):
+    """Synthetic rules ahead of the real ones, so most utterances scan past them."""
+    table = {}
+    for i in range(size - sum(len(p) for p in base.values())):
+        verb = "".join(rng.choice("bcdfghklmnpqrstvwz") for _ in range(6))
+        table.setdefault(f"CUSTOM_{i % 40}", []).append(rf"{verb} (?P<target>.+?)(?: on (?P<app>\w+))?$")
+    for intent, patterns in base.items():
+        table.setdefault(intent, []).extend(patterns)
+    return table
+
+def timeit(fn, texts, rounds=20):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for text in texts:
+            fn(text)
+    return (time.perf_counter() - start) / (rounds * len(texts))
+
+def main():
+    rng = random.Random(7)
+    base = RuleBasedNLU().intents
+    texts = UTTERANCES * 10
+    print("📏 RuleBasedNLU per-utterance cost vs pattern table size")
+    print("-" * 64)
+    print(f"{'rules':>6} | {'re.search loop':>15} | {'compiled':>10} | {'speedup':>7}")
+    for size in SIZES:
+        table = grow_table(base, size, rng)
+        nlu = RuleBasedNLU(table)
+        # The compiled matcher must agree with the loop it replaces
+        for text in UTTERANCES:
+            assert nlu.parse(text) == legacy_parse(table, text), text
+        old = timeit(lambda t: legacy_parse(table, t), texts)
+        new = timeit(nlu.parse, texts)
+        print(f"{size:>6} | {old * 1e6:12.1f} us | {new * 1e6:7.1f} us | {old / new:6.1f}x")
+
+    nlu = RuleBasedNLU()
+    bulk = UTTERANCES * 1000
+    start = time.perf_counter()
+    nlu.parse_many(bulk)
+    print("-" * 64)
+    print(f"parse_many: {len(bulk) / (time.perf_counter() - start):,.0f} utterances/s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+import sys
+import os
+import time
+import random
+
+# Setup path
+ATOM_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ATOM_ROOT)
+
+from ai_core.modules.spell_index import get_sym_spell
+from ai_core.modules.slot_speller import SlotAwareSpeller
+from ai_core.modules.gazetteer import get_gazetteer
+
+LENGTHS = [2, 4, 8, 16, 32]
+COMMANDS = ["opne", "ply", "serch", "clsoe", "sned", "launch"]
+FILLER = ["the", "latest", "weathr", "nwes", "about", "music", "vidoes", "from", "today", "quickly", "plese"]
+APPS = ["spotfy", "chrome", "whatsap", "notepad"]
+
+def make_utterance(rng, length):
+    words = [rng.choice(COMMANDS)] + [rng.choice(FILLER) for _ in range(length - 3)]
+    return " ".join(words + ["on", rng.choice(APPS)])
+
+def per_call(fn, texts):
+    start = time.perf_counter()
+    for t in texts:
+        fn(t)
+    return (time.perf_counter() - start) / len(texts)
+
+def main():
+    rng = random.Random(5)
+    sym = get_sym_spell()
+    print("🔤 lookup_compound vs slot-aware per-token spelling")
+    print("-" * 72)
+    print(f"{'words':>6} | {'compound':>11} | {'slot cold':>11} | {'slot warm':>11} | {'speedup':>7}")
+    for length in LENGTHS:
+        texts = [make_utterance(rng, length) for _ in range(100)]
+        old = per_call(lambda t: sym.lookup_compound(t, max_edit_distance=2), texts)
+        speller = SlotAwareSpeller(sym, get_gazetteer())
+        cold = per_call(speller.correct, texts)
+        warm = per_call(speller.correct, texts) # Same vocabulary again: every word is cached
+        print(f"{length:>6} | {old * 1e6:8.0f} us | {cold * 1e6:8.0f} us | {warm * 1e6:8.0f} us | {old / warm:6.0f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+import sys
+import os
+import time
+import random
+import tracemalloc
+
+# Setup path
+ATOM_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ATOM_ROOT)
+
+from symspellpy import Verbosity
+from ai_core.modules.spell_index import (
+    DOMAIN_PATH, TieredSymSpell, build_domain_dictionary, build_sym_spell, general_words, load_domain_sym_spell,
+)
+
+# Command words with one typo, plus clean words and free English
+QUERIES = ["opne", "ply", "spotfy", "whatsap", "clsoe", "serch", "messgae", "calculater", "volme", "pasue",
+           "open", "play", "youtube", "weather", "restaurant", "birthday", "tomorow", "recieve"]
+
+def timed(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+def per_lookup(sym, words, rounds=50):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for w in words:
+            sym.lookup(w, Verbosity.TOP, max_edit_distance=2, include_unknown=True)
+    return (time.perf_counter() - start) / (rounds * len(words))
+
+def main():
+    if not os.path.exists(DOMAIN_PATH):
+        build_domain_dictionary()
+
+    general, general_load, general_mem = timed(build_sym_spell)
+    tiered, tiered_load, tiered_mem = timed(
+        lambda: TieredSymSpell(load_domain_sym_spell(), lambda: general, general_words()))
+
+    rng = random.Random(11)
+    words = [rng.choice(QUERIES) for _ in range(200)]
+    old = per_lookup(general, words)
+    new = per_lookup(tiered, words)
+    agree = sum(
+        general.lookup(w, Verbosity.TOP, max_edit_distance=2, include_unknown=True)[0].term ==
+        tiered.lookup(w, Verbosity.TOP, max_edit_distance=2, include_unknown=True)[0].term
+        for w in QUERIES
+    )
+
+    print("📚 General vs tiered (domain -> general) SymSpell")
+    print("-" * 60)
+    print(f"{'':>10} | {'load':>9} | {'peak mem':>9} | {'lookup':>9}")
+    print(f"{'general':>10} | {general_load * 1000:6.0f} ms | {general_mem / 2**20:6.1f} MB | {old * 1e6:6.1f} us")
+    print(f"{'tiered':>10} | {tiered_load * 1000:6.0f} ms | {tiered_mem / 2**20:6.1f} MB | {new * 1e6:6.1f} us")
+    print(f"Tier hits: {tiered.stats}")
+    print(f"Same top correction on {agree}/{len(QUERIES)} probe words")
+    for w in QUERIES:
+        a = general.lookup(w, Verbosity.TOP, max_edit_distance=2, include_unknown=True)[0].term
+        b = tiered.lookup(w, Verbosity.TOP, max_edit_distance=2, include_unknown=True)[0].term
+        if a != b:
+            print(f"   {w:<12} general={a:<12} tiered={b}")
+
+if __name__ == "__main__":
+    main()
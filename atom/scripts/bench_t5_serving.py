@@ -0,0 +1,85 @@
+import sys
+import os
+import time
+import argparse
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+
+# CPU only
+os.environ["CUDA_VISIBLE_DEVICES"] = ""
+
+# Setup path
+ATOM_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ATOM_ROOT)
+
+import torch
+from models.nlu.serving import T5ServingEngine
+
+MODEL_DIR = os.path.join(ATOM_ROOT, "models", "nlu", "saved_model")
+PHRASES = [
+    "play believer on spotify", "can you open notepad", "close chrome", "google bitcoin price",
+    "text mom saying i am coming", "start playing faded", "find movie timings on internet",
+    "send happy birthday to alex", "launch calculator", "i want to hear levitating",
+]
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(p / 100.0 * len(values)))]
+
+def report(name, latencies, elapsed, n):
+    print(f"{name:<22} | p50 {percentile(latencies, 50) * 1000:7.1f} ms | "
+          f"p95 {percentile(latencies, 95) * 1000:7.1f} ms | {n / elapsed:7.1f} req/s")
+
+def bench_unbatched(engine, texts):
+    # The old inference.py path: one uncapped generate() per request
+    latencies = []
+    start = time.perf_counter()
+    for text in texts:
+        t0 = time.perf_counter()
+        with torch.inference_mode():
+            ids = engine.tokenizer(text, return_tensors="pt").input_ids
+            engine.tokenizer.decode(engine.model.generate(ids)[0], skip_special_tokens=True)
+        latencies.append(time.perf_counter() - t0)
+    return latencies, time.perf_counter() - start
+
+def bench_concurrent(engine, texts, clients):
+    def call(text):
+        t0 = time.perf_counter()
+        engine.predict(text)
+        return time.perf_counter() - t0
+    engine.cache.clear()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        latencies = list(pool.map(call, texts))
+    return latencies, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description="CPU throughput/latency of the T5 NLU engine")
+    parser.add_argument("--model", default=MODEL_DIR)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--threads", type=int, default=None)
+    args = parser.parse_args()
+
+    # Unique suffixes so the output cache doesn't answer for the model
+    texts = [f"{PHRASES[i % len(PHRASES)]} {i}" for i in range(args.requests)]
+    print(f"🧠 T5 serving benchmark on CPU ({torch.get_num_threads()} torch threads, {args.requests} requests)")
+    print("-" * 72)
+
+    fp32 = T5ServingEngine(args.model, quantize=False, num_threads=args.threads)
+    lat, el = bench_unbatched(fp32, texts[:max(10, args.requests // 10)])
+    report("fp32 unbatched", lat, el, len(lat))
+    lat, el = bench_concurrent(fp32, texts, args.clients)
+    report(f"fp32 batched x{args.clients}", lat, el, len(lat))
+    fp32.close()
+
+    int8 = T5ServingEngine(args.model, quantize=True, num_threads=args.threads)
+    lat, el = bench_concurrent(int8, texts, 1)
+    report("int8 single client", lat, el, len(lat))
+    lat, el = bench_concurrent(int8, texts, args.clients)
+    report(f"int8 batched x{args.clients}", lat, el, len(lat))
+    print(f"Average micro-batch size: {int8.stats['batched_requests'] / max(1, int8.stats['batches']):.1f}")
+    int8.close()
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,11 @@
+import os
+import gzip
 import json
+import lzma
+import time
 import random
-import os
+import argparse
+import multiprocessing
 
 intents = {
     "PLAY_MUSIC": {
@@ -49,68 +54,139 @@ contacts = ["siddu", "rahul", "mom", "dad", "alex", "sarah"]
 queries = ["weather today", "bitcoin price", "news headlines", "best restaurants nearby", "movie timings"]
 messages = ["hello", "i am coming", "call me back", "where are you", "happy birthday"]
 
-def noise(text):
-    if random.random() < 0.3:
-        text = text.replace("spotify", "spotifi")
-    if random.random() < 0.3:
-        text = text.replace("play", "ply")
-    return text
-
-print("Generating dataset...")
-
-print("Generating dataset...")
-dataset = []
-count = 0
-
-while len(dataset) < 50000:
-    intent = random.choice(list(intents.keys()))
-    template = random.choice(intents[intent]["templates"])
-    
-    # Selection
-    s_song = random.choice(songs)
-    s_app = random.choice(apps)
-    s_contact = random.choice(contacts)
-    s_query = random.choice(queries)
-    s_message = random.choice(messages)
-
-    # Formatting
-    # We only assume the template has unique keys if present.
-    text = template.format(
-        song=s_song,
-        app=s_app,
-        contact=s_contact,
-        query=s_query,
-        message=s_message
-    )
-    
-    # Noise
-    text = noise(text)
-
-    sample = {
-        "text": text,
-        "intent": intent,
-        "entities": {}
+INTENT_NAMES = list(intents.keys())
+
+PHONETIC = [
+    ("spotify", "spotifi", 0.3), ("play", "ply", 0.3), ("whatsapp", "watsapp", 0.15),
+    ("youtube", "utube", 0.15), ("calculator", "calc", 0.15), ("message", "msg", 0.15),
+]
+PREFIXES = ["please", "hey atom", "atom", "kindly"]
+SUFFIXES = ["please", "now", "right now", "for me"]
+ALPHABET = "abcdefghijklmnopqrstuvwxyz"
+
+def typo(word, rng):
+    i = rng.randrange(len(word))
+    kind = rng.random()
+    if kind < 0.3:
+        return word[:i] + word[i + 1:]                                  # drop
+    if kind < 0.55 and i < len(word) - 1:
+        return word[:i] + word[i + 1] + word[i] + word[i + 2:]          # swap
+    if kind < 0.8:
+        return word[:i] + rng.choice(ALPHABET) + word[i + 1:]           # replace
+    return word[:i] + word[i] + word[i:]                                # double
+
+def noise(text, rng, level=1.0):
+    """ASR-ish noise. Entity labels stay canonical, as in the original dataset."""
+    for word, heard, p in PHONETIC:
+        if word in text and rng.random() < p * level:
+            text = text.replace(word, heard)
+    words = text.split()
+    for i, w in enumerate(words):
+        if len(w) > 3 and rng.random() < 0.04 * level:
+            words[i] = typo(w, rng)
+    if rng.random() < 0.1 * level:
+        words.insert(0, rng.choice(PREFIXES))
+    if rng.random() < 0.08 * level:
+        words.append(rng.choice(SUFFIXES))
+    return " ".join(words)
+
+def make_sample(rng, noise_level=1.0):
+    intent = rng.choice(INTENT_NAMES)
+    template = rng.choice(intents[intent]["templates"])
+    slots = {
+        "song": rng.choice(songs),
+        "app": rng.choice(apps),
+        "contact": rng.choice(contacts),
+        "query": rng.choice(queries),
+        "message": rng.choice(messages),
     }
+    text = noise(template.format(**slots), rng, noise_level)
+    entities = {key: value for key, value in slots.items() if "{" + key + "}" in template}
+    return {"text": text, "intent": intent, "entities": entities}
 
-    if "{song}" in template:
-        sample["entities"]["song"] = s_song
-    if "{app}" in template:
-        sample["entities"]["app"] = s_app
-    if "{contact}" in template:
-        sample["entities"]["contact"] = s_contact
-    if "{query}" in template:
-        sample["entities"]["query"] = s_query
-    if "{message}" in template:
-        sample["entities"]["message"] = s_message
+OPENERS = {"none": open, "gz": gzip.open, "xz": lzma.open}
 
-    dataset.append(sample)
+def shard_path(out_dir, name, index, num_shards, compress):
+    ext = ".jsonl" + ("" if compress == "none" else "." + compress)
+    if num_shards == 1:
+        return os.path.join(out_dir, name + ext)
+    return os.path.join(out_dir, f"{name}-{index:05d}-of-{num_shards:05d}{ext}")
+
+def write_shard(job):
+    """
+    Generates one shard, streaming samples straight to disk.
+    Each shard has its own RNG seeded from (seed, shard index), so the output
+    is identical whatever the number of workers.
+    """
+    index, count, seed, noise_level, path, compress = job
+    rng = random.Random(f"{seed}:{index}")
+    counts = dict.fromkeys(INTENT_NAMES, 0)
+    with OPENERS[compress](path, "wt", encoding="utf-8") as f:
+        for _ in range(count):
+            sample = make_sample(rng, noise_level)
+            counts[sample["intent"]] += 1
+            f.write(json.dumps(sample) + "\n")
+    return {"path": os.path.basename(path), "samples": count, "intents": counts}
+
+def generate(samples=50000, seed=1337, shard_size=0, workers=1, compress="none", noise_level=1.0,
+             out_dir=os.path.join("data", "nlu"), name="nlu_dataset_50k"):
+    """Writes the shards plus {name}.manifest.json and returns the manifest."""
+    os.makedirs(out_dir, exist_ok=True)
+    shard_size = shard_size or samples
+    num_shards = max(1, -(-samples // shard_size))
+    jobs = [
+        (i, min(shard_size, samples - i * shard_size), seed, noise_level,
+         shard_path(out_dir, name, i, num_shards, compress), compress)
+        for i in range(num_shards)
+    ]
+
+    start = time.perf_counter()
+    if workers > 1 and num_shards > 1:
+        with multiprocessing.Pool(min(workers, num_shards)) as pool:
+            shards = pool.map(write_shard, jobs)
+    else:
+        shards = [write_shard(job) for job in jobs]
+    elapsed = time.perf_counter() - start
+
+    totals = dict.fromkeys(INTENT_NAMES, 0)
+    for shard in shards:
+        for intent, n in shard["intents"].items():
+            totals[intent] += n
+    manifest = {
+        "name": name,
+        "seed": seed,
+        "samples": samples,
+        "noise_level": noise_level,
+        "compression": compress,
+        "shard_size": shard_size,
+        "intents": totals,
+        "shards": shards,
+        "generation_seconds": round(elapsed, 3),
+    }
+    with open(os.path.join(out_dir, name + ".manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
 
-output_path = os.path.join("data", "nlu", "nlu_dataset_50k.jsonl")
-# Ensure directory exists just in case
-os.makedirs(os.path.dirname(output_path), exist_ok=True)
+def main():
+    parser = argparse.ArgumentParser(description="Generate the synthetic NLU dataset")
+    parser.add_argument("--samples", type=int, default=50000)
+    parser.add_argument("--seed", type=int, default=1337)
+    parser.add_argument("--shard-size", type=int, default=0, help="Samples per shard (0 = one file)")
+    parser.add_argument("--workers", type=int, default=1, help="Processes writing shards in parallel")
+    parser.add_argument("--compress", choices=sorted(OPENERS), default="none")
+    parser.add_argument("--noise", type=float, default=1.0, help="Noise level multiplier (0 = clean)")
+    parser.add_argument("--out-dir", default=os.path.join("data", "nlu"))
+    parser.add_argument("--name", default="nlu_dataset_50k")
+    args = parser.parse_args()
 
-with open(output_path, "w", encoding="utf-8") as f:
-    for item in dataset:
-        f.write(json.dumps(item) + "\n")
+    print("Generating dataset...")
+    manifest = generate(args.samples, args.seed, args.shard_size, args.workers, args.compress,
+                        args.noise, args.out_dir, args.name)
+    rate = manifest["samples"] / max(manifest["generation_seconds"], 1e-9)
+    print(f"✅ {manifest['samples']:,} NLU samples in {len(manifest['shards'])} shard(s) at {args.out_dir} "
+          f"({rate:,.0f} samples/s)")
+    for intent, n in manifest["intents"].items():
+        print(f"   {intent:<14} {n:,}")
 
-print(f"✅ 50,000 NLU samples generated at {output_path}")
+if __name__ == "__main__":
+    main()
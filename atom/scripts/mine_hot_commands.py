@@ -0,0 +1,46 @@
+import sys
+import os
+import time
+import argparse
+
+# Setup path
+ATOM_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ATOM_ROOT)
+
+from ai_core.modules.hot_commands import REQUEST_LOG_PATH, HOT_COMMANDS_PATH, HotCommandTable, mine, write_table
+from ai_core.modules.nlu import NLUModule
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile the most frequent logged commands into the hot-command table")
+    parser.add_argument("--log", action="append", help=f"Request log (JSONL with a 'text' field), repeatable. Default {REQUEST_LOG_PATH}")
+    parser.add_argument("--out", default=HOT_COMMANDS_PATH)
+    parser.add_argument("--top", type=int, default=200)
+    parser.add_argument("--min-count", type=int, default=3)
+    args = parser.parse_args()
+
+    # Resolve through the normal pipeline, never through the table being rebuilt
+    nlu = NLUModule(cache_size=0, hot_commands=False)
+    start = time.perf_counter()
+    table = mine(args.log or [REQUEST_LOG_PATH], nlu, args.top, args.min_count)
+    write_table(table, args.out)
+    commands = table["commands"]
+    covered = sum(entry["count"] for entry in commands.values())
+    print(f"🔥 {len(commands)} hot commands from {table['requests']} requests "
+          f"({covered / max(table['requests'], 1):.0%} of traffic) in {time.perf_counter() - start:.1f}s -> {args.out}")
+
+    # Lookup cost of a table hit vs the full pipeline
+    if commands:
+        hot = HotCommandTable(args.out)
+        keys = list(commands)[:50]
+        start = time.perf_counter()
+        for key in keys:
+            hot.get(key)
+        fast = (time.perf_counter() - start) / len(keys)
+        start = time.perf_counter()
+        for key in keys:
+            nlu.predict_uncached(key)
+        slow = (time.perf_counter() - start) / len(keys)
+        print(f"   table hit {fast * 1e6:.1f} us vs full pipeline {slow * 1e6:.0f} us")
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 import os
 import sys
 import json
+import time
 import subprocess
 from flask import Flask, request, jsonify
 from flask_cors import CORS
@@ -41,6 +42,14 @@ except ImportError as e:
     print(f"Failed to initialize Finalizer Brain: {e}")
     finalizer = None
 
+# Append-only command log, mined offline into the hot-command table (atom/scripts/mine_hot_commands.py)
+try:
+    from ai_core.modules.hot_commands import RequestLog
+    request_log = RequestLog()
+except Exception as e:
+    print(f"[MAIN] Request log disabled: {e}")
+    request_log = None
+
 # --- Database Setup ---
 load_dotenv()
 MONGO_URI = os.getenv("MONGO_URI")
@@ -180,6 +189,7 @@ def chat():
             
         message = data.get('message', '')
         print(f"[MAIN] Received message: {message}")
+        started = time.perf_counter()
         
         # --- 4-BRAIN ARCHITECTURE ---
         # 1. FINALIZER BRAIN (The Orchestrator)
@@ -201,6 +211,9 @@ def chat():
              response_text = "I am lobotomized (Finalizer Brain Missing)."
              logs.append("[ERROR] Finalizer Brain not loaded.")
 
+        if request_log and message:
+            request_log.log(message, success=bool(success), ms=round((time.perf_counter() - started) * 1000, 1))
+
         return jsonify({
             "text": response_text,
             "logs": logs + execution_logs,
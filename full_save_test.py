@@ -29,6 +29,8 @@ def test_flow():
     # 3. Execute
     print("3. Executing Plan...")
     logs = execute_verbose_command(instruction)
+    if logs.readout is not None:
+        logs.append(logs.readout.result())
     
     print("\n--- Execution Logs ---")
     for log in logs:
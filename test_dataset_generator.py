@@ -0,0 +1,43 @@
+import unittest
+import sys
+import os
+import gzip
+import json
+import tempfile
+
+# Setup paths
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'atom'))
+
+from scripts.generate_nlu_dataset import generate
+
+
+def read_all(out_dir, manifest):
+    lines = []
+    for shard in manifest["shards"]:
+        with gzip.open(os.path.join(out_dir, shard["path"]), "rt", encoding="utf-8") as f:
+            lines.extend(f.read().splitlines())
+    return lines
+
+
+class TestDatasetGenerator(unittest.TestCase):
+    def test_output_independent_of_workers(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            a, b = os.path.join(tmp, "a"), os.path.join(tmp, "b")
+            serial = generate(1000, seed=7, shard_size=300, workers=1, compress="gz", out_dir=a, name="t")
+            parallel = generate(1000, seed=7, shard_size=300, workers=3, compress="gz", out_dir=b, name="t")
+            self.assertEqual(read_all(a, serial), read_all(b, parallel))
+            self.assertEqual(len(serial["shards"]), 4)
+
+    def test_manifest_counts(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            manifest = generate(500, seed=1, shard_size=200, compress="gz", out_dir=tmp, name="t")
+            samples = [json.loads(line) for line in read_all(tmp, manifest)]
+            self.assertEqual(len(samples), 500)
+            for intent, n in manifest["intents"].items():
+                self.assertEqual(n, sum(s["intent"] == intent for s in samples))
+            with open(os.path.join(tmp, "t.manifest.json"), encoding="utf-8") as f:
+                self.assertEqual(json.load(f)["samples"], 500)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+import sys
+import os
+
+# Setup paths
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'atom'))
+
+from ai_core.modules.nlu import IntentRouter
+from ai_core.modules.keyword_automaton import KeywordAutomaton
+
+
+class TestKeywordAutomaton(unittest.TestCase):
+    def test_overlapping_keywords(self):
+        automaton = KeywordAutomaton()
+        automaton.add("open", "generic")
+        automaton.add("open spotify", "music")
+        automaton.add("pay", "payment")
+        automaton.add("gpay", "gpay")
+        automaton.compile()
+        self.assertEqual(automaton.scan("open spotify"), {"generic", "music"})
+        self.assertEqual(automaton.scan("open spot"), {"generic"})
+        self.assertEqual(automaton.scan("send 5 on gpay"), {"payment", "gpay"})
+        self.assertEqual(automaton.scan("nothing here"), set())
+
+    def test_typo_neighbourhood(self):
+        automaton = KeywordAutomaton()
+        automaton.add_typo("music", "music")
+        for typo in ["music", "musi", "musc", "muisc", "musik"]:
+            self.assertEqual(automaton.scan_typos(typo), {"music"})
+        self.assertEqual(automaton.scan_typos("magic"), set())
+
+
+class TestIntentRouter(unittest.TestCase):
+    def setUp(self):
+        self.router = IntentRouter()
+
+    def test_candidates_match_linear_scan(self):
+        texts = [
+            "play baby song", "open calculator", "what is 100 plus 55", "check battery",
+            "tell mom i am coming", "hi there", "order pizza from swiggy", "order pizza",
+            "open notepad and type hi and save it", "click submit", "search for siddu",
+            "send 100 to mom on gpay", "tell me a joke", "select second option", "xyz",
+        ]
+        for text in texts:
+            linear = [intent for intent in self.router.intents if intent.match(text)]
+            self.assertEqual(self.router.candidates(text), linear, text)
+
+    def test_typo_routes_to_music(self):
+        for text in ["musi", "musc", "muisc"]:
+            instr, data = self.router.parse(text)
+            self.assertEqual(data['action'], 'play_music')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import unittest
+import sys
+import os
+import io
+import stat
+import tempfile
+import contextlib
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'atom'))
+
+from ai_core.modules.nlu_daemon import NLUDaemon, NLUClient, HAS_UNIX_SOCKETS, STATS, make_private_dir
+
+
+class EchoNLU:
+    def __init__(self, name="daemon"):
+        self.name = name
+
+    def predict_action(self, text, image_path=None):
+        return f"{self.name} {text}", {"action": "echo", "text": text, "by": self.name}
+
+
+@unittest.skipUnless(HAS_UNIX_SOCKETS, "needs AF_UNIX")
+class TestNLUDaemon(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "nlu.sock")
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.daemon = NLUDaemon(EchoNLU(), self.path).start()
+
+    def tearDown(self):
+        self.daemon.stop()
+        self.tmp.cleanup()
+
+    def test_round_trip(self):
+        client = NLUClient(self.path)
+        self.assertTrue(client.ping())
+        for text in ["open notepad", "send héllo to mom", "x" * 100000]:
+            instruction, action = client.predict_action(text)
+            self.assertEqual(action, {"action": "echo", "text": text, "by": "daemon"})
+        self.assertEqual(client.call(STATS)["requests"], 3)
+        client.close()
+
+    def test_falls_back_in_process(self):
+        client = NLUClient(self.path, fallback=lambda: EchoNLU("local"))
+        self.assertEqual(client.predict_action("hi")[1]["by"], "daemon")
+        self.daemon.stop()
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertEqual(client.predict_action("hi")[1]["by"], "local")
+        self.assertFalse(NLUClient(self.path).ping())
+
+    def test_socket_is_private(self):
+        self.assertEqual(stat.S_IMODE(os.stat(self.path).st_mode) & 0o077, 0)
+        shared = os.path.join(self.tmp.name, "shared")
+        os.mkdir(shared)
+        os.chmod(shared, 0o777)
+        with self.assertRaises(PermissionError):
+            make_private_dir(shared)
+        private = os.path.join(self.tmp.name, "private")
+        make_private_dir(private)
+        self.assertEqual(stat.S_IMODE(os.stat(private).st_mode), 0o700)
+
+    @unittest.skipUnless(hasattr(os, "getuid") and os.getuid() == 0, "needs root to chown")
+    def test_refuses_socket_of_another_user(self):
+        os.chown(self.path, 65534, -1)
+        client = NLUClient(self.path, fallback=lambda: EchoNLU("local"))
+        self.assertFalse(client.ping())
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertEqual(client.predict_action("hi")[1]["by"], "local")
+
+
+if __name__ == '__main__':
+    unittest.main()
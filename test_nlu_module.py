@@ -0,0 +1,596 @@
+import unittest
+import sys
+import os
+import io
+import json
+import re
+import tempfile
+import contextlib
+
+# Setup paths
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'atom'))
+
+from ai_core.modules.nlu import NLUModule
+from ai_core.modules.dataset_index import NearMatchIndex
+from ai_core.modules.dataset_store import DatasetStore, StoredNearMatchIndex, compile_dataset
+from ai_core.modules.gazetteer import Gazetteer
+from ai_core.modules.slot_speller import SlotAwareSpeller
+from ai_core.modules.hot_commands import RequestLog, HotCommandTable, mine, write_table
+from ai_core.modules.spell_index import TieredSymSpell, domain_vocabulary, TRUSTED_COUNT
+from ai_core.modules import spell_index
+from ai_core.modules import plan
+from ai_core.modules.plan import Step
+from ai_core.modules.nlu import MusicIntent, SystemIntent, GenericActionIntent
+from models.nlu.constrained import SchemaConstraint, ConstrainedDecoder, ANY
+from models.nlu.rule_based import RuleBasedNLU, leading_literal
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+try:
+    import torch
+except ImportError:
+    torch = None
+
+
+class WordTokenizer:
+    """Stand-in tokenizer: one id per word or punctuation mark."""
+    eos_token_id = 1
+    pad_token_id = 0
+
+    def __init__(self):
+        self.vocab = {}
+
+    def __call__(self, text, add_special_tokens=False):
+        ids = [self.vocab.setdefault(p, len(self.vocab) + 2) for p in re.findall(r"\w+|[^\w\s]", text)]
+        return type("Encoding", (), {"input_ids": ids})
+
+
+class TestPredictBatch(unittest.TestCase):
+    def setUp(self):
+        self.nlu = NLUModule()
+
+    def test_batch_preserves_order(self):
+        texts = ["play baby", "open calculator", "check battery", "pause", "hello"] * 40
+        with contextlib.redirect_stdout(io.StringIO()):
+            expected = [self.nlu.predict_action(t) for t in texts]
+            results = self.nlu.predict_batch(texts, workers=2, chunksize=8)
+        self.assertEqual(results, expected)
+        self.assertEqual(self.nlu.batch_stats["count"], len(texts))
+        self.assertGreater(self.nlu.batch_stats["throughput"], 0)
+
+
+class TestNearMatchIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = NearMatchIndex([
+            "play believer on spotify", "play baby on youtube",
+            "open calculator", "open chrome", "close chrome",
+        ])
+
+    def test_normalized_hits(self):
+        self.assertEqual(self.index.closest("play believer on spotify please"), "play believer on spotify")
+        self.assertEqual(self.index.closest("open the calculator"), "open calculator")
+
+    def test_typos_within_distance(self):
+        self.assertEqual(self.index.closest("play beliver on spotfy"), "play believer on spotify")
+        self.assertEqual(self.index.closest("open chrom"), "open chrome")
+
+    def test_rejects_distant_and_short(self):
+        self.assertIsNone(self.index.closest("stop chrome"))
+        self.assertIsNone(self.index.closest("open x"))
+        self.assertIsNone(self.index.closest("play beliver on spotfy", max_distance=1))
+
+    def test_lookup_dataset_uses_near_match(self):
+        nlu = NLUModule()
+        nlu.dataset_cache = {"open calculator": {"text": "open calculator", "intent": "OPEN_APP", "entities": {"app": "calculator"}}}
+        nlu.dataset_index = NearMatchIndex(nlu.dataset_cache)
+        instr, data = nlu.lookup_dataset("open the calculator")
+        self.assertEqual(data, {"action": "open_app", "app": "calculator"})
+
+    def test_near_match_keeps_user_entities(self):
+        nlu = NLUModule()
+        record = {"text": "play believer on spotify", "intent": "PLAY_MUSIC",
+                  "entities": {"song": "believer", "app": "spotify"}}
+        nlu.dataset_cache = {"play believer on spotify": record}
+        nlu.dataset_index = NearMatchIndex(nlu.dataset_cache)
+        self.assertEqual(nlu.dataset_index.closest("play deliver on spotify"), "play believer on spotify")
+        self.assertIsNone(nlu.lookup_dataset("play deliver on spotify"))
+        # Typos outside the verb and the entities still match
+        instr, data = nlu.lookup_dataset("play believer onn spotify")
+        self.assertEqual(data["song"], "believer")
+        with contextlib.redirect_stdout(io.StringIO()):
+            _, data = nlu.predict_action("send hello to tom")
+        self.assertEqual(data["recipient"], "tom")
+
+    def test_near_match_never_edits_the_command(self):
+        nlu = NLUModule()
+        nlu.dataset_cache = {}
+        for text, intent, app in [("exit notepad", "CLOSE_APP", "notepad"), ("stop whatsapp", "CLOSE_APP", "whatsapp"),
+                                  ("launch chrome", "OPEN_APP", "chrome"), ("start chrome", "OPEN_APP", "chrome"),
+                                  ("send hello to mom", "SEND_MESSAGE", None)]:
+            nlu.dataset_cache[text] = {"text": text, "intent": intent, "entities": {"app": app} if app else {}}
+        nlu.dataset_index = NearMatchIndex(nlu.dataset_cache)
+        for text in ["edit notepad", "shop whatsapp", "lunch chrome", "stat chrome", "sned hello to mom"]:
+            self.assertIsNotNone(nlu.dataset_index.closest(text), text)
+            self.assertIsNone(nlu.lookup_dataset(text), text)
+        # Filler-only differences are exact normalized matches, allowed for every intent
+        self.assertEqual(nlu.lookup_dataset("exit the notepad please")[1]["action"], "close_app")
+
+
+class TestDatasetStore(unittest.TestCase):
+    def test_compile_and_lookup(self):
+        records = [
+            {"text": "Open Calculator", "intent": "OPEN_APP", "entities": {"app": "calculator"}},
+            {"text": "play baby on spotify", "intent": "PLAY_MUSIC", "entities": {"song": "baby", "app": "spotify"}},
+            {"text": "open calculator", "intent": "OPEN_APP", "entities": {"app": "calc"}},
+        ]
+        with tempfile.TemporaryDirectory() as tmp:
+            jsonl = os.path.join(tmp, "data.jsonl")
+            with open(jsonl, "w", encoding="utf-8") as f:
+                for r in records:
+                    f.write(json.dumps(r) + "\n")
+            with contextlib.redirect_stdout(io.StringIO()):
+                store = DatasetStore(compile_dataset(jsonl))
+            self.assertEqual(len(store), 2)
+            self.assertEqual(sorted(store.keys()), ["open calculator", "play baby on spotify"])
+            # Later records win, as in the old in-memory dict
+            self.assertEqual(store["open calculator"]["entities"], {"app": "calc"})
+            self.assertEqual(store.get("play baby on spotify")["intent"], "PLAY_MUSIC")
+            self.assertIsNone(store.get("missing"))
+            store._conn.close()
+
+    def test_stored_near_matches_agree_with_memory(self):
+        keys = ["open calculator", "open the calculator", "close calculator", "play believer on spotify",
+                "send hello to mom", "search weather today", "open x"]
+        with tempfile.TemporaryDirectory() as tmp:
+            jsonl = os.path.join(tmp, "data.jsonl")
+            with open(jsonl, "w", encoding="utf-8") as f:
+                for key in keys:
+                    f.write(json.dumps({"text": key, "intent": "X", "entities": {}}) + "\n")
+            with contextlib.redirect_stdout(io.StringIO()):
+                store = DatasetStore(compile_dataset(jsonl))
+            stored = StoredNearMatchIndex(store)
+            memory = NearMatchIndex(store.keys())
+            self.assertEqual(stored.postings, {})
+            self.assertEqual(len(stored), len(memory))
+            for text in ["open calculater", "Open the Calculator!", "play beleiver on spotfy", "sned hello to mom",
+                         "search wether today", "open y", "totally unrelated", "clos calculator"]:
+                self.assertEqual(stored.closest(text), memory.closest(text), text)
+            self.assertEqual(stored.closest("open calculater"), "open calculator")
+            store._conn.close()
+
+
+class TestResultCache(unittest.TestCase):
+    def setUp(self):
+        self.nlu = NLUModule(cache_size=2)
+
+    def test_repeats_hit_cache(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            first = self.nlu.predict_action("pause")
+            second = self.nlu.predict_action("  Pause ")
+        self.assertEqual(first, second)
+        self.assertEqual(self.nlu.cache_stats()["hits"], 1)
+
+    def test_volatile_intents_not_cached(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            for text in ["what is the time", "what is 2 plus 2", "check battery"]:
+                self.nlu.predict_action(text)
+                self.nlu.predict_action(text)
+        self.assertEqual(self.nlu.cache_stats()["hits"], 0)
+        self.assertEqual(len(self.nlu.result_cache), 0)
+
+    def test_size_eviction(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            for text in ["pause", "next song", "hello"]:
+                self.nlu.predict_action(text)
+        stats = self.nlu.cache_stats()
+        self.assertEqual(stats["size"], 2)
+        self.assertEqual(stats["evictions"], 1)
+
+    def test_ttl_expiry(self):
+        self.nlu.result_cache.ttl = -1
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.nlu.predict_action("pause")
+            self.nlu.predict_action("pause")
+        self.assertEqual(self.nlu.cache_stats()["expirations"], 1)
+
+
+class TestInstrumentation(unittest.TestCase):
+    def test_stage_timings_and_counters(self):
+        nlu = NLUModule(instrument=True)
+        with contextlib.redirect_stdout(io.StringIO()):
+            for text in ["play baby", "pause", "pause", "zzz"]:
+                nlu.predict_action(text)
+        snap = nlu.profiler.snapshot()
+        for name in ["predict_action", "preprocess_text", "lookup_dataset", "correct_spelling", "route"]:
+            self.assertIn(name, snap["stages"])
+        self.assertEqual(snap["stages"]["predict_action"]["count"], 4)
+        self.assertEqual(snap["counters"]["cache"], {"match": 1, "miss": 3})
+        self.assertEqual(snap["counters"]["router"]["miss"], 1)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = nlu.profiler.dump_json(os.path.join(tmp, "nlu_profile.json"))
+            with open(path) as f:
+                self.assertEqual(json.load(f)["counters"], snap["counters"])
+
+    def test_disabled_by_default(self):
+        nlu = NLUModule()
+        self.assertIsNone(nlu.profiler)
+        self.assertIsNone(nlu.router.profiler)
+
+
+class TestHotCommands(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.log_path = os.path.join(self.tmp.name, "logs", "requests.jsonl")
+        self.table_path = os.path.join(self.tmp.name, "hot_commands.json")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_log_mine_and_hot_reload(self):
+        log = RequestLog(self.log_path, batch_size=1000, flush_interval=60)
+        for text in ["Pause", "pause ", "pause!", "what is the time"] * 2 + ["open calculator"]:
+            log.log(text, success=True)
+        self.assertFalse(os.path.exists(self.log_path)) # Still buffered
+        log.close()
+        with open(self.log_path, encoding="utf-8") as f:
+            self.assertEqual(len(f.readlines()), 9)
+
+        nlu = NLUModule(hot_commands=False)
+        with contextlib.redirect_stdout(io.StringIO()):
+            table = mine([self.log_path], nlu, top_n=10, min_count=2)
+        self.assertEqual(list(table["commands"]), ["pause"]) # Time is volatile, calculator too rare
+        self.assertEqual(table["commands"]["pause"]["count"], 6)
+        self.assertEqual(table["commands"]["pause"]["action"]["plan"], [["press", "playpause"]])
+
+        nlu.hot_commands = HotCommandTable(self.table_path)
+        self.assertEqual(len(nlu.hot_commands), 0)
+        hot = {"action": "x", "plan": [["press", "enter"]]}
+        write_table({"commands": {"open calculator": {"count": 9, "instruction": "hot", "action": hot},
+                                  "pause": {"count": 6, "instruction": "press playpause", "action": {"action": "y"}}}},
+                    self.table_path)
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertEqual(nlu.predict_action("Open calculator.")[0], "hot")
+            nlu.hot_commands.get("open calculator")[1]["action"] = "mutated"
+            self.assertEqual(nlu.predict_action("open calculator"), ("hot", hot))
+            # Entries mined before plans were recorded get one from their text
+            self.assertEqual(nlu.predict_action("pause")[1]["plan"], [["press", "playpause"]])
+
+
+class TestPlan(unittest.TestCase):
+    def test_parse_legacy_text(self):
+        steps = plan.compile_plan("If it is windows click windows buttion then search for notepad then open it"
+                                  " then typr hello then save it/ it it is mack click Command-Spacebar buttion")
+        self.assertEqual(steps, (Step(plan.START_MENU), Step(plan.SEARCH_FOR, "notepad"), Step(plan.OPEN_RESULT),
+                                 Step(plan.TYPE, "hello"), Step(plan.SAVE)))
+        self.assertEqual(plan.parse_step("check RAM"), Step(plan.CHECK, "memory"))
+        self.assertEqual(plan.parse_step("click call"), Step(plan.RAW, "click call"))
+
+    def test_render_round_trip(self):
+        steps = (Step(plan.OPEN_APP, "spotify"), Step(plan.FOCUS_SEARCH), Step(plan.TYPE, "believer"),
+                 Step(plan.CLICK, "the song"), Step(plan.PLAY_RESULT), Step(plan.PRESS, "ctrl+t"),
+                 Step(plan.CHECK, "cpu"), Step(plan.CLEAN_TEMP), Step(plan.INFORM, "hi"), Step(plan.CLICK_SEARCH))
+        self.assertEqual(plan.parse(plan.render(steps)), steps)
+
+    def test_intents_emit_precompiled_plans(self):
+        text = MusicIntent().generate_verbose_instruction("Spotify", "play", "Typed Song")
+        self.assertEqual(text, "open Spotify then navigate to search bar then typr Typed Song"
+                               " then click on the song then play the song")
+        # The rendered text carries its steps: the argument keeps its case, which parsing would lose
+        self.assertIn(Step(plan.TYPE, "Typed Song"), plan.compile_plan(text))
+        text, _ = SystemIntent().extract("what is my battery")
+        self.assertEqual(text, "check battery")
+        text = GenericActionIntent().generate_verbose_instruction("Notepad", "open", "notepad")
+        self.assertTrue(text.startswith("if it is windows click windows buttion then search for notepad then open it/ "))
+        self.assertEqual(plan.compile_plan(text)[1], Step(plan.SEARCH_FOR, "notepad"))
+
+    def test_needs_screen(self):
+        fast = ["press volume_up", "press playpause", "check cpu", "inform The result is 84", "typr hello",
+                "say hi then check battery"]
+        visual = ["press ctrl+t then typr news then press enter", "press ctrl+w", "open spotify",
+                  "if it is windows click windows buttion then search for notepad then open it", "click call"]
+        for text in fast:
+            self.assertFalse(plan.needs_screen(plan.compile_plan(text)), text)
+        for text in visual:
+            self.assertTrue(plan.needs_screen(plan.compile_plan(text)), text)
+
+    def test_action_data_carries_plan(self):
+        nlu = NLUModule()
+        with contextlib.redirect_stdout(io.StringIO()):
+            text, data = nlu.predict_action("search google for how to type faster")
+        # Survives JSON (daemon, hot table) and runs as typed, while re-parsing the text would not
+        steps = plan.compile_plan(json.loads(json.dumps(data["plan"])))
+        self.assertEqual(steps[1], Step(plan.TYPE, "google for how to type faster"))
+        self.assertNotEqual(plan.parse(str(text)), steps)
+
+    def test_typed_plan_input(self):
+        decoded = json.loads(json.dumps([["press", "ctrl+t"], ["type", "news"], ["press", "enter"]]))
+        self.assertEqual(plan.compile_plan(decoded),
+                         (Step(plan.PRESS, "ctrl+t"), Step(plan.TYPE, "news"), Step(plan.PRESS, "enter")))
+
+
+class TestSchemaConstraint(unittest.TestCase):
+    def setUp(self):
+        self.tok = WordTokenizer()
+        self.constraint = SchemaConstraint(self.tok)
+
+    def walk(self, text):
+        state = self.constraint.start()
+        forced = 0
+        for tok in self.tok(text).input_ids:
+            allowed = self.constraint.allowed(state)
+            self.assertTrue(allowed is ANY or tok in allowed, text)
+            forced += allowed is not ANY and len(allowed) == 1
+            state = self.constraint.advance(state, tok)
+        return state, forced
+
+    def test_accepts_training_targets(self):
+        state, forced = self.walk("INTENT: SEND_MESSAGE | ENTITIES: contact=mom, message=i am coming")
+        self.assertEqual(state[0], "value")
+        self.assertGreater(forced, 0) # Scaffolding is decoded without a model choice
+
+    def test_intent_restricted_to_schema(self):
+        allowed = self.constraint.allowed(self.walk("INTENT:")[0])
+        self.assertNotIn(self.tok("DANCE").input_ids[0], allowed)
+        self.assertIn(self.tok("OPEN_APP").input_ids[0], allowed)
+
+    def test_stops_or_continues_after_intent(self):
+        allowed = self.constraint.allowed(self.walk("INTENT: CLOSE_APP")[0])
+        self.assertEqual(sorted(allowed), sorted([self.tok.eos_token_id, self.tok("|").input_ids[0]]))
+
+    def test_only_unused_keys_after_value(self):
+        state, _ = self.walk("INTENT: PLAY_MUSIC | ENTITIES: song=baby,")
+        self.assertEqual(self.constraint.allowed(state), self.tok("app").input_ids)
+
+
+class ScriptedT5:
+    """
+    Stand-in seq2seq model: each input text has a target token sequence, and the
+    logits after n decoder tokens favour target[n - 1], however the tokens were fed
+    (one per pass, a forced run at once, or in a batch).
+    """
+    def __init__(self, tok, targets):
+        self.tok = tok
+        self.targets = {tuple(tok(src).input_ids): tok(dst).input_ids + [tok.eos_token_id] for src, dst in targets.items()}
+        self.keys = list(self.targets)
+        self.config = type("Config", (), {"decoder_start_token_id": tok.pad_token_id})
+
+    def get_encoder(self):
+        def encode(input_ids, attention_mask):
+            rows = [self.keys.index(tuple(t for t in row.tolist() if t != self.tok.pad_token_id)) for row in input_ids]
+            return type("Out", (), {"last_hidden_state": torch.tensor(rows, dtype=torch.float).view(-1, 1, 1)})
+        return encode
+
+    def __call__(self, encoder_outputs, attention_mask, decoder_input_ids, past_key_values, use_cache):
+        fed = (past_key_values or 0) + decoder_input_ids.shape[1]
+        logits = torch.zeros(decoder_input_ids.shape[0], 1, 64)
+        for b, row in enumerate(encoder_outputs[0].view(-1).tolist()):
+            target = self.targets[self.keys[int(row)]]
+            logits[b, -1, target[min(fed - 1, len(target) - 1)]] = 10.0
+        return type("Out", (), {"logits": logits, "past_key_values": fed})
+
+
+class BatchWordTokenizer(WordTokenizer):
+    def __call__(self, text, add_special_tokens=False, return_tensors=None, padding=False, truncation=False):
+        if return_tensors is None:
+            return super().__call__(text)
+        rows = [super(BatchWordTokenizer, self).__call__(t).input_ids for t in text]
+        width = max(len(r) for r in rows)
+        ids = torch.tensor([r + [self.pad_token_id] * (width - len(r)) for r in rows])
+        return type("Batch", (), {"input_ids": ids, "attention_mask": (ids != self.pad_token_id).long()})
+
+    def decode(self, ids, skip_special_tokens=True):
+        words = {v: k for k, v in self.vocab.items()}
+        return " ".join(words[i] for i in ids if i > 1)
+
+
+@unittest.skipUnless(torch, "needs torch")
+class TestConstrainedDecoder(unittest.TestCase):
+    def test_batch_matches_single_rows(self):
+        tok = BatchWordTokenizer()
+        targets = {
+            "open notepad": "INTENT: OPEN_APP | ENTITIES: app = notepad",
+            "play believer on spotify": "INTENT: PLAY_MUSIC | ENTITIES: song = believer , app = spotify",
+            "close chrome": "INTENT: CLOSE_APP",
+        }
+        model = ScriptedT5(tok, targets)
+        decoder = ConstrainedDecoder(model, tok)
+        single = [decoder.decode([text])[0] for text in targets]
+        decoder.stats["forward_passes"] = 0
+        batched = decoder.decode(list(targets))
+        self.assertEqual(batched, single)
+        self.assertEqual(batched[2], "INTENT : CLOSE_APP")
+        # One pass per step for the whole batch: the longest row, plus the pass that picks its EOS
+        longest = max(len(tok(t).input_ids) for t in targets.values())
+        self.assertEqual(decoder.stats["forward_passes"], longest + 1)
+
+
+class TestGazetteer(unittest.TestCase):
+    def setUp(self):
+        self.gaz = Gazetteer({
+            "app": ["spotify", "chrome", {"name": "visual studio code", "canonical": "code"}, "visual studio"],
+            "contact": ["mom", "rahul"],
+            "song": ["shape of you"],
+        })
+
+    def test_longest_match_with_typos(self):
+        spans = self.gaz.spot("open visual studo code and play shpae of you for rahul")
+        self.assertEqual([(s.kind, s.value) for s in spans], [("app", "code"), ("song", "shape of you"), ("contact", "rahul")])
+        self.assertEqual(spans[0].edits, 1)
+
+    def test_lookup_needs_whole_phrase(self):
+        self.assertEqual(self.gaz.lookup("spotfiy", "app"), "spotify")
+        self.assertIsNone(self.gaz.lookup("spotify premium", "app"))
+        self.assertIsNone(self.gaz.lookup("mum", "contact")) # Short words must match exactly
+
+    def test_resolve_inside_phrase(self):
+        gaz = Gazetteer({"app": ["paint", "notepad", "cmd"], "contact": ["dad"]})
+        self.assertEqual(gaz.resolve("the paint", "app"), "paint")
+        self.assertEqual(gaz.resolve("notepad app", "app"), "notepad")
+        self.assertEqual(gaz.resolve("cmdd", "app"), "cmd") # Short names keep one edit as a whole phrase
+        self.assertIsNone(gaz.resolve("add", "app"))
+        self.assertEqual(gaz.spot("cmdd and add"), []) # ...but not when spotting inside an utterance
+
+    def test_open_app_through_nlu(self):
+        nlu = NLUModule()
+        with contextlib.redirect_stdout(io.StringIO()):
+            for text, app in [("open the paint", "paint"), ("open notepad app", "notepad"), ("open cmdd", "cmd")]:
+                self.assertEqual(nlu.predict_action(text)[1]["app"], app)
+
+    def test_intents_slice_slots_at_spans(self):
+        from ai_core.modules.nlu import MusicIntent, SocialIntent, PaymentIntent
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertEqual(MusicIntent().extract("play rain on me")[1]["song"], "rain on me")
+            self.assertEqual(MusicIntent().extract("play beliver on spotifi")[1]["song"], "believer")
+            self.assertEqual(MusicIntent().extract("open youtube and play faded")[1]["app"], "YouTube")
+            # An unknown player still ends the song; it then plays generically
+            for text in ["play faded on utube", "play the weeknd on apple music"]:
+                self.assertEqual(MusicIntent().extract(text)[1], {"action": "play_music", "app": "Spotify", "song": ""})
+            data = SocialIntent().extract("send meet at 5 to 6 to rahul on whatsapp")[1]
+            self.assertEqual((data["message"], data["recipient"]), ("meet at 5 to 6", "rahul"))
+            self.assertEqual(SocialIntent().extract("tell sarah i will be late")[1]["message"], "i will be late")
+            self.assertEqual(PaymentIntent().extract("pay 100 rupees to dad on gpay")[1]["recipient"], "dad")
+
+    def test_reload_from_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "gazetteer.json")
+            gaz = Gazetteer({"app": ["chrome"]}, path=path)
+            self.assertIsNone(gaz.lookup("telegram", "app"))
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({"app": ["telegram"]}, f)
+            with contextlib.redirect_stdout(io.StringIO()):
+                self.assertTrue(gaz.reload_if_changed(min_interval=0))
+            self.assertEqual(gaz.lookup("telegarm", "app"), "telegram")
+            self.assertEqual(gaz.lookup("chrome", "app"), "chrome")
+
+
+class FakeSymSpell:
+    """Single-word lookups from a fixed typo table; counts calls."""
+    Suggestion = type("Suggestion", (), {})
+
+    def __init__(self, fixes):
+        self.fixes = fixes
+        self.calls = 0
+
+    def lookup(self, word, verbosity, max_edit_distance=2, include_unknown=False):
+        self.calls += 1
+        suggestion = self.Suggestion()
+        suggestion.term = self.fixes.get(word, word)
+        return [suggestion]
+
+
+class TestSlotAwareSpeller(unittest.TestCase):
+    def setUp(self):
+        self.sym = FakeSymSpell({"opne": "open", "sned": "send", "teh": "the", "rahl": "real", "wher": "where"})
+        self.speller = SlotAwareSpeller(self.sym, Gazetteer({"app": ["spotify"], "contact": ["rahul"]}))
+
+    def test_slots_kept_verbatim(self):
+        self.assertEqual(self.speller.correct("opne spotfy"), "open spotfy")
+        # Message body and contact are left alone; the command word is fixed
+        self.assertEqual(self.speller.correct("sned wher r u to rahl"), "send wher r u to rahl")
+        self.assertEqual(self.speller.correct("text rahl teh wher"), "text rahl teh wher")
+        self.assertEqual(self.speller.correct("opne teh 2nd tab"), "open the 2nd tab")
+
+    def test_token_cache(self):
+        self.speller.correct("opne teh door")
+        calls = self.sym.calls
+        self.speller.correct("opne teh window")
+        self.assertEqual(self.sym.calls, calls + 1) # Only "window" is new
+
+
+class FakeTier:
+    """SymSpell stand-in: answers from a typo table with a fixed distance of 1."""
+    def __init__(self, fixes):
+        self.fixes = fixes
+
+    def lookup(self, word, verbosity, max_edit_distance=2, include_unknown=False):
+        suggestion = FakeSymSpell.Suggestion()
+        if word in self.fixes.values() or include_unknown:
+            suggestion.term, suggestion.distance = word, 0
+        elif word in self.fixes and max_edit_distance >= 1:
+            suggestion.term, suggestion.distance = self.fixes[word], 1
+        else:
+            return []
+        return [suggestion]
+
+
+class TestTieredSymSpell(unittest.TestCase):
+    def setUp(self):
+        self.loaded = []
+        self.tiers = TieredSymSpell(FakeTier({"spotfy": "spotify", "clsoe": "close"}),
+                                    lambda: self.loaded.append(1), known_words={"hello", "close"})
+
+    def test_domain_and_known_words_skip_general_tier(self):
+        self.assertEqual(self.tiers.lookup("spotfy", None)[0].term, "spotify")
+        self.assertEqual(self.tiers.lookup("clsoe", None)[0].term, "close")
+        self.assertEqual(self.tiers.lookup("hello", None)[0].term, "hello")
+        self.assertEqual(self.loaded, []) # General tier never loaded
+        self.assertEqual(self.tiers.stats, {"domain": 2, "known": 1, "general": 0})
+
+    @unittest.skipUnless(spell_index.SymSpell, "needs symspellpy")
+    def test_merged_tiers_list_each_term_once(self):
+        general = FakeTier({"clsoe": "close", "clsoer": "closer"})
+        tiers = TieredSymSpell(FakeTier({"clsoe": "close"}), lambda: general, domain_distance=0)
+        terms = [s.term for s in tiers.lookup("clsoe", spell_index.Verbosity.ALL)]
+        self.assertEqual(terms, ["close"])
+
+    def test_domain_vocabulary(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "dataset.jsonl")
+            with open(path, "w", encoding="utf-8") as f:
+                for text in ["ply zorblax on spotifi"] * 3 + ["play believer on spotify"]:
+                    f.write(json.dumps({"text": text, "intent": "PLAY_MUSIC", "entities": {"song": "zorblax"}}) + "\n")
+            vocab = domain_vocabulary(path, known_words={"on", "play", "ply"})
+        self.assertEqual(vocab["on"], 4)
+        self.assertEqual(vocab["zorblax"], 3 + TRUSTED_COUNT) # Entity value: trusted
+        self.assertNotIn("ply", vocab) # A real word, but one edit from the keyword "play"
+        self.assertNotIn("spotifi", vocab) # Dataset noise, not a real word
+        self.assertGreaterEqual(vocab["spotify"], TRUSTED_COUNT) # Gazetteer name
+
+
+class TestRuleBasedNLU(unittest.TestCase):
+    def setUp(self):
+        self.nlu = RuleBasedNLU()
+
+    def test_table_order_wins(self):
+        # OPEN_APP precedes SEND_MESSAGE in the table, even though "text" comes first
+        self.assertEqual(self.nlu.parse("text mom open notepad")["intent"], "OPEN_APP")
+        self.assertEqual(self.nlu.parse("play believer on spotify")["entities"], {"song": "believer", "app": "spotify"})
+
+    def test_parse_many(self):
+        results = self.nlu.parse_many(["close chrome", "hello", "google weather"])
+        self.assertEqual([r["intent"] for r in results], ["CLOSE_APP", "UNKNOWN", "SEARCH_WEB"])
+
+    def test_rules_without_literal_are_always_tried(self):
+        self.assertEqual(leading_literal(r"colou?r"), "colo")
+        self.assertEqual(leading_literal(r"yes|yeah"), "")
+        nlu = RuleBasedNLU({"CONFIRM": [r"^(?:yes|yeah)\b"], "COLOR": [r"colou?r (?P<name>\w+)"]})
+        self.assertEqual(nlu.parse("yeah sure")["intent"], "CONFIRM")
+        self.assertEqual(nlu.parse("color red")["entities"], {"name": "red"})
+
+
+@unittest.skipUnless(numpy, "numpy not installed")
+class TestDistilledNLU(unittest.TestCase):
+    def test_round_trip(self):
+        from models.nlu.distill import train, save
+        from models.nlu.distilled import DistilledNLU
+        examples = {}
+        for song in ["believer", "faded", "shape of you", "blinding lights"]:
+            for app in ["spotify", "youtube"]:
+                examples[f"play {song} on {app}"] = ("PLAY_MUSIC", {"song": song, "app": app})
+        for app in ["notepad", "chrome", "calculator", "spotify"]:
+            examples[f"open {app}"] = ("OPEN_APP", {"app": app})
+            examples[f"close {app}"] = ("CLOSE_APP", {"app": app})
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = save(os.path.join(tmp, "nlu.npz"), *train(examples, epochs=10))
+            nlu = DistilledNLU(path)
+        result = nlu.parse("close chrome")
+        self.assertEqual((result["intent"], result["entities"]), ("CLOSE_APP", {"app": "chrome"}))
+        self.assertEqual(nlu.parse("play faded on youtube")["entities"], {"song": "faded", "app": "youtube"})
+
+
+if __name__ == '__main__':
+    unittest.main()
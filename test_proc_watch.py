@@ -0,0 +1,88 @@
+import unittest
+import sys
+import os
+import time
+import shutil
+import tempfile
+import threading
+import subprocess
+
+# Setup paths
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'agent', 'executor'))
+
+from proc_watch import ProcessWatcher, default_source
+
+
+class FakeSource:
+    def __init__(self):
+        self.table = {1: "init", 2: "Explorer.EXE"}
+        self.starts = {}
+        self.name_calls = 0
+
+    def pids(self):
+        return {(pid, self.starts.get(pid, 0)) for pid in self.table}
+
+    def name(self, key):
+        self.name_calls += 1
+        return self.table.get(key[0])
+
+
+class TestProcessWatcher(unittest.TestCase):
+    def test_delta_scan(self):
+        src = FakeSource()
+        watcher = ProcessWatcher((src.pids, src.name))
+        self.assertEqual(sorted(watcher.scan()), ["explorer.exe", "init"])
+        src.table[3] = "Spotify.exe"
+        del src.table[1]
+        self.assertEqual(watcher.scan(), ["spotify.exe"])
+        self.assertEqual(src.name_calls, 3) # Known pids are never looked up again
+        self.assertEqual(watcher.wait_for("SPOTIFY", timeout=0), "spotify.exe")
+        self.assertIsNone(watcher.wait_for("init", timeout=0))
+
+    def test_reused_pid_and_idle_view(self):
+        src = FakeSource()
+        watcher = ProcessWatcher((src.pids, src.name))
+        watcher._waiters = 1 # As if a waiter were blocked, so the view is kept between scans
+        watcher.scan()
+        # pid 2 exits and is reused by a new process between two scans
+        src.table[2], src.starts[2] = "Spotify.exe", 7
+        self.assertEqual(watcher.scan(), ["spotify.exe"])
+        self.assertNotIn("explorer.exe", watcher.procs.values())
+        watcher._waiters = 0
+        self.assertEqual(watcher.wait_for("spotify", timeout=0), "spotify.exe")
+        self.assertEqual(watcher.procs, {}) # Last waiter left
+
+    def test_waiter_wakes_on_new_process(self):
+        src = FakeSource()
+        watcher = ProcessWatcher((src.pids, src.name), tick=0.01)
+        threading.Timer(0.1, lambda: src.table.update({9: "notepad.exe"})).start()
+        start = time.monotonic()
+        self.assertEqual(watcher.wait_for("notepad", timeout=5), "notepad.exe")
+        self.assertLess(time.monotonic() - start, 0.5)
+
+    @unittest.skipUnless(sys.platform.startswith("linux") and default_source(), "needs /proc")
+    def test_real_process(self):
+        # comm is the basename of the executed path, so a symlink gives the dummy a unique name
+        tmp = tempfile.mkdtemp()
+        name = f"atomdummy{os.getpid() % 100000}"
+        os.symlink(shutil.which("sleep"), os.path.join(tmp, name))
+        watcher = ProcessWatcher()
+        self.assertIsNone(watcher.wait_for(name, timeout=0.05))
+        procs = []
+        launch = threading.Timer(0.2, lambda: procs.append(subprocess.Popen([os.path.join(tmp, name), "5"])))
+        launch.start()
+        try:
+            start = time.monotonic()
+            self.assertEqual(watcher.wait_for(name, timeout=5), name)
+            latency = time.monotonic() - start - 0.2
+            self.assertLess(latency, 0.3)
+        finally:
+            launch.join()
+            for p in procs:
+                p.kill()
+                p.wait()
+            shutil.rmtree(tmp)
+
+
+if __name__ == '__main__':
+    unittest.main()
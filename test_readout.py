@@ -0,0 +1,77 @@
+import unittest
+import sys
+import os
+import time
+import shutil
+import tempfile
+import threading
+
+# Setup paths
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'agent', 'executor'))
+
+from readout import ScreenReader, cli_ocr, format_readout
+
+
+class FakeImage:
+    """Stands in for a PIL image: save() writes raw bytes into the buffer."""
+    def __init__(self, data=b"P5 frame"):
+        self.data = data
+
+    def convert(self, mode):
+        return self
+
+    def save(self, fp, format=None):
+        fp.write(self.data)
+
+
+class TestScreenReader(unittest.TestCase):
+    def test_returns_future_immediately(self):
+        gate = threading.Event()
+        def slow_ocr(img):
+            gate.wait(5)
+            return "  Now   playing\n Believer "
+        reader = ScreenReader(grab=FakeImage, ocr=slow_ocr)
+        start = time.monotonic()
+        future = reader.read()
+        self.assertLess(time.monotonic() - start, 0.05)
+        self.assertFalse(future.done())
+        gate.set()
+        self.assertEqual(future.result(timeout=5), "Screen Readout: Now playing Believer...")
+
+    def test_errors_become_readout_text(self):
+        def broken(img):
+            raise RuntimeError("no display")
+        self.assertEqual(ScreenReader(grab=FakeImage, ocr=broken).read().result(timeout=5),
+                         "Vision Unavailable: no display")
+        self.assertEqual(format_readout(" \n "), "Screen text empty (Image clear?)")
+
+    def test_stale_queued_readout_is_cancelled(self):
+        gate = threading.Event()
+        reader = ScreenReader(grab=FakeImage, ocr=lambda img: gate.wait(5) and "text")
+        first = reader.read()
+        while not first.running():
+            time.sleep(0.001)
+        second, third = reader.read(), reader.read()
+        gate.set()
+        self.assertTrue(second.cancelled())
+        self.assertEqual(first.result(timeout=5), "Screen Readout: text...")
+        self.assertEqual(third.result(timeout=5), "Screen Readout: text...")
+
+    @unittest.skipUnless(sys.platform.startswith("linux") and shutil.which("sh"), "needs a POSIX shell")
+    def test_cli_reads_stdin(self):
+        # A stand-in tesseract that checks its arguments and echoes the image bytes it was piped
+        tmp = tempfile.mkdtemp()
+        try:
+            cmd = os.path.join(tmp, "tesseract")
+            with open(cmd, "w") as f:
+                f.write('#!/bin/sh\n[ "$1 $2" = "stdin stdout" ] || exit 1\ncat\n')
+            os.chmod(cmd, 0o755)
+            before = set(os.listdir(tmp))
+            self.assertEqual(cli_ocr(FakeImage(b"hello screen"), cmd), "hello screen")
+            self.assertEqual(set(os.listdir(tmp)), before)
+        finally:
+            shutil.rmtree(tmp)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+import sys
+import os
+
+# Setup paths
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'agent', 'executor'))
+
+import settle
+from settle import wait_for_settle
+
+
+class FakeScreen:
+    """Frames are numbers; the screen animates (changes every sample) until `busy_until`."""
+    def __init__(self, busy_from=0.0, busy_until=0.0):
+        self.now = 0.0
+        self.busy_from = busy_from
+        self.busy_until = busy_until
+        self.grabs = 0
+
+    def clock(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+    def grab(self):
+        self.grabs += 1
+        return self.grabs if self.busy_from <= self.now < self.busy_until else 0
+
+    def wait(self, **kwargs):
+        return wait_for_settle(grab=self.grab, diff=lambda a, b: float(a != b), clock=self.clock,
+                               sleep=self.sleep, interval=0.05, stable_for=0.2, **kwargs)
+
+
+class TestWaitForSettle(unittest.TestCase):
+    def test_returns_once_still(self):
+        screen = FakeScreen(busy_until=0.6)
+        waited = screen.wait(timeout=5.0)
+        self.assertGreaterEqual(waited, 0.8)
+        self.assertLess(waited, 1.0)
+
+    def test_still_screen_returns_fast(self):
+        self.assertLess(FakeScreen().wait(timeout=5.0), 0.3)
+
+    def test_timeout_while_animating(self):
+        self.assertAlmostEqual(FakeScreen(busy_until=99).wait(timeout=1.0), 1.0, delta=0.06)
+
+    def test_expect_change_waits_for_late_redraw(self):
+        # A dialog that starts drawing 0.25s after the key press
+        screen = FakeScreen(busy_from=0.25, busy_until=0.5)
+        self.assertLess(FakeScreen(busy_from=0.25, busy_until=0.5).wait(timeout=5.0), 0.25)
+        self.assertGreaterEqual(screen.wait(timeout=5.0, expect_change=True), 0.7)
+        # Nothing ever redraws: give up after change_grace
+        self.assertLess(FakeScreen().wait(timeout=5.0, expect_change=True, change_grace=0.3), 0.4)
+
+    def test_disabled_falls_back_to_constant(self):
+        screen = FakeScreen()
+        enabled, settle.SETTLE_ENABLED = settle.SETTLE_ENABLED, False
+        try:
+            waited = wait_for_settle(timeout=5.0, fallback=0.5, clock=screen.clock, sleep=screen.sleep)
+        finally:
+            settle.SETTLE_ENABLED = enabled
+        self.assertEqual(waited, 0.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import unittest
+import sys
+import os
+import threading
+
+# Setup paths
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'agent'))
+
+from speculation import Speculator, speech_end
+
+WHITELIST = {"open spotify": "open spotify", "open whats": "open whatsapp", "play hanuman": "play hanuman song in spotify"}
+
+
+def match(text):
+    mapped = WHITELIST.get(text)
+    return (mapped, 1.0 if mapped else 0.0, text)
+
+
+class TestSpeculator(unittest.TestCase):
+    def setUp(self):
+        self.prepared = []
+        self.fired = threading.Event()
+        def prepare(prep):
+            self.prepared.append(prep)
+            self.fired.set()
+        self.spec = Speculator(match, prepare, stable_partials=2)
+
+    def stabilize(self, text):
+        self.spec.on_partial(text)
+        prep = self.spec.on_partial(text)
+        if prep:
+            self.assertTrue(self.fired.wait(1.0))
+        return prep
+
+    def test_unstable_partial_does_not_fire(self):
+        self.assertIsNone(self.spec.on_partial("open spotify"))
+        self.assertIsNone(self.spec.on_partial("open spot"))
+        self.assertEqual(self.prepared, [])
+
+    def test_commit_skips_completed_command(self):
+        self.assertEqual(self.stabilize("open spotify"), "open Spotify")
+        result = self.spec.on_final("open spotify")
+        self.assertEqual(result["decision"], "commit")
+        self.assertTrue(result["skip_send"])
+        self.assertIsNotNone(self.spec.record_action(result))
+
+    def test_latency_is_signed_from_end_of_speech(self):
+        now = [10.0]
+        spec = Speculator(match, self.prepared.append, clock=lambda: now[0])
+        spec.on_partial("open spotify", at=10.0)
+        spec.on_partial("open spotify", at=10.2)
+        spec._timer.join(1.0)
+        self.assertEqual(self.prepared, ["open Spotify"]) # Ran at 10.0
+        now[0] = 11.0
+        # The user was still speaking until 10.5, after the prep ran
+        result = spec.on_final("open spotify", spoken_at=10.5)
+        self.assertAlmostEqual(spec.record_action(result), -0.5)
+        # Without word timings the last partial change marks the end of speech
+        spec.on_partial("open whats", at=12.0)
+        now[0] = 12.8
+        result = spec.on_final("open whatsapp")
+        self.assertAlmostEqual(result["speech_end"], 12.0)
+        self.assertAlmostEqual(spec.record_action(result, action_at=13.0), 1.0)
+
+    def test_speech_end_from_word_times(self):
+        words = [{"word": "open", "end": 3.1}, {"word": "spotify", "end": 3.6}]
+        # Audio up to 4.0 s finished capturing at clock 100.0
+        self.assertAlmostEqual(speech_end(words, 4.0, 100.0), 99.6)
+        self.assertIsNone(speech_end([], 4.0, 100.0))
+
+    def test_ignored_final_clears_speculation(self):
+        self.stabilize("open spotify")
+        self.assertEqual(self.spec.on_final(None)["decision"], "cancel")
+        # The next utterance starts clean instead of committing a stale prep
+        self.assertEqual(self.spec.on_final("open spotify")["decision"], "none")
+
+    def test_commit_still_sends_rest_of_command(self):
+        self.stabilize("play hanuman")
+        result = self.spec.on_final("play hanuman song in spotify")
+        self.assertEqual(result["decision"], "commit")
+        self.assertFalse(result["skip_send"])
+
+    def test_cancel_on_different_final(self):
+        self.stabilize("open spotify")
+        result = self.spec.on_final("open whatsapp")
+        self.assertEqual(result["decision"], "cancel")
+        self.assertFalse(result["skip_send"])
+        self.assertIsNone(result["prep_at"])
+
+    def test_disabled_only_measures(self):
+        spec = Speculator(match, self.prepared.append, enabled=False)
+        spec.on_partial("open spotify")
+        spec.on_partial("open spotify")
+        result = spec.on_final("open spotify")
+        self.assertEqual(result["decision"], "none")
+        self.assertIsNotNone(spec.record_action(result, result["final_at"] + 0.05))
+        self.assertEqual(list(spec.summary()), ["direct"])
+
+
+if __name__ == '__main__':
+    unittest.main()
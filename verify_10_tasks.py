@@ -21,11 +21,14 @@ tasks = [
     {"type": "Voice", "input": "Search for Tesla stock", "desc": "Generic Search Intent"}
 ]
 
-print(f"{'TYPE':<10} | {'DESC':<35} | {'INPUT':<35} | {'STATUS':<10}")
-print("-" * 100)
+# End-to-end time per task; compare runs with ATOM_SETTLE=0 (fixed sleeps) on the backend
+print(f"{'TYPE':<10} | {'DESC':<35} | {'INPUT':<35} | {'TIME':>7} | {'STATUS':<10}")
+print("-" * 110)
 
+total = 0.0
 for task in tasks:
     print(f"{task['type']:<10} | {task['desc']:<35} | {task['input']:<35} | ", end="", flush=True)
+    start = time.perf_counter()
     try:
         req = urllib.request.Request(BASE_URL, method="POST")
         req.add_header('Content-Type', 'application/json')
@@ -36,13 +39,16 @@ for task in tasks:
                 resp_json = json.loads(response.read().decode('utf-8'))
                 # Basic validation
                 action = resp_json.get('action', {}).get('action', 'unknown') if resp_json.get('action') else 'unknown'
-                print(f"PASS ({action})")
+                status = f"PASS ({action})"
             else:
-                print(f"FAIL ({response.status})")
+                status = f"FAIL ({response.status})"
     except Exception as e:
-        print(f"ERROR: {e}")
+        status = f"ERROR: {e}"
+    elapsed = time.perf_counter() - start
+    total += elapsed
+    print(f"{elapsed:6.2f}s | {status}")
     
     time.sleep(1.0) # Small delay between tests
 
-print("-" * 100)
-print("Test Suite Completed.")
+print("-" * 110)
+print(f"Test Suite Completed. End-to-end task time: {total:.2f}s")
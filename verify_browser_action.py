@@ -20,6 +20,8 @@ instruction = "open the browser then search for antigravity"
 
 print(f"Executing Instruction: {instruction}")
 logs = execute_verbose_command(instruction)
+if logs.readout is not None:
+    logs.append(logs.readout.result())
 
 print("\nExecution Logs:")
 for log in logs:
@@ -0,0 +1,59 @@
+import sys
+import os
+import io
+import time
+import contextlib
+import statistics
+
+# Executor and NLU from this checkout
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(ROOT, 'agent', 'executor'))
+sys.path.append(os.path.join(ROOT, 'atom'))
+
+try:
+    from actions import execute_verbose_command
+    from ai_core.modules.nlu import NLUModule
+    from ai_core.modules import plan
+except ImportError as e:
+    print(f"Could not import executor/NLU: {e}")
+    sys.exit(1)
+
+# Non-visual commands per intent class. These really run: volume and media keys are pressed.
+CLASSES = {
+    "System (volume)": ["volume up", "volume down"],
+    "System (check)": ["check battery", "check cpu", "check memory"],
+    "Media": ["pause", "resume"],
+    "Humor": ["tell me a joke"],
+    "Solver": ["calculate 12 * 7"],
+    "Date": ["what time is it", "what is the date today"],
+    "Greeting": ["hello"],
+}
+ROUNDS = 3
+
+def timed(steps, fast):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        logs = execute_verbose_command(steps, fast=fast)
+        if logs.readout is not None:
+            logs.readout.result() # The old executor returned only after the readout
+    return time.perf_counter() - start
+
+nlu = NLUModule()
+print(f"{'INTENT CLASS':<18} | {'INSTRUCTION':<32} | {'LANE':<6} | {'FULL':>8} | {'FAST':>8} | {'SAVED':>8}")
+print("-" * 95)
+
+for name, commands in CLASSES.items():
+    full_times, fast_times = [], []
+    for command in commands:
+        with contextlib.redirect_stdout(io.StringIO()):
+            instruction, action_data = nlu.predict_action(command)
+        steps = action_data["plan"]
+        lane = "screen" if plan.needs_screen(plan.compile_plan(steps)) else "fast"
+        full = statistics.median(timed(steps, fast=False) for _ in range(ROUNDS))
+        fast = statistics.median(timed(steps, fast=True) for _ in range(ROUNDS))
+        full_times.append(full)
+        fast_times.append(fast)
+        print(f"{name:<18} | {instruction[:32]:<32} | {lane:<6} | {full * 1000:>6.0f}ms | {fast * 1000:>6.0f}ms | "
+              f"{(full - fast) * 1000:>6.0f}ms")
+    print(f"{name + ' (mean)':<18} | {'':<32} | {'':<6} | {statistics.mean(full_times) * 1000:>6.0f}ms | "
+          f"{statistics.mean(fast_times) * 1000:>6.0f}ms |")
@@ -18,6 +18,8 @@ instruction = "open notepad then type 'Verification Test for Save Fix' then save
 
 print(f"Executing Instruction: {instruction}")
 logs = execute_verbose_command(instruction)
+if logs.readout is not None:
+    logs.append(logs.readout.result())
 
 print("\nExecution Logs:")
 for log in logs: